@@ -0,0 +1,120 @@
+"""
+darts per second the scorer can commit under every sqlite pragma profile (see database.pragmas), once with a commit
+per change (Durability.FULL) and once per take (Durability.TAKE). with --reader, a second connection keeps counting
+the darts meanwhile, like a statistics view would, and reports how often it had to wait for a lock.
+
+    python benchmarks/database_profiles.py --darts 300 --reader
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF
+from sqlalchemy.orm import sessionmaker
+
+from database import BaseObject
+from database.pragmas import PRAGMA_PROFILES, create_sqlite_engine
+from models.objects.dart import Dart
+from models.objects.game import GamePlayers
+from models.objects.games.x01 import X01
+from models.objects.leg import Leg
+from models.objects.player import Player
+from models.objects.set import Set
+from models.objects.take import Take
+
+
+class Reader(threading.Thread):
+    def __init__(self, path: str):
+        super().__init__(daemon=True)
+        self.path = path
+        self.reads = 0
+        self.locked = 0
+        self.running = True
+
+    def run(self):
+        # no busy timeout: every lock the reader runs into is counted instead of waited for
+        connection = sqlite3.connect(self.path, timeout=0)
+        while self.running:
+            try:
+                connection.execute('SELECT count(*) FROM darts').fetchone()
+                self.reads += 1
+            except sqlite3.OperationalError:
+                self.locked += 1
+            time.sleep(0.001)
+        connection.close()
+
+
+def run(profile: str, darts: int, commit_per_take: bool, reader: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.db')
+        engine = create_sqlite_engine(path, profile)
+        BaseObject.Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        player = Player(name='benchmark')
+        game = X01(x=3, double_out=True, double_in=False, legs_to_set=1, sets_to_match=1)
+        session.add_all([player, game])
+        session.commit()
+        session.add(GamePlayers(game, player, 0))
+        game_set = Set(game, player)
+        leg = Leg(game_set, player)
+        session.add_all([game_set, leg])
+        session.commit()
+
+        reader_thread = Reader(path) if reader else None
+        if reader_thread is not None:
+            reader_thread.start()
+        start = time.perf_counter()
+        for i in range(darts):
+            if i % 3 == 0:
+                take = Take(leg, player)
+                session.add(take)
+                if not commit_per_take:
+                    session.commit()
+            # the same way DatabaseController.new_dart adds them
+            dart = Dart(None, hit_location=QPointF(170.0, 60.0), target_location=QPointF(170.0, 60.0))
+            dart.resolve_segment()
+            take.add_dart(dart)
+            session.add(dart)
+            if not commit_per_take or i % 3 == 2:
+                session.commit()
+        session.commit()
+        elapsed = time.perf_counter() - start
+        if reader_thread is not None:
+            reader_thread.running = False
+            reader_thread.join()
+        session.close()
+        engine.dispose()
+        return dict(darts_per_second=darts / elapsed,
+                    reads=reader_thread.reads if reader_thread else 0,
+                    locked=reader_thread.locked if reader_thread else 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark the sqlite pragma profiles')
+    parser.add_argument('--darts', type=int, default=300)
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PRAGMA_PROFILES), default=list(PRAGMA_PROFILES))
+    parser.add_argument('--reader', action='store_true', help='count darts on a second connection meanwhile')
+    args = parser.parse_args(argv)
+
+    # the models print every new dart
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        results = {(profile, per_take): run(profile, args.darts, per_take, args.reader)
+                   for profile in args.profiles for per_take in (False, True)}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print('%-10s %-8s %12s %10s %10s' % ('profile', 'commit', 'darts/s', 'reads', 'locked'))
+    for (profile, per_take), result in results.items():
+        print('%-10s %-8s %12.0f %10d %10d' % (profile, 'take' if per_take else 'change', result['darts_per_second'],
+                                               result['reads'], result['locked']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
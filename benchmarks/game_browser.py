@@ -0,0 +1,112 @@
+"""
+time it takes to open the game browser of Load Game on a database with years of games, compared to loading every
+game like the browser used to. the games (2 players, 1 set, 1 leg, some takes of 3 darts each) are written straight
+into the tables of alchemy.db in a temporary directory.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/game_browser.py --games 5000
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QApplication
+from sqlalchemy import event
+
+from database.types import GameStatus, TakeResult
+
+
+def fill(engine, games: int, takes: int) -> None:
+    from models.objects.dart import Dart
+    from models.objects.game import Game, GamePlayers
+    from models.objects.games.x01 import X01
+    from models.objects.leg import Leg
+    from models.objects.player import Player
+    from models.objects.set import Set
+    from models.objects.take import Take
+    start = datetime.datetime(2015, 1, 1)
+    rows = {table: [] for table in [Player.__table__, Game.__table__, X01.__table__, GamePlayers.__table__,
+                                    Set.__table__, Leg.__table__, Take.__table__, Dart.__table__]}
+    rows[Player.__table__] = [dict(id=1, name='anna'), dict(id=2, name='bob')]
+    take_id = dart_id = 0
+    for game_id in range(1, games + 1):
+        time_stamp = start + datetime.timedelta(hours=game_id)
+        finished = game_id < games
+        rows[Game.__table__].append(dict(id=game_id, type='x01', status=GameStatus.FINISHED if finished else
+                                         GameStatus.IN_PROGRESS, start_time=time_stamp, player_turn=0, legs_to_set=1,
+                                         sets_to_match=1, winner_id=1 + game_id % 2 if finished else None))
+        rows[X01.__table__].append(dict(id=game_id, x=3 + game_id % 3, double_in=False, double_out=True))
+        rows[GamePlayers.__table__] += [dict(game_id=game_id, player_id=1, player_index=0),
+                                        dict(game_id=game_id, player_id=2, player_index=1)]
+        rows[Set.__table__].append(dict(id=game_id, game_id=game_id, start_time=time_stamp, beginner_id=1))
+        rows[Leg.__table__].append(dict(id=game_id, set_id=game_id, start_time=time_stamp, beginner_id=1))
+        for i in range(2 * takes):
+            take_id += 1
+            rows[Take.__table__].append(dict(id=take_id, leg_id=game_id, player_id=1 + i % 2, start_time=time_stamp,
+                                             result=TakeResult.FINISHED))
+            for _ in range(3):
+                dart_id += 1
+                rows[Dart.__table__].append(dict(id=dart_id, take_id=take_id, time_stamp=time_stamp, sector=20,
+                                                 score=20, hit_location=QPointF(170.0, 60.0),
+                                                 target_location=QPointF(170.0, 60.0)))
+    with engine.begin() as connection:
+        for table, values in rows.items():
+            connection.execute(table.insert(), values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark opening the game browser')
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--takes', type=int, default=10, help='takes per player and game')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    application = QApplication.instance() or QApplication(sys.argv)
+    directory = tempfile.TemporaryDirectory()
+    # DatabaseController opens alchemy.db of the working directory on import
+    os.chdir(directory.name)
+    from controllers.database_controller import DatabaseController
+    from models.objects.game import Game
+    from widgets.dialogs import GameSelectionDialog
+    fill(DatabaseController._engine, args.games, args.takes)
+
+    session = DatabaseController._session
+    statements = [0]
+    event.listen(DatabaseController._engine, 'before_cursor_execute',
+                 lambda *_: statements.__setitem__(0, statements[0] + 1))
+
+    def all_games():
+        # what the browser did before: every game as an object, named and listed
+        return len([(game.get_name(), game.start_time.ctime()) for game in session.query(Game).all()])
+
+    def browser():
+        dialog = GameSelectionDialog('Load Game', DatabaseController.get_game_summaries)
+        listed = dialog.gameListWidget.count()
+        dialog.deleteLater()
+        return listed
+
+    print('%d games, %d darts each' % (args.games, 6 * args.takes))
+    print('%-16s %10s %12s %8s' % ('listing', 'ms', 'statements', 'games'))
+    for name, listing in [('all games', all_games), ('game browser', browser)]:
+        times = []
+        for _ in range(args.repeat):
+            session.expunge_all()
+            statements[0] = 0
+            start = time.perf_counter()
+            listed = listing()
+            times.append(time.perf_counter() - start)
+        print('%-16s %10.1f %12d %8d' % (name, 1000 * min(times), statements[0], listed))
+    application.processEvents()
+    session.close()
+    DatabaseController._engine.dispose()
+    os.chdir('/')
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+time and statements it takes to load a whole 5 set match (game, sets, legs, takes, darts) into a fresh session,
+the way loading a game from the menu does. the match is written through DatabaseController into alchemy.db of a
+temporary directory.
+
+    python benchmarks/game_loading.py --takes 10 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QPointF
+from sqlalchemy import event
+
+
+def fill(sets: int, legs: int, takes: int) -> int:
+    from controllers.database_controller import DatabaseController
+    from models.objects.dart import Dart
+    from models.objects.game import GamePlayers
+    from models.objects.games.x01 import X01
+    from models.objects.player import Player
+    session = DatabaseController._session
+    players = [Player(name='anna'), Player(name='bob')]
+    game = DatabaseController.new_game(X01, x=5, double_out=True, double_in=False, legs_to_set=legs,
+                                       sets_to_match=sets)
+    session.add_all(players + [GamePlayers(game, player, i) for i, player in enumerate(players)])
+    DatabaseController.commit()
+    for _ in range(sets):
+        game_set = DatabaseController.new_set(game, players[0])
+        for _ in range(legs):
+            leg = DatabaseController.new_leg(game_set, players[0])
+            for _ in range(takes):
+                for player in players:
+                    take = DatabaseController.new_take(player, leg)
+                    for _ in range(3):
+                        DatabaseController.new_dart(take, Dart(None, hit_location=QPointF(170.0, 60.0),
+                                                               target_location=QPointF(170.0, 60.0)))
+    return game.id
+
+
+def walk(game) -> int:
+    darts = 0
+    for game_set in game.sets:
+        for leg in game_set.legs:
+            for take in leg.takes:
+                assert take.leg is leg
+                for dart in take.darts:
+                    assert dart.take is take
+                    darts += dart.score is not None
+    return darts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark loading a whole game')
+    parser.add_argument('--sets', type=int, default=5)
+    parser.add_argument('--legs', type=int, default=3)
+    parser.add_argument('--takes', type=int, default=10, help='takes per player and leg')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.TemporaryDirectory()
+    # DatabaseController opens alchemy.db of the working directory on import
+    os.chdir(directory.name)
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        from controllers.database_controller import DatabaseController
+        from models.objects.game import Game
+        game_id = fill(args.sets, args.legs, args.takes)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    session = DatabaseController._session
+    statements = [0]
+    event.listen(DatabaseController._engine, 'before_cursor_execute',
+                 lambda *_: statements.__setitem__(0, statements[0] + 1))
+
+    loaders = [('query', lambda: session.query(Game).get(game_id))]
+    if hasattr(DatabaseController, 'get_game_graph'):
+        loaders.append(('get_game_graph', lambda: DatabaseController.get_game_graph(game_id)))
+    print('%d sets x %d legs x %d takes per player' % (args.sets, args.legs, args.takes))
+    print('%-16s %10s %12s %8s' % ('loader', 'ms', 'statements', 'darts'))
+    for name, load in loaders:
+        times = []
+        for _ in range(args.repeat):
+            session.expunge_all()
+            statements[0] = 0
+            start = time.perf_counter()
+            darts = walk(load())
+            times.append(time.perf_counter() - start)
+        print('%-16s %10.1f %12d %8d' % (name, 1000 * min(times), statements[0], darts))
+    session.close()
+    DatabaseController._engine.dispose()
+    os.chdir('/')
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+times DartBoard.classify_many against classifying the same points one by one in every hit-test mode, on the grid
+of tests/test_hit_test_parity.py, and reports where a mode disagrees with the QPainterPath reference.
+exits with 1 if any mode disagrees.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/hit_test_modes.py --step 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt5.QtCore import QPointF
+
+from models.dartboard import DartBoard, HitTestMode
+from tests.test_hit_test_parity import grid
+
+
+def classify(mode: HitTestMode, points: np.ndarray):
+    DartBoard.set_hit_test_mode(mode)
+    start = time.perf_counter()
+    results = DartBoard.classify_many(points)
+    batch = time.perf_counter() - start
+    start = time.perf_counter()
+    for x, y in points[:10000]:
+        DartBoard.get_throw_result(QPointF(x, y))
+    single = (time.perf_counter() - start) * len(points) / min(len(points), 10000)
+    return results, batch, single
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='compare the hit-test modes of DartBoard')
+    parser.add_argument('--step', type=float, default=1.0, help='grid step in mm')
+    parser.add_argument('--wire-tolerance', type=float, default=0.1, help='mm around the wires that are skipped')
+    args = parser.parse_args(argv)
+
+    points = grid(args.step, args.wire_tolerance)
+    reference, _, _ = classify(HitTestMode.PATH, points)
+    print('%d points' % len(points))
+    print('%-8s %16s %16s %12s' % ('mode', 'classify_many ms', 'one by one ms', 'mismatches'))
+    failures = 0
+    for mode in HitTestMode:
+        results, batch, single = classify(mode, points)
+        mismatches = int(np.count_nonzero((results.sectors != reference.sectors) | (results.beds != reference.beds)))
+        failures += mismatches
+        print('%-8s %16.1f %16.1f %12d' % (mode.name, 1000 * batch, 1000 * single, mismatches))
+        for x, y in points[(results.sectors != reference.sectors) | (results.beds != reference.beds)][:5]:
+            print('         %.2f, %.2f' % (x, y))
+    DartBoard.set_hit_test_mode(HitTestMode.POLAR)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
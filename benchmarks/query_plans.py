@@ -0,0 +1,30 @@
+"""
+verbose runner of tests/test_query_plans.py: prints the query plan verdict of every statement the player's take
+lookups issue. exits with 1 if sqlite would scan a whole takes, darts, legs or sets table for any of them.
+
+    python benchmarks/query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.test_query_plans import explain_take_lookups
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        explained = explain_take_lookups(os.path.join(directory, 'query_plans.db'))
+    failures = 0
+    for statement, scans in explained:
+        failures += bool(scans)
+        print('%-4s %s' % ('SCAN' if scans else 'ok', ' '.join(statement.split())[:110]))
+        for scan in scans:
+            print('     ' + scan)
+    print('%d of %d statements scan a growing table' % (failures, len(explained)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
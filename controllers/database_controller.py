@@ -1,18 +1,24 @@
+import atexit
+from contextlib import contextmanager
 from typing import List, Type, Union
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QObject, QTimer, QCoreApplication, QThread
 
-from sqlalchemy import event, exc
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import exc, func
+from sqlalchemy.orm import sessionmaker, Session, selectinload, aliased
 from database import BaseObject
+from database.migrations import run_migrations
+from database.pragmas import create_sqlite_engine
 from database.types import GameStatus, TakeResult, GameVariant
+from logic.settings import Settings, Durability
 from models.objects.leg import Leg
 from models.objects.take import Take
 from models.objects.dart import Dart
 from models.objects.set import Set
 from models.objects.player import Player
-from models.objects.game import Game
+from models.objects.game import Game, GameSummary
+from models.objects.game_players import GamePlayers
+from models.objects.game_event import GameEvent, GameSnapshot
 
 # noinspection PyUnresolvedReferences
 import models.objects.games  # needed for sql-alchemy to create all games
@@ -22,15 +28,11 @@ from models.objects.games import x01, cricket, around_the_clock
 Base = BaseObject.Base
 
 
-def _fk_pragma_on_connect(dbapi_con, con_record):
-    dbapi_con.execute('PRAGMA FOREIGN_KEYS=ON;')
-
-
 def _create_session(engine):
     print('INIT DB SESSION')
     session = sessionmaker()
-    event.listen(engine, 'connect', _fk_pragma_on_connect)
     Base.metadata.create_all(engine, checkfirst=True)
+    run_migrations(engine)
     session.configure(bind=engine)
     created_session = session()
     created_session.commit()
@@ -38,9 +40,78 @@ def _create_session(engine):
 
 
 class DatabaseController(QObject):
-    _engine = create_engine('sqlite:///alchemy.db')  # , echo='debug')
+    _engine = create_sqlite_engine('alchemy.db')
     _session = _create_session(_engine)  # type: Session
     _session.autoflush = False
+    _uncommitted = False
+    _commit_timer = None  # type: QTimer
+    _checkpoint_depth = 0  # nested DatabaseController.checkpoint() blocks
+    _checkpoint_requested = None  # type: Durability  # the commit asked for inside them that commits most often
+
+    @staticmethod
+    def commit(checkpoint: Durability = Durability.FULL):
+        """
+        commits the session if Settings.DATABASE_DURABILITY asks for it at this checkpoint. otherwise the changes
+        are only flushed: queries and ids see them, but the transaction stays open until a later checkpoint,
+        the timer or shutdown commits it, saving the disk syncs in between.
+        inside checkpoint() the changes are only flushed and the end of the block decides
+        """
+        session = DatabaseController._session
+        if DatabaseController._checkpoint_depth:
+            DatabaseController._request_commit(checkpoint)
+        elif Settings.DATABASE_DURABILITY.get().value <= checkpoint.value:
+            session.commit()
+            DatabaseController._uncommitted = False
+            return
+        session.flush()
+        # same as after a commit, so objects never keep state that differs from the database (e.g. after deletes)
+        session.expire_all()
+        DatabaseController._uncommitted = True
+        if not DatabaseController._checkpoint_depth:
+            DatabaseController._start_commit_timer()
+
+    @staticmethod
+    @contextmanager
+    def checkpoint():
+        """
+        one commit for everything a single change writes (a dart, its take, the game events and snapshot logging it):
+        the commits inside only flush, the end of the outermost block commits as the one committing most often would
+        """
+        DatabaseController._checkpoint_depth += 1
+        try:
+            yield
+        finally:
+            DatabaseController._checkpoint_depth -= 1
+            if not DatabaseController._checkpoint_depth:
+                requested, DatabaseController._checkpoint_requested = DatabaseController._checkpoint_requested, None
+                if requested is not None:
+                    DatabaseController.commit(requested)
+
+    @staticmethod
+    def _request_commit(checkpoint: Durability):
+        # later checkpoints are committed at more durabilities, see commit
+        requested = DatabaseController._checkpoint_requested
+        if requested is None or checkpoint.value > requested.value:
+            DatabaseController._checkpoint_requested = checkpoint
+
+    @staticmethod
+    def commit_pending():
+        if DatabaseController._uncommitted:
+            DatabaseController._session.commit()
+            DatabaseController._uncommitted = False
+
+    @staticmethod
+    def _start_commit_timer():
+        app = QCoreApplication.instance()
+        # the timer needs an event loop, elsewhere the next checkpoint or shutdown commits
+        if app is None or QThread.currentThread() is not app.thread():
+            return
+        if DatabaseController._commit_timer is None:
+            DatabaseController._commit_timer = QTimer()
+            DatabaseController._commit_timer.setSingleShot(True)
+            DatabaseController._commit_timer.timeout.connect(DatabaseController.commit_pending)
+        if not DatabaseController._commit_timer.isActive():
+            DatabaseController._commit_timer.start(Settings.WRITE_BEHIND_INTERVAL_MS.get())
 
     @staticmethod
     def get_players() -> List[Player]:
@@ -52,100 +123,143 @@ class DatabaseController(QObject):
     @staticmethod
     def add_new_player(name: str) -> Union[Player, None]:
         p = Player(name=name)
+        # a failing insert rolls back, which must not take pending changes with it
+        DatabaseController.commit_pending()
         try:
             DatabaseController._session.add(p)
-            DatabaseController._session.commit()
+            DatabaseController.commit(Durability.LEG)
             return p
         except exc.IntegrityError:
             DatabaseController._session.rollback()
             return None
 
-    @classmethod
-    def get_unfinished_games(cls) -> List[Game]:
-        games = DatabaseController._session.query(Game).filter(Game.status.isnot(GameStatus.FINISHED)).all()
-        # print('LOADING UNFINISHED GAMES')
-        # for game in games:
-        #     print('GD', game.__dict__)
-        return games
+    @staticmethod
+    def get_game_summaries(offset: int = 0, limit: int = 50, unfinished_only: bool = False) -> List[GameSummary]:
+        """
+        a page of the games, newest first, with only what the game browser shows. reads columns of the game tables
+        and the player names, none of the games are loaded as objects
+        """
+        session = DatabaseController._session
+        games = Game.__table__
+        winner = aliased(Player)
+        # the options of every game type, their columns are spread over the tables of the types
+        option_columns = {}
+        for mapper in Game.__mapper__.self_and_descendants:
+            for option in mapper.class_.get_option_list():
+                column = mapper.columns[option.name]
+                option_columns.setdefault((column.table.name, column.name), column)
+        columns = list(option_columns.values())
+        query = session.query(games.c.id, games.c.type, games.c.start_time, games.c.status, winner.name, *columns) \
+            .select_from(games).outerjoin(winner, winner.id == games.c.winner_id)
+        for mapper in Game.__mapper__.self_and_descendants:
+            if mapper.local_table is not games:
+                query = query.outerjoin(mapper.local_table, mapper.local_table.c.id == games.c.id)
+        if unfinished_only:
+            query = query.filter(games.c.status.isnot(GameStatus.FINISHED))
+        rows = query.order_by(games.c.id.desc()).offset(offset).limit(limit).all()
+
+        players = {}
+        for game_id, name in session.query(GamePlayers.game_id, Player.name).join(GamePlayers.player) \
+                .filter(GamePlayers.game_id.in_([row[0] for row in rows])) \
+                .order_by(GamePlayers.game_id, GamePlayers.player_index):
+            players.setdefault(game_id, []).append(name)
+
+        summaries = []
+        for row in rows:
+            game_id, game_type, start_time, status, winner_name = row[:5]
+            values = dict(zip(option_columns, row[5:]))
+            game_class = Game.__mapper__.polymorphic_map[game_type].class_
+            options = {option.name: values[(column.table.name, column.name)]
+                       for option in game_class.get_option_list()
+                       for column in [game_class.__mapper__.columns[option.name]]}
+            summaries.append(GameSummary(game_id, game_type, game_class.get_summary_name(options), options, start_time,
+                                         status, players.get(game_id, []), winner_name))
+        return summaries
 
-    @classmethod
-    def get_games(cls) -> List[Game]:
-        games = DatabaseController._session.query(Game).all()
-        return games
+    @staticmethod
+    def get_game_graph(game_id: int) -> Union[Game, None]:
+        """
+        the game with all its sets, legs, takes and darts, one query per level (and per 500 parents) instead of
+        the joins and per set queries of the relationships' own loading
+        """
+        return DatabaseController._session.query(Game).options(
+            selectinload(Game.sets).selectinload(Set.legs).selectinload(Leg.takes).selectinload(Take.darts)
+        ).filter(Game.id == game_id).one_or_none()
 
     @staticmethod
     def new_game(game_type: Type[Game], *args, **kwargs) -> Game:
         print(args, kwargs)
         game = game_type(*args, **kwargs)
         DatabaseController._session.add(game)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
         return game
 
     @staticmethod
     def new_set(game: Game, beginner: Player) -> Set:
         set = Set(game, beginner)
         DatabaseController._session.add(set)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
         return set
 
     @staticmethod
     def new_leg(set: Set, beginner: Player) -> Leg:
         leg = Leg(set, beginner)
         DatabaseController._session.add(leg)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
         return leg
 
     @staticmethod
     def new_take(player: Player, leg: Leg) -> Take:
         take = Take(leg, player)
         DatabaseController._session.add(take)
-        DatabaseController._session.commit()
+        DatabaseController.commit()
         return take
 
     @staticmethod
     def new_dart(take: Take, dart: Dart) -> Dart:
         if dart.take is None or dart.take.id != take.id:
             dart.take = take
+        dart.resolve_segment()
         DatabaseController._session.add(dart)
-        DatabaseController._session.commit()
+        DatabaseController.commit()
         return dart
 
     @staticmethod
     def complete_take(take: Take, result: TakeResult):
         take.result = result
         DatabaseController._session.add(take)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.TAKE)
 
     @staticmethod
     def complete_leg(leg: Leg, winner: Player):
         leg.winner = winner
         DatabaseController._session.add(leg)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
 
     @staticmethod
     def complete_set(set: Set, winner: Player):
         set.winner = winner
         DatabaseController._session.add(set)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
 
     @staticmethod
     def complete_game(game: Game, winner: Player):
         game.winner = winner
         DatabaseController._session.add(game)
-        DatabaseController._session.commit()
+        DatabaseController.commit(Durability.LEG)
 
     @staticmethod
     def remove_dart(dart: Dart):
         with DatabaseController._session.no_autoflush:
             DatabaseController._session.query(Dart).filter(Dart.id == dart.id).delete()
-            DatabaseController._session.commit()
+            DatabaseController.commit()
 
     @staticmethod
     def remove_take(take: Take):
         with DatabaseController._session.no_autoflush:
             DatabaseController._session.query(Dart).filter(Dart.take_id == take.id).delete()
             DatabaseController._session.query(Take).filter(Take.id == take.id).delete()
-            DatabaseController._session.commit()
+            DatabaseController.commit()
 
     @staticmethod
     def remove_leg(leg: Leg):
@@ -154,7 +268,7 @@ class DatabaseController(QObject):
                 DatabaseController._session.query(Dart).filter(Dart.take_id == take.id).delete()
                 DatabaseController._session.query(Take).filter(Take.id == take.id).delete()
             DatabaseController._session.query(Leg).filter(Leg.id == leg.id).delete()
-            DatabaseController._session.commit()
+            DatabaseController.commit()
 
     @staticmethod
     def remove_set(set: Set):
@@ -165,10 +279,63 @@ class DatabaseController(QObject):
                     DatabaseController._session.query(Take).filter(Take.id == take.id).delete()
                 DatabaseController._session.query(Leg).filter(Leg.id == leg.id).delete()
             DatabaseController._session.query(Set).filter(Set.id == set.id).delete()
-            DatabaseController._session.commit()
+            DatabaseController.commit()
+
+    @staticmethod
+    def add_game_event(event: GameEvent) -> GameEvent:
+        DatabaseController._add_log_entry(event)
+        return event
+
+    @staticmethod
+    def add_game_snapshot(snapshot: GameSnapshot) -> GameSnapshot:
+        DatabaseController._add_log_entry(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _add_log_entry(entry):
+        DatabaseController._session.add(entry)
+        if DatabaseController._checkpoint_depth:
+            # committed together with the change it logs, at the end of the checkpoint
+            DatabaseController._session.flush([entry])
+            DatabaseController._request_commit(Durability.FULL)
+        else:
+            DatabaseController.commit()
+
+    @staticmethod
+    def get_last_event_sequence(game: Game) -> int:
+        sequence = DatabaseController._session.query(func.max(GameEvent.sequence)).filter(
+            GameEvent.game_id == game.id).scalar()
+        return sequence if sequence is not None else 0
+
+    @staticmethod
+    def get_latest_snapshot(game: Game, leg: Leg) -> Union[GameSnapshot, None]:
+        return DatabaseController._session.query(GameSnapshot).filter(
+            GameSnapshot.game_id == game.id, GameSnapshot.leg_id == leg.id).order_by(
+            GameSnapshot.sequence.desc()).first()
+
+    @staticmethod
+    def get_game_events(game: Game, leg: Leg, after_sequence: int = 0) -> List[GameEvent]:
+        return DatabaseController._session.query(GameEvent).filter(
+            GameEvent.game_id == game.id, GameEvent.leg_id == leg.id, GameEvent.sequence > after_sequence).order_by(
+            GameEvent.sequence).all()
 
     @staticmethod
     def update_entity(entity):
         with DatabaseController._session.no_autoflush:
             DatabaseController._session.add(entity)
-            DatabaseController._session.commit()
\ No newline at end of file
+            DatabaseController.commit()
+
+
+# nothing written behind is lost on a regular exit
+atexit.register(DatabaseController.commit_pending)
+Settings.DATABASE_DURABILITY.register_change_handler(DatabaseController.commit_pending, pass_value=False)
+
+
+def _reconnect(profile_name: str):
+    # the pragmas are applied on connect, so the kept connections have to go (after giving back the session's)
+    DatabaseController.commit_pending()
+    DatabaseController._session.commit()
+    DatabaseController._engine.dispose()
+
+
+Settings.DATABASE_PRAGMA_PROFILE.register_change_handler(_reconnect)
@@ -25,7 +25,7 @@ class MainController(QObject):
     game_updated = pyqtSignal(Game, bool)   # game object, new game
 
     # request dialogs
-    request_game_choice = pyqtSignal(str, list, object)
+    request_game_choice = pyqtSignal(str, object, object)   # title, page loader (offset, limit), game id callback
     request_multi_select = pyqtSignal(str, list, object, dict)
 
     def __init__(self):
@@ -38,17 +38,16 @@ class MainController(QObject):
         self.mqtt.new_mqtt_status.connect(self.update_mqtt_status)
         self.update_board_state.connect(self.mqtt.send_board_state)
         self.mqtt.setup()
-        unfinished_games = DatabaseController.get_unfinished_games()
-        if unfinished_games:
+        if DatabaseController.get_game_summaries(0, 1, unfinished_only=True):
             self.request_game_choice.emit('Continue Game?',
-                                          unfinished_games, self.load_game)
+                                          lambda offset, limit: DatabaseController.get_game_summaries(
+                                              offset, limit, unfinished_only=True),
+                                          self.load_game_by_id)
 
     def select_game_to_load(self):
-        #games = DatabaseController.get_unfinished_games()
-        games = DatabaseController.get_games()
-        if games:
+        if DatabaseController.get_game_summaries(0, 1):
             self.request_game_choice.emit('Load Game',
-                                          games, self.load_game)
+                                          DatabaseController.get_game_summaries, self.load_game_by_id)
 
     @pyqtSlot()
     def generate_dart(self):
@@ -141,11 +140,13 @@ class MainController(QObject):
             self.game.updated.disconnect(self.received_update)
             self.game.action_request.disconnect(self.game_action_request)
             for player in self.game.players:
-                player._current_leg_takes = None
-                player._current_game_takes = None
                 player._current_take = None
                 player._current_game = None
 
+    def load_game_by_id(self, game_id: int):
+        # the whole game at once, the dialogs only load the summaries they list
+        self.load_game(DatabaseController.get_game_graph(game_id))
+
     def load_game(self, game):
         print('loading', game, game.start_time, [p.get_current_game_takes().__len__() for p in game.players])
         self._unload_current_game()
@@ -156,10 +157,9 @@ class MainController(QObject):
             self.game.status = GameStatus.IN_PROGRESS
             self.game._next_player(skip_introduce=True)
         self.game._recalculate_leg_scores()
+        self.game.take_index.clear()
         for player in self.game.get_players():
             SoundController.ensure_player_sound_file(player)
-            player._current_leg_takes = None
-            player._current_game_takes = None
             player._current_take = None
             player._current_game = self.game
             if game.get_current_player() == player:
@@ -208,4 +208,10 @@ class MainController(QObject):
             return
         self.game.undo_dart()
 
+    def request_redo(self):
+        if self.game is None or self.game.is_blocked() or self.game.winner is not None:
+            # print('controller ignores redo-action for blocked or finished games....')
+            return
+        self.game.redo_dart()
+
 
@@ -0,0 +1,63 @@
+"""
+in-place upgrades for existing alchemy.db files.
+create_all() only creates missing tables, so new columns and indexes on existing tables are added here.
+every migration must be idempotent, because a freshly created database already has the current schema.
+the index of the last applied migration is stored in sqlite's user_version.
+"""
+import numpy as np
+
+from models import board_geometry
+from models.board_geometry import Bed
+
+
+def _column_names(connection, table: str):
+    return [row[1] for row in connection.execute('PRAGMA table_info(%s)' % table)]
+
+
+def _add_dart_segment_columns(connection):
+    existing = _column_names(connection, 'darts')
+    for name, sql_type in [('sector', 'INTEGER'), ('bed', 'VARCHAR(12)'), ('score', 'INTEGER')]:
+        if name not in existing:
+            connection.execute('ALTER TABLE darts ADD COLUMN %s %s' % (name, sql_type))
+
+    # backfill every dart that was stored before the segment was persisted
+    rows = connection.execute('SELECT id, hit_location FROM darts WHERE sector IS NULL').fetchall()
+    if not rows:
+        return
+    points = np.array([board_geometry.parse_location(hit_location) for _, hit_location in rows])
+    results = board_geometry.classify_many(points)
+    connection.execute(
+        'UPDATE darts SET sector = ?, bed = ?, score = ? WHERE id = ?',
+        [(int(sector), Bed(bed).name, int(score), dart_id) for (dart_id, _), sector, bed, score in
+         zip(rows, results.sectors, results.beds, results.scores)])
+    print('backfilled segments of %s darts' % len(rows))
+
+
+# (name, table, columns) as declared in the models' __table_args__
+_ACCESS_PATH_INDEXES = [
+    ('ix_takes_player_leg', 'takes', ['player_id', 'leg_id']),
+    ('ix_takes_leg_start_time', 'takes', ['leg_id', 'start_time']),
+    ('ix_darts_take_time_stamp', 'darts', ['take_id', 'time_stamp']),
+    ('ix_legs_set_start_time', 'legs', ['set_id', 'start_time']),
+    ('ix_sets_game_start_time', 'sets', ['game_id', 'start_time']),
+]
+
+
+def _add_access_path_indexes(connection):
+    for name, table, columns in _ACCESS_PATH_INDEXES:
+        connection.execute('CREATE INDEX IF NOT EXISTS %s ON %s (%s)' % (name, table, ', '.join(columns)))
+
+
+MIGRATIONS = [
+    _add_dart_segment_columns,
+    _add_access_path_indexes,
+]
+
+
+def run_migrations(engine):
+    with engine.begin() as connection:
+        version = connection.execute('PRAGMA user_version').scalar()
+        for i, migration in enumerate(MIGRATIONS[version:], start=version):
+            print('running migration %s: %s' % (i, migration.__name__))
+            migration(connection)
+        connection.execute('PRAGMA user_version = %d' % len(MIGRATIONS))
@@ -0,0 +1,53 @@
+"""
+sqlite pragma profiles for the database connection, chosen by Settings.DATABASE_PRAGMA_PROFILE and applied
+to every new connection. WAL journaling lets readers (e.g. statistics) work next to the scorer without waiting
+for its locks, the synchronous level trades durability against the cost of a commit.
+"""
+from collections import namedtuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import SingletonThreadPool
+
+from logic.settings import Settings
+
+PragmaProfile = namedtuple('PragmaProfile', ['journal_mode', 'synchronous', 'cache_size_kib', 'mmap_size_mib',
+                                             'busy_timeout_ms'])
+
+PRAGMA_PROFILES = {
+    # sqlite's defaults, a rollback journal and a sync on every commit
+    'legacy': PragmaProfile('DELETE', 'FULL', 2000, 0, 0),
+    # WAL, still synced on every commit: nothing committed is ever lost
+    'safe': PragmaProfile('WAL', 'FULL', 16384, 64, 5000),
+    # WAL, synced at checkpoints only: a power loss can lose the last commits, the database stays consistent
+    'balanced': PragmaProfile('WAL', 'NORMAL', 16384, 64, 5000),
+    # no syncs at all: for slow sd cards, a power loss can corrupt the database
+    'fast': PragmaProfile('WAL', 'OFF', 16384, 64, 5000),
+}
+
+
+def apply_pragmas(dbapi_connection, profile: PragmaProfile):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA FOREIGN_KEYS=ON')
+    cursor.execute('PRAGMA journal_mode=%s' % profile.journal_mode)
+    cursor.execute('PRAGMA synchronous=%s' % profile.synchronous)
+    # negative sizes are KiB instead of pages
+    cursor.execute('PRAGMA cache_size=-%d' % profile.cache_size_kib)
+    cursor.execute('PRAGMA mmap_size=%d' % (profile.mmap_size_mib * 1024 * 1024))
+    cursor.execute('PRAGMA busy_timeout=%d' % profile.busy_timeout_ms)
+    cursor.close()
+
+
+def create_sqlite_engine(path: str, profile_name: str = None) -> Engine:
+    """
+    engine for the sqlite file with the pragma profile (Settings.DATABASE_PRAGMA_PROFILE if not given).
+    connections are kept per thread, so the cache and memory map outlive a transaction
+    """
+    engine = create_engine('sqlite:///%s' % path, poolclass=SingletonThreadPool)
+
+    def on_connect(dbapi_connection, connection_record):
+        name = profile_name if profile_name is not None else Settings.DATABASE_PRAGMA_PROFILE.get()
+        apply_pragmas(dbapi_connection, PRAGMA_PROFILES[name])
+
+    event.listen(engine, 'connect', on_connect)
+    return engine
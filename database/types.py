@@ -5,7 +5,8 @@ from typing import List
 from PyQt5.QtCore import QPointF
 from sqlalchemy import String
 
-from models.dartboard import Segment, Bed
+from engine.types import StringEnum, TakeResult, DartIntent
+from models.board_geometry import Segment, Bed
 
 
 class SQLPointF(String):
@@ -24,10 +25,11 @@ class SQLPointF(String):
 
     def result_processor(self, dialect, col_type):
         def process(value: str):
-            try:
-                return QPointF(*[float(c) for c in value.split(',')])
-            except AttributeError:
+            if value is None:
                 return QPointF()
+            try:
+                x, y = value.split(',')
+                return QPointF(float(x), float(y))
             except Exception as e:
                 print(e)
                 return QPointF()
@@ -87,21 +89,6 @@ class IntList(String):
         return process
 
 
-class StringEnum(enum.Enum):
-    @classmethod
-    def from_str(cls, val: str):
-        return cls[val]
-
-    def __str__(self):
-        return self.name
-
-
-class DartIntent(StringEnum):
-    SCORE = 'SCORE'
-    SETUP = 'SETUP'
-    CHECKOUT = 'CHECKOUT'
-
-
 class GameStatus(enum.Enum):
     UNINITIALIZED = -1
     WAITING_FOR_USER_INPUT = 0
@@ -115,9 +102,7 @@ class GameVariant(object):
     pass
 
 
-class TakeResult(StringEnum):
-    WIN = 'WIN'
-    BUST = 'BUST'
-    UNFINISHED = 'UNFINISHED'
-    FINISHED = 'FINISHED'
-    CHECK_IN = 'CHECK_IN'
+class GameEventType(StringEnum):
+    DART_ADDED = 'DART_ADDED'
+    DART_REMOVED = 'DART_REMOVED'
+    TAKE_RESULT = 'TAKE_RESULT'
@@ -0,0 +1,58 @@
+from typing import List, Dict, Hashable, Sequence, Union
+
+from engine.game import GameEngine, EngineTake
+from engine.strategies import Aim, around_the_clock_aim
+from engine.types import TakeResult
+from models.board_geometry import Segment
+
+LAST_TARGET = 20
+
+
+class AroundTheClockTargets(object):
+    """
+    the sector every player has to hit next, 21 once the player went around the clock
+    """
+    def __init__(self, players: Sequence[Hashable]):
+        self.targets = {player: 1 for player in players}  # type: Dict[Hashable, int]
+        self._hits = []  # type: List[bool]
+
+    def add_dart(self, player: Hashable, segment: Segment):
+        hit = segment.sector == self.targets[player]
+        if hit:
+            self.targets[player] += 1
+        self._hits.append(hit)
+
+    def remove_last_dart(self, player: Hashable):
+        if self._hits.pop():
+            self.targets[player] -= 1
+
+
+def around_the_clock_take_result(target: int, darts: int) -> Union[TakeResult, None]:
+    if target > LAST_TARGET:
+        return TakeResult.WIN
+    if darts > 2:
+        return TakeResult.FINISHED
+    return None
+
+
+class AroundTheClockEngine(GameEngine):
+    def new_leg_state(self) -> AroundTheClockTargets:
+        return AroundTheClockTargets(self.players)
+
+    def get_score(self, player: Hashable) -> int:
+        return self.state.targets[player]
+
+    def is_legal_finish(self, player: Hashable, segment: Segment) -> bool:
+        return self.state.targets[player] == LAST_TARGET and segment.sector == LAST_TARGET
+
+    def _add_to_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.add_dart(take.player, segment)
+
+    def _remove_from_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.remove_last_dart(take.player)
+
+    def _take_result(self, take: EngineTake) -> Union[TakeResult, None]:
+        return around_the_clock_take_result(self.state.targets[take.player], len(take.darts))
+
+    def aim(self, player) -> Aim:
+        return around_the_clock_aim(self.state.targets[player])
@@ -0,0 +1,126 @@
+from typing import List, Dict, Hashable, Sequence, Tuple, Union
+
+import numpy as np
+
+from engine.game import GameEngine, EngineTake
+from engine.strategies import Aim, cricket_aim
+from engine.types import TakeResult
+from models.board_geometry import Segment
+
+GOAL_SEGMENTS = [20, 19, 18, 17, 16, 15, 25]
+
+
+class CricketMarks(object):
+    """
+    marks (goal segments x players) and scores of one leg, updated dart by dart.
+    every dart logs what it changed under its key, so undo and edits reverse exactly that dart
+    """
+    def __init__(self, goal_segments: List[int], players: Sequence[Hashable], cut_throat: bool):
+        self.cut_throat = cut_throat
+        self.rows = {sector: row for row, sector in enumerate(goal_segments)}  # type: Dict[int, int]
+        self.columns = {player: column for column, player in enumerate(players)}  # type: Dict[Hashable, int]
+        self.marks = np.zeros((len(goal_segments), len(players)), dtype=np.int32)
+        self.scores = np.zeros(len(players), dtype=np.int32)
+        # dart key, row (None for darts outside of the goal segments), column, added marks, score delta (or None)
+        self._log = []  # type: List[Tuple[Hashable, Union[int, None], int, int, Union[List[int], None]]]
+
+    def get(self, sector: int, player: Hashable) -> int:
+        return int(self.marks[self.rows[sector], self.columns[player]])
+
+    def get_score(self, player: Hashable) -> int:
+        return int(self.scores[self.columns[player]])
+
+    def is_closed(self, sector: int) -> bool:
+        return self.marks[self.rows[sector]].min() >= 3
+
+    def is_closed_by_all_opponents_of(self, player: Hashable, sector: int) -> bool:
+        return np.delete(self.marks[self.rows[sector]], self.columns[player]).min() >= 3
+
+    def has_closed_all(self, player: Hashable) -> bool:
+        return self.marks[:, self.columns[player]].min() >= 3
+
+    def is_leading(self, player: Hashable) -> bool:
+        # cut throat: the points go to the opponents, so the lowest score leads
+        leading = self.scores.min() if self.cut_throat else self.scores.max()
+        return self.scores[self.columns[player]] == leading
+
+    def add_dart(self, player: Hashable, dart_key: Hashable, segment: Segment):
+        row = self.rows.get(segment.sector)
+        column = self.columns[player]
+        added = 0
+        score_delta = None
+        if row is not None and self.marks[row].min() < 3:
+            multiplier = segment.bed.get_multiplier()
+            marks = self.marks[row]
+            for hit in range(multiplier):
+                marks[column] += 1
+                added += 1
+                if marks.min() >= 3:
+                    break
+            diff = min(multiplier, marks[column] - 3)
+            if diff > 0:
+                if self.cut_throat:
+                    # the player has more than 3 marks, so only the opponents can be below
+                    delta = np.where(marks < 3, diff * segment.sector, 0)
+                else:
+                    delta = np.zeros_like(self.scores)
+                    delta[column] = diff * segment.sector
+                self.scores += delta.astype(np.int32)
+                score_delta = delta.tolist()
+        self._log.append((dart_key, row, column, added, score_delta))
+
+    def remove_last_dart(self, dart_key: Hashable) -> bool:
+        """
+        reverts the last dart, returns False (and changes nothing) if that was not the given dart
+        """
+        if not self._log or self._log[-1][0] != dart_key:
+            return False
+        _, row, column, added, score_delta = self._log.pop()
+        if row is not None:
+            self.marks[row, column] -= added
+        if score_delta is not None:
+            self.scores -= np.array(score_delta, dtype=np.int32)
+        return True
+
+
+def cricket_take_result(marks: CricketMarks, player: Hashable, darts: int) -> Union[TakeResult, None]:
+    if marks.is_leading(player) and marks.has_closed_all(player):
+        return TakeResult.WIN
+    if darts > 2:
+        return TakeResult.FINISHED
+    return None
+
+
+class CricketEngine(GameEngine):
+    def __init__(self, players: Sequence[Hashable], cut_throat: bool = False, **kwargs):
+        self.cut_throat = cut_throat
+        super().__init__(players, **kwargs)
+
+    def new_leg_state(self) -> CricketMarks:
+        return CricketMarks(GOAL_SEGMENTS, self.players, self.cut_throat)
+
+    def get_score(self, player: Hashable) -> int:
+        return self.state.get_score(player)
+
+    def is_legal_finish(self, player: Hashable, segment: Segment) -> bool:
+        # only a dart that closes the last open goal segment of the player can win
+        marks = self.state
+        if segment.sector not in marks.rows or marks.get(segment.sector, player) >= 3:
+            return False
+        key = object()
+        marks.add_dart(player, key, segment)
+        legal = marks.is_leading(player) and marks.has_closed_all(player)
+        marks.remove_last_dart(key)
+        return legal
+
+    def _add_to_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.add_dart(take.player, key, segment)
+
+    def _remove_from_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.remove_last_dart(key)
+
+    def _take_result(self, take: EngineTake) -> Union[TakeResult, None]:
+        return cricket_take_result(self.state, take.player, len(take.darts))
+
+    def aim(self, player) -> Aim:
+        return cricket_aim(self.state, player, GOAL_SEGMENTS)
@@ -0,0 +1,195 @@
+"""
+in-memory rules engine of the games, without Qt, sound or the database.
+the ORM games in models.objects.games keep their scores in the same leg states and decide their takes
+with the same rule functions, so simulations on the engine play exactly the games of the application.
+"""
+from typing import List, Dict, Hashable, Sequence, Union
+
+from engine.types import TakeResult
+from models.board_geometry import Segment
+
+
+class EngineTake(object):
+    __slots__ = ('player', 'darts', 'result')
+
+    def __init__(self, player: Hashable):
+        self.player = player
+        self.darts = []  # type: List[Segment]
+        self.result = None  # type: Union[TakeResult, None]
+
+    def size(self) -> int:
+        return len(self.darts)
+
+    def get_score(self) -> int:
+        return sum(dart.score() for dart in self.darts)
+
+
+class _LegRecord(object):
+    """
+    everything a won leg changed, so undoing its last dart can go back into it
+    """
+    __slots__ = ('takes', 'state', 'leg_beginner', 'set_beginner', 'legs_won', 'sets_won', 'winner')
+
+    def __init__(self, engine: "GameEngine"):
+        self.takes = engine.takes
+        self.state = engine.state
+        self.leg_beginner = engine.leg_beginner
+        self.set_beginner = engine.set_beginner
+        self.legs_won = dict(engine.legs_won)
+        self.sets_won = dict(engine.sets_won)
+        self.winner = engine.winner
+
+    def restore(self, engine: "GameEngine"):
+        engine.takes = self.takes
+        engine.state = self.state
+        engine.leg_beginner = self.leg_beginner
+        engine.set_beginner = self.set_beginner
+        engine.legs_won = self.legs_won
+        engine.sets_won = self.sets_won
+        engine.winner = self.winner
+
+
+class GameEngine(object):
+    """
+    a match of sets and legs between any hashable players, one segment per dart.
+    subclasses implement the rules: the score state of a leg and when a take is over.
+    """
+    def __init__(self, players: Sequence[Hashable], legs_to_set: int = 3, sets_to_match: int = 1):
+        if not players:
+            raise ValueError('a game needs at least one player')
+        self.players = list(players)
+        self.legs_to_set = legs_to_set
+        self.sets_to_match = sets_to_match
+        self.legs_won = {player: 0 for player in self.players}  # type: Dict[Hashable, int]
+        self.sets_won = {player: 0 for player in self.players}  # type: Dict[Hashable, int]
+        self.set_beginner = 0
+        self.leg_beginner = 0
+        self.player_turn = 0
+        self.darts_left = 3
+        self.winner = None
+        self.takes = []  # type: List[EngineTake]
+        self.state = self.new_leg_state()
+        # per dart: new take?, player turn and darts left before the dart, _LegRecord if it won a leg
+        self._history = []  # type: List[tuple]
+
+    # rules
+
+    def new_leg_state(self):
+        raise NotImplementedError("You must implement this Method")
+
+    def get_score(self, player: Hashable) -> int:
+        raise NotImplementedError("You must implement this Method")
+
+    def is_legal_finish(self, player: Hashable, segment: Segment) -> bool:
+        """
+        whether the segment wins the leg for the player
+        """
+        raise NotImplementedError("You must implement this Method")
+
+    def _add_to_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        raise NotImplementedError("You must implement this Method")
+
+    def _remove_from_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        raise NotImplementedError("You must implement this Method. It reverts the last _add_to_state()")
+
+    def _take_result(self, take: EngineTake) -> Union[TakeResult, None]:
+        """
+        result of the take after its last dart, None if the player keeps throwing
+        """
+        raise NotImplementedError("You must implement this Method")
+
+    def _take_result_changed(self, take: EngineTake) -> None:
+        pass
+
+    def aim(self, player) -> "Aim":
+        """
+        aim point and intent of the next dart of the player (e.g. a PlayerProfile), see engine.strategies
+        """
+        raise NotImplementedError("You must implement this Method")
+
+    # match
+
+    def get_current_player(self) -> Hashable:
+        return self.players[self.player_turn]
+
+    def get_current_take(self) -> Union[EngineTake, None]:
+        return self.takes[-1] if self.takes else None
+
+    def get_scores(self) -> Dict[Hashable, int]:
+        return {player: self.get_score(player) for player in self.players}
+
+    def is_finished(self) -> bool:
+        return self.winner is not None
+
+    def dart_count(self) -> int:
+        return len(self._history)
+
+    def add_dart(self, segment: Segment) -> Union[TakeResult, None]:
+        """
+        throws a dart for the current player, returns the result of the take if the dart completed it
+        """
+        if self.winner is not None:
+            raise ValueError('the game is finished')
+        player = self.players[self.player_turn]
+        take = self.takes[-1] if self.takes else None
+        new_take = take is None or take.result is not None
+        if new_take:
+            take = EngineTake(player)
+            self.takes.append(take)
+        take.darts.append(segment)
+        self._add_to_state(take, segment, len(self._history))
+        record = [new_take, self.player_turn, self.darts_left, None]
+        self._history.append(record)
+        self.darts_left -= 1
+        result = self._take_result(take)
+        if result is not None:
+            take.result = result
+            self._take_result_changed(take)
+            if result == TakeResult.WIN:
+                record[3] = _LegRecord(self)
+                self._complete_leg(player)
+            else:
+                self._next_player()
+        return result
+
+    def undo(self) -> Union[Segment, None]:
+        """
+        reverts the last dart and everything it caused, returns its segment (None if there was no dart)
+        """
+        if not self._history:
+            return None
+        new_take, player_turn, darts_left, leg_record = self._history.pop()
+        if leg_record is not None:
+            leg_record.restore(self)
+        take = self.takes[-1]
+        if take.result is not None:
+            take.result = None
+            self._take_result_changed(take)
+        segment = take.darts.pop()
+        self._remove_from_state(take, segment, len(self._history))
+        if new_take:
+            self.takes.pop()
+        self.player_turn = player_turn
+        self.darts_left = darts_left
+        return segment
+
+    def _next_player(self) -> None:
+        self.player_turn = (self.player_turn + 1) % len(self.players)
+        self.darts_left = 3
+
+    def _complete_leg(self, winner: Hashable) -> None:
+        self.legs_won[winner] += 1
+        if self.legs_won[winner] == self.legs_to_set:
+            self.sets_won[winner] += 1
+            if self.sets_won[winner] == self.sets_to_match:
+                self.winner = winner
+                return
+            self.legs_won = {player: 0 for player in self.players}
+            self.set_beginner = (self.set_beginner + 1) % len(self.players)
+            self.leg_beginner = self.set_beginner
+        else:
+            self.leg_beginner = (self.leg_beginner + 1) % len(self.players)
+        self.takes = []
+        self.state = self.new_leg_state()
+        self.player_turn = self.leg_beginner
+        self.darts_left = 3
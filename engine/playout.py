@@ -0,0 +1,61 @@
+"""
+AI darts for many engines at once: every engine aims with its strategy, the hits of all of them are sampled
+and classified in one batch.
+"""
+from typing import List, Hashable, Tuple, Union, Callable, Dict
+
+import numpy as np
+
+from engine.game import GameEngine
+from engine.strategies import PlayerProfile
+from engine.types import DartIntent, TakeResult
+from engine.x01 import X01Engine
+from models import board_geometry
+
+ThrowResult = Tuple[Hashable, DartIntent, Union[TakeResult, None]]
+
+
+def throw_round(engines: List[GameEngine], rng: np.random.Generator) -> List[ThrowResult]:
+    """
+    throws one dart in every engine, returns player, intent and take result of each dart
+    """
+    players = [engine.get_current_player() for engine in engines]
+    aims = [engine.aim(player) for engine, player in zip(engines, players)]
+    hits = board_geometry.aim_darts_at([point for point, intent in aims],
+                                       [player.horizontal_deviation for player in players],
+                                       [player.vertical_deviation for player in players], rng)
+    labels = board_geometry.classify_labels(hits)
+    return [(player, intent, engine.add_dart(board_geometry.LABEL_SEGMENTS[label]))
+            for engine, player, (point, intent), label in zip(engines, players, aims, labels)]
+
+
+def x01_win_probabilities(players: List[PlayerProfile], scores: Dict[PlayerProfile, int], player_turn: int,
+                          darts_left: int, double_out: bool, playouts: int = 200, rng: np.random.Generator = None,
+                          cancelled: Callable[[], bool] = None, max_darts: int = 1000, take_score: int = 0) \
+        -> Union[List[float], None]:
+    """
+    chance of every player to win the running leg, estimated by playing it out from the remaining scores.
+    take_score is what the current player scored so far in the running take (see X01Engine.set_position).
+    returns None if cancelled() turned True before the playouts were done
+    """
+    if any(scores[player] <= 0 for player in players):
+        return [1.0 if scores[player] <= 0 else 0.0 for player in players]
+    if rng is None:
+        rng = np.random.default_rng()
+    engines = []
+    for _ in range(playouts):
+        engine = X01Engine(players, double_out=double_out, legs_to_set=1, sets_to_match=1)
+        engine.set_position(scores, player_turn, darts_left, take_score)
+        engines.append(engine)
+    wins = dict.fromkeys(players, 0)
+    active = engines
+    for _ in range(max_darts):
+        if not active:
+            break
+        if cancelled is not None and cancelled():
+            return None
+        for player, intent, result in throw_round(active, rng):
+            if result == TakeResult.WIN:
+                wins[player] += 1
+        active = [engine for engine in active if not engine.is_finished()]
+    return [wins[player] / float(playouts) for player in players]
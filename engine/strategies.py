@@ -0,0 +1,88 @@
+"""
+where the AI players aim. shared by the engines and generate_next_dart of the ORM games.
+players are anything with horizontal_deviation and vertical_deviation, e.g. a Player or a
+PlayerProfile
+"""
+from collections import namedtuple
+from typing import List, Hashable, Tuple
+
+import numpy as np
+
+from engine.types import DartIntent
+from logic.helper import LimitedSizeDict
+from models import board_geometry
+from models.aim_map import AimMap, get_aim_map
+from models.board_geometry import Segment, Bed
+from models.checkout_policy import get_checkout_policy
+from models.checkout_table import OutMode, get_checkout_table, is_finishing_segment
+
+PlayerProfile = namedtuple('PlayerProfile', ['name', 'horizontal_deviation', 'vertical_deviation',
+                                             'preferred_doubles'])
+
+Aim = Tuple[Tuple[float, float], DartIntent]
+
+
+def aim_point(segment: Segment) -> Tuple[float, float]:
+    try:
+        return board_geometry.SEGMENT_AIM_POINTS[segment]
+    except KeyError:
+        print('no aim point for', segment)
+        return 0.0, 0.0
+
+
+def x01_aim(score: int, double_out: bool, player, darts_left: int = 3) -> Aim:
+    if score > 100:
+        # scoring: aim where the expected score of this player is the highest
+        return get_aim_map(player.horizontal_deviation, player.vertical_deviation).best_aim_point(), DartIntent.SCORE
+    mode = OutMode.from_double_out(double_out)
+    # the segment with the best chance to finish in this take, for this player's spread
+    segment, _ = get_checkout_policy(player.horizontal_deviation, player.vertical_deviation, mode).get_aim(
+        score, darts_left)
+    if segment is None:
+        # no way to finish in this take, leave the easiest finish for the next one
+        segment = get_checkout_table().get_setup(score, mode) or board_geometry.MISS
+    elif segment.score() == score and is_finishing_segment(segment, mode):
+        return aim_point(segment), DartIntent.CHECKOUT
+    return aim_point(segment), DartIntent.SETUP
+
+
+def cricket_target_sectors(marks: "CricketMarks", player: Hashable, goal_segments: List[int]) -> List[int]:
+    if marks.is_leading(player):
+        # player is leading -> close remaining segments
+        sectors = [gs for gs in goal_segments if not marks.get(gs, player) > 2]
+    elif marks.cut_throat:
+        # player is behind -> find scoring segment to attack the leading player
+        best_player = min(marks.columns, key=marks.get_score)
+        sectors = [gs for gs in goal_segments if not marks.get(gs, best_player) > 2]
+    else:
+        # player is behind -> find highest possible scoring segment
+        sectors = [gs for gs in goal_segments if not marks.is_closed_by_all_opponents_of(player, gs)]
+    return sectors if sectors else goal_segments
+
+
+def _sectors_aim_map(h_dev_mm: float, v_dev_mm: float, sectors: List[int]) -> AimMap:
+    # the points of every segment of the sectors worth going for, all other segments are worthless
+    values = np.where(np.isin(board_geometry.LABEL_SECTORS, sectors), board_geometry.LABEL_SCORES, 0)
+    return get_aim_map(h_dev_mm, v_dev_mm, values)
+
+
+def cricket_aim_map(marks: "CricketMarks", player, goal_segments: List[int]) -> AimMap:
+    return _sectors_aim_map(player.horizontal_deviation, player.vertical_deviation,
+                            cricket_target_sectors(marks, player, goal_segments))
+
+
+# there are only 2^7 sets of target sectors, so the best aim point of each is kept long after its aim map is gone
+_cricket_aims = LimitedSizeDict(size_limit=1024)
+
+
+def cricket_aim(marks: "CricketMarks", player, goal_segments: List[int]) -> Aim:
+    sectors = tuple(cricket_target_sectors(marks, player, goal_segments))
+    key = (player.horizontal_deviation, player.vertical_deviation, sectors)
+    if key not in _cricket_aims:
+        _cricket_aims[key] = _sectors_aim_map(player.horizontal_deviation, player.vertical_deviation,
+                                              list(sectors)).best_aim_point()
+    return _cricket_aims[key], DartIntent.CHECKOUT
+
+
+def around_the_clock_aim(target: int) -> Aim:
+    return aim_point(Segment(target, Bed.OUTER_SINGLE)), DartIntent.CHECKOUT
@@ -0,0 +1,24 @@
+import enum
+
+
+class StringEnum(enum.Enum):
+    @classmethod
+    def from_str(cls, val: str):
+        return cls[val]
+
+    def __str__(self):
+        return self.name
+
+
+class DartIntent(StringEnum):
+    SCORE = 'SCORE'
+    SETUP = 'SETUP'
+    CHECKOUT = 'CHECKOUT'
+
+
+class TakeResult(StringEnum):
+    WIN = 'WIN'
+    BUST = 'BUST'
+    UNFINISHED = 'UNFINISHED'
+    FINISHED = 'FINISHED'
+    CHECK_IN = 'CHECK_IN'
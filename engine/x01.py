@@ -0,0 +1,117 @@
+from typing import Dict, Hashable, Sequence, Set, Union
+
+from engine.game import GameEngine, EngineTake
+from engine.strategies import Aim, x01_aim
+from engine.types import TakeResult
+from models import board_geometry
+from models.board_geometry import Segment, Bed
+
+
+class X01Scores(object):
+    """
+    remaining scores of the players in one leg, updated dart by dart.
+    takes are identified by any hashable key, the darts of busted takes do not count
+    """
+    def __init__(self, start_score: int, players: Sequence[Hashable]):
+        self.start_score = start_score
+        self.scores = {player: start_score for player in players}  # type: Dict[Hashable, int]
+        self._take_scores = {}  # type: Dict[Hashable, int]
+        self._busted = set()  # type: Set[Hashable]
+
+    def add_dart(self, take_key: Hashable, player: Hashable, score: int):
+        self._take_scores[take_key] = self._take_scores.get(take_key, 0) + score
+        if take_key not in self._busted:
+            self.scores[player] -= score
+
+    def remove_dart(self, take_key: Hashable, player: Hashable, score: int):
+        self._take_scores[take_key] = self._take_scores.get(take_key, 0) - score
+        if take_key not in self._busted:
+            self.scores[player] += score
+
+    def continue_take(self, take_key: Hashable, score: int):
+        """
+        counts score as thrown in the take before the remaining scores were taken over, so a bust of the take
+        still goes back to the score it started from
+        """
+        self._take_scores[take_key] = score
+
+    def set_busted(self, take_key: Hashable, player: Hashable, busted: bool):
+        if busted and take_key not in self._busted:
+            self._busted.add(take_key)
+            self.scores[player] += self._take_scores.get(take_key, 0)
+        elif not busted and take_key in self._busted:
+            self._busted.remove(take_key)
+            self.scores[player] -= self._take_scores.get(take_key, 0)
+
+
+def x01_take_result(score: int, last_segment: Segment, darts: int, double_out: bool) -> Union[TakeResult, None]:
+    """
+    result of a take with the remaining score after its last dart, None if the take goes on
+    """
+    if score < 0 or (double_out and (score == 1 or (score == 0 and last_segment.bed != Bed.DOUBLE))):
+        # with double out, 1 can never be finished
+        return TakeResult.BUST
+    if score == 0:
+        return TakeResult.WIN
+    if darts > 2:
+        return TakeResult.FINISHED
+    return None
+
+
+def is_x01_finish(score: int, segment: Segment, double_out: bool) -> bool:
+    return segment.score() == score and (not double_out or segment.bed == Bed.DOUBLE)
+
+
+class X01Engine(GameEngine):
+    def __init__(self, players: Sequence[Hashable], x: int = 3, double_out: bool = True, **kwargs):
+        self.x = x
+        self.double_out = double_out
+        self.start_score = x * 100 + 1
+        super().__init__(players, **kwargs)
+
+    def new_leg_state(self) -> X01Scores:
+        return X01Scores(self.start_score, self.players)
+
+    def get_score(self, player: Hashable) -> int:
+        return self.state.scores[player]
+
+    def is_legal_finish(self, player: Hashable, segment: Segment) -> bool:
+        return is_x01_finish(self.state.scores[player], segment, self.double_out)
+
+    def _add_to_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.add_dart(take, take.player, segment.score())
+
+    def _remove_from_state(self, take: EngineTake, segment: Segment, key: int) -> None:
+        self.state.remove_dart(take, take.player, segment.score())
+
+    def _take_result(self, take: EngineTake) -> Union[TakeResult, None]:
+        return x01_take_result(self.state.scores[take.player], take.darts[-1], len(take.darts), self.double_out)
+
+    def _take_result_changed(self, take: EngineTake) -> None:
+        self.state.set_busted(take, take.player, take.result == TakeResult.BUST)
+
+    def set_position(self, scores: Dict[Hashable, int], player_turn: int, darts_left: int = 3,
+                     take_score: int = 0) -> None:
+        """
+        continues a leg from the remaining scores, e.g. to play out the rest of a running leg.
+        the darts already thrown in the current take scored take_score together, a bust resets the player to
+        the score the take started from
+        """
+        if darts_left <= 0:
+            # the take is over, but the next player has not been called yet
+            player_turn = (player_turn + 1) % len(self.players)
+            darts_left = 3
+        self.state = self.new_leg_state()
+        self.state.scores.update(scores)
+        self.takes = []
+        self.player_turn = player_turn
+        self.darts_left = darts_left
+        if darts_left < 3:
+            take = EngineTake(self.players[player_turn])
+            take.darts.extend([board_geometry.MISS] * (3 - darts_left))
+            self.state.continue_take(take, take_score)
+            self.takes.append(take)
+        self._history = []
+
+    def aim(self, player) -> Aim:
+        return x01_aim(self.state.scores[player], self.double_out, player, self.darts_left)
@@ -1,3 +1,17 @@
+import enum
+
+
+class Durability(enum.Enum):
+    """
+    when changes to the game are committed to the database. the later, the fewer (slow) disk syncs per dart,
+    but the more is lost in a crash. changes that are not committed yet are committed on a timer
+    (Settings.WRITE_BEHIND_INTERVAL_MS) and on shutdown
+    """
+    FULL = 0  # every change at once
+    TAKE = 1  # when a take is completed
+    LEG = 2  # when a leg, set or game is completed or started
+
+
 class SmartSetting(object):
     def __init__(self, value):
         self._value = value
@@ -24,3 +38,11 @@ class Settings(object):
     SOUND_ENABLED = SmartSetting(False)
     DISPLAY_DARTS = SmartSetting(True)
     DRAG_DARTS_ENABLED = SmartSetting(False)
+    DISPLAY_AIM_MAP = SmartSetting(False)
+    # replay every leg after each incremental score update and report differences (slow, for debugging)
+    VERIFY_LEG_SCORES = SmartSetting(False)
+    # anything but FULL keeps the latest changes in an open transaction (write behind), see Durability
+    DATABASE_DURABILITY = SmartSetting(Durability.FULL)
+    WRITE_BEHIND_INTERVAL_MS = SmartSetting(2000)
+    # one of database.pragmas.PRAGMA_PROFILES, used for every new database connection
+    DATABASE_PRAGMA_PROFILE = SmartSetting('safe')
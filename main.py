@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QStatusBar, QLabel, QMenu
 
 from controllers.main_controller import MainController
 from logic.settings import Settings
+from models.checkout_table import get_checkout_table
 from widgets.active_game_widget import ActiveGameWidget
 from widgets.dialogs import PlayerSelectionDialog, GameSelectionDialog
 
@@ -19,6 +20,7 @@ class App(QMainWindow):
 
     generate_request = pyqtSignal()
     take_back_request = pyqtSignal()
+    redo_request = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -42,6 +44,9 @@ class App(QMainWindow):
                                   self.sound_toggled, default=Settings.SOUND_ENABLED.get())
         self.create_toggle_button('dart_dot_toggle', QIcon('img/dart.png'), QIcon('img/dot.png'),
                                   self.dart_dot_toggled, default=Settings.DISPLAY_DARTS.get())
+        self.create_toggle_button('aim_map_toggle', QIcon('img/target-icon.png'), QIcon('img/target-icon.png'),
+                                  self.aim_map_toggled, default=Settings.DISPLAY_AIM_MAP.get())
+        self.aim_map_toggle.setToolTip('Show the expected score of every aim point for the current player')
 
         self.mqtt_status_icon = QLabel()
         self.mqtt_status_icon.setPixmap(QPixmap("img/mqtt_off.png"))
@@ -108,6 +113,9 @@ class App(QMainWindow):
         Settings.DISPLAY_DARTS.set(status)
         # TODO: update_game
 
+    def aim_map_toggled(self, status: bool):
+        Settings.DISPLAY_AIM_MAP.set(status)
+
     def mqtt_status_changed(self, data: dict):
         connected = data.get('connected', False)
         host = data.get('host', None)
@@ -138,6 +146,7 @@ class App(QMainWindow):
 
         self.generate_request.connect(self.game_controller.generate_dart)
         self.take_back_request.connect(self.game_controller.request_takeback)
+        self.redo_request.connect(self.game_controller.request_redo)
 
         # dialogs
 
@@ -149,6 +158,8 @@ class App(QMainWindow):
             self.generate_request.emit()
         elif event.key() == Qt.Key_Backspace:
             self.take_back_request.emit()
+        elif event.key() == Qt.Key_R:
+            self.redo_request.emit()
         elif event.key() == Qt.Key_Control:
             Settings.DRAG_DARTS_ENABLED.set(False)
 
@@ -156,12 +167,12 @@ class App(QMainWindow):
         if event.key() == Qt.Key_Control:
             Settings.DRAG_DARTS_ENABLED.set(True)
 
-    def show_selection_dialog(self, title, games, result_function):
+    def show_selection_dialog(self, title, load_page, result_function):
 
-        def game_selected(game):
-            result_function(game)
+        def game_selected(game_id):
+            result_function(game_id)
 
-        gs_diag = GameSelectionDialog(title, games, parent=self)
+        gs_diag = GameSelectionDialog(title, load_page, parent=self)
         gs_diag.game_selected.connect(game_selected)
         gs_diag.exec_()
         # game_info = {game.__repr__(): game for game in games}
@@ -197,6 +208,8 @@ class App(QMainWindow):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    # build or load the checkout table before the first AI dart needs it
+    get_checkout_table()
     ex = App()
     app.aboutToQuit.connect(lambda: sys.exit(0))
     sys.exit(app.exec_())
@@ -0,0 +1,95 @@
+"""
+expected value of aiming at every point of the board for a player with a gaussian spread.
+the value raster of the board (e.g. the score of every segment) is convolved with the player's
+throwing distribution via FFT, so the best aim point of a player is a single lookup afterwards.
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+
+from constants import RADIUS_OUTER_DOUBLE_MM, OFFSET_FROM_ORIGIN_MM
+from logic.helper import LimitedSizeDict
+from models import board_geometry
+
+RESOLUTION_MM = 1.0
+# same square the dartboard widget draws: the board plus OFFSET_FROM_ORIGIN_MM on every side
+ORIGIN_MM = -OFFSET_FROM_ORIGIN_MM
+SIDE_MM = 2 * (RADIUS_OUTER_DOUBLE_MM + OFFSET_FROM_ORIGIN_MM)
+MIN_DEVIATION_MM = 0.5
+
+_label_raster = None
+
+
+def get_label_raster() -> np.ndarray:
+    """
+    segment label (see board_geometry.LABEL_SEGMENTS) of the center of every raster cell, indexed [row (y), column (x)]
+    """
+    global _label_raster
+    if _label_raster is None:
+        cells = int(round(SIDE_MM / RESOLUTION_MM))
+        centers = ORIGIN_MM + (np.arange(cells) + 0.5) * RESOLUTION_MM
+        xs, ys = np.meshgrid(centers, centers)
+        _label_raster = board_geometry.classify_labels(np.stack((xs.ravel(), ys.ravel()), axis=-1)).reshape(
+            cells, cells)
+    return _label_raster
+
+
+def cell_center(row: int, column: int) -> Tuple[float, float]:
+    return float(ORIGIN_MM + (column + 0.5) * RESOLUTION_MM), float(ORIGIN_MM + (row + 0.5) * RESOLUTION_MM)
+
+
+def gaussian_kernel(h_dev_mm: float, v_dev_mm: float) -> np.ndarray:
+    sigma_x = max(h_dev_mm, MIN_DEVIATION_MM) / RESOLUTION_MM
+    sigma_y = max(v_dev_mm, MIN_DEVIATION_MM) / RESOLUTION_MM
+    kx = np.arange(-math.ceil(4 * sigma_x), math.ceil(4 * sigma_x) + 1)
+    ky = np.arange(-math.ceil(4 * sigma_y), math.ceil(4 * sigma_y) + 1)
+    kernel = np.outer(np.exp(-ky * ky / (2 * sigma_y * sigma_y)), np.exp(-kx * kx / (2 * sigma_x * sigma_x)))
+    return kernel / kernel.sum()
+
+
+def fft_convolve(raster: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    linear convolution, cropped to the size of the raster. everything outside of the raster counts as zero
+    """
+    shape = (raster.shape[0] + kernel.shape[0] - 1, raster.shape[1] + kernel.shape[1] - 1)
+    full = np.fft.irfft2(np.fft.rfft2(raster, shape) * np.fft.rfft2(kernel, shape), shape)
+    top, left = (kernel.shape[0] - 1) // 2, (kernel.shape[1] - 1) // 2
+    return full[top:top + raster.shape[0], left:left + raster.shape[1]]
+
+
+class AimMap(object):
+    def __init__(self, h_dev_mm: float, v_dev_mm: float, label_values: np.ndarray):
+        self.h_dev_mm = h_dev_mm
+        self.v_dev_mm = v_dev_mm
+        self.expected = fft_convolve(np.asarray(label_values, dtype=np.float64)[get_label_raster()],
+                                     gaussian_kernel(h_dev_mm, v_dev_mm))
+        row, column = np.unravel_index(np.argmax(self.expected), self.expected.shape)
+        self.best_aim = cell_center(row, column)
+        self.best_value = float(self.expected[row, column])
+
+    def best_aim_point(self) -> Tuple[float, float]:
+        return self.best_aim
+
+    def expected_value_at(self, x: float, y: float) -> float:
+        column = int((x - ORIGIN_MM) // RESOLUTION_MM)
+        row = int((y - ORIGIN_MM) // RESOLUTION_MM)
+        if 0 <= row < self.expected.shape[0] and 0 <= column < self.expected.shape[1]:
+            return float(self.expected[row, column])
+        return 0.0
+
+
+_cache = LimitedSizeDict(size_limit=32)
+
+
+def get_aim_map(h_dev_mm: float, v_dev_mm: float, label_values: np.ndarray = None) -> AimMap:
+    """
+    cached aim map for the given deviations. label_values assigns a value to every entry of
+    board_geometry.LABEL_SEGMENTS and defaults to the score of the segment.
+    """
+    if label_values is None:
+        label_values = board_geometry.LABEL_SCORES
+    key = (round(h_dev_mm, 1), round(v_dev_mm, 1), tuple(np.asarray(label_values).tolist()))
+    if key not in _cache:
+        _cache[key] = AimMap(key[0], key[1], label_values)
+    return _cache[key]
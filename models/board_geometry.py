@@ -0,0 +1,261 @@
+"""
+Qt-free geometry and scoring core of the dartboard.
+board coordinates are millimetres with the origin in the top left corner of the board's bounding square,
+so the bull's eye is at (RADIUS_OUTER_DOUBLE_MM, RADIUS_OUTER_DOUBLE_MM) and y grows downwards.
+models.dartboard wraps this module for the Qt side (QPointF, QPainterPath).
+"""
+import math
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from enum import Enum
+from typing import List, Dict, Tuple, Union
+
+import numpy as np
+
+from constants import *
+
+
+class Bed(Enum):
+    NONE = 0
+    SINGLE = 1
+    INNER_SINGLE = 2
+    OUTER_SINGLE = 3
+    DOUBLE = 4
+    TRIPLE = 5
+
+    __multipliers__ = {NONE: 0, SINGLE: 1, INNER_SINGLE: 1, OUTER_SINGLE: 1, DOUBLE: 2, TRIPLE: 3}
+
+    def get_multiplier(self):
+        return Bed.__multipliers__[self.value]
+
+
+class Segment(object):
+    def __init__(self, sector: int, bed: Bed):
+        self.sector = sector
+        self.bed = bed
+
+    @staticmethod
+    def from_json(json: dict):
+        return Segment(json['number'], Bed[json['bed']])
+
+    def to_json(self):
+        return {'number': self.sector, 'bed': self.bed.name}
+
+    def score(self):
+        return self.sector * self.bed.get_multiplier()
+
+    def __str__(self):
+        return '%s %s' % (self.bed.name, self.sector)
+
+    def __eq__(self, other):
+        return self.sector == other.sector and self.bed == other.bed
+
+    def __hash__(self):
+        return ('%s%s' % (self.sector, self.bed)).__hash__()
+
+
+CENTER_MM = RADIUS_OUTER_DOUBLE_MM
+# ring radii from the center outwards, together with the bed each ring maps to
+RING_RADII = [RADIUS_INNER_BULL_MM, RADIUS_OUTER_BULL_MM, RADIUS_INNER_TRIPLE_MM, RADIUS_OUTER_TRIPLE_MM,
+              RADIUS_INNER_DOUBLE_MM, RADIUS_OUTER_DOUBLE_MM]
+RING_BEDS = [Bed.DOUBLE, Bed.SINGLE, Bed.INNER_SINGLE, Bed.TRIPLE, Bed.OUTER_SINGLE, Bed.DOUBLE]
+SECTOR_ANGLE = 360.0 / len(SECTOR_ORDER)
+FIRST_SECTOR_START_ANGLE = 90.0 - SECTOR_ANGLE / 2.0  # 20 is centered at the top
+
+# lookup tables for the vectorized hit-test, indexed by ring (the last entry is a miss)
+_RING_RADII_ARRAY = np.array(RING_RADII)
+_RING_BED_VALUES = np.array([bed.value for bed in RING_BEDS] + [Bed.NONE.value])
+_RING_MULTIPLIERS = np.array([bed.get_multiplier() for bed in RING_BEDS] + [0])
+_SECTOR_ORDER_ARRAY = np.array(SECTOR_ORDER)
+
+ThrowResults = namedtuple('ThrowResults', ['sectors', 'beds', 'multipliers', 'scores'])
+
+MISS = Segment(0, Bed.NONE)
+_BULLS = [Segment(25, Bed.DOUBLE), Segment(25, Bed.SINGLE)]
+# sector index -> ring index -> segment
+RING_SEGMENTS = [_BULLS + [Segment(sector, bed) for bed in RING_BEDS[2:]]
+                 for sector in SECTOR_ORDER]  # type: List[List[Segment]]
+
+# every distinct segment gets a small integer label (0 is a miss), so rasters and tables can be plain arrays
+LABEL_SEGMENTS = [MISS] + _BULLS + [segment for segments in RING_SEGMENTS
+                                    for segment in segments[2:]]  # type: List[Segment]
+LABELS = {segment: label for label, segment in enumerate(LABEL_SEGMENTS)}  # type: Dict[Segment, int]
+LABEL_SCORES = np.array([segment.score() for segment in LABEL_SEGMENTS])
+LABEL_SECTORS = np.array([segment.sector for segment in LABEL_SEGMENTS])
+LABEL_BED_VALUES = np.array([segment.bed.value for segment in LABEL_SEGMENTS])
+LABEL_MULTIPLIERS = np.array([segment.bed.get_multiplier() for segment in LABEL_SEGMENTS])
+_RINGS_PER_SECTOR = len(RING_RADII) - 2
+
+
+def _build_available_segments_for_score() -> Dict[int, List[Segment]]:
+    available = defaultdict(list)
+    available[25].append(Segment(25, Bed.SINGLE))
+    available[50].append(Segment(25, Bed.DOUBLE))
+    for sector in SECTOR_ORDER:
+        available[sector].append(Segment(sector, Bed.OUTER_SINGLE))
+        available[sector * 2].append(Segment(sector, Bed.DOUBLE))
+        available[sector * 3].append(Segment(sector, Bed.TRIPLE))
+    return available
+
+
+AVAILABLE_SEGMENTS_FOR_SCORE = _build_available_segments_for_score()
+
+
+def annular_sector_centroid(radius1: float, radius2: float, start_angle: float, angle: float) -> Tuple[float, float]:
+    """
+    area centroid of the ring part between radius1 and radius2, spanning angle degrees counter-clockwise from
+    start_angle, in board coordinates
+    """
+    half = math.radians(angle) / 2.0
+    mid = math.radians(start_angle) + half
+    distance = 2.0 / 3.0 * (radius2 ** 3 - radius1 ** 3) / (radius2 ** 2 - radius1 ** 2) * math.sin(half) / half
+    return CENTER_MM + distance * math.cos(mid), CENTER_MM - distance * math.sin(mid)
+
+
+def _polar_point(radius: float, angle: float) -> Tuple[float, float]:
+    return CENTER_MM + radius * math.cos(math.radians(angle)), CENTER_MM - radius * math.sin(math.radians(angle))
+
+
+def _build_segment_points() -> Tuple[Dict[Segment, Tuple[float, float]], Dict[Segment, Tuple[float, float]]]:
+    """
+    centroid and aim point of every segment. the aim point is the middle of the bed in polar coordinates,
+    which stays inside of the bed even where the centroid of a narrow arc does not (e.g. the single bull's ring)
+    """
+    centroids = {}
+    aim_points = {}
+    single_bull_radius = (RADIUS_INNER_BULL_MM + RADIUS_OUTER_BULL_MM) / 2.0
+    centroids[Segment(25, Bed.DOUBLE)] = aim_points[Segment(25, Bed.DOUBLE)] = (CENTER_MM, CENTER_MM)
+    centroids[Segment(25, Bed.SINGLE)] = (CENTER_MM, CENTER_MM)
+    aim_points[Segment(25, Bed.SINGLE)] = _polar_point(single_bull_radius, 90.0)  # straight above the bull's eye
+    for i, sector in enumerate(SECTOR_ORDER):
+        start_angle = FIRST_SECTOR_START_ANGLE + i * SECTOR_ANGLE
+        for ring in range(len(_BULLS), len(RING_RADII)):
+            segment = RING_SEGMENTS[i][ring]
+            radius1, radius2 = RING_RADII[ring - 1], RING_RADII[ring]
+            centroids[segment] = annular_sector_centroid(radius1, radius2, start_angle, SECTOR_ANGLE)
+            aim_points[segment] = _polar_point((radius1 + radius2) / 2.0, start_angle + SECTOR_ANGLE / 2.0)
+        # a plain single is aimed at the bigger outer single bed
+        centroids[Segment(sector, Bed.SINGLE)] = centroids[Segment(sector, Bed.OUTER_SINGLE)]
+        aim_points[Segment(sector, Bed.SINGLE)] = aim_points[Segment(sector, Bed.OUTER_SINGLE)]
+    for bed in [Bed.INNER_SINGLE, Bed.OUTER_SINGLE]:
+        centroids[Segment(25, bed)] = centroids[Segment(25, Bed.SINGLE)]
+        aim_points[Segment(25, bed)] = aim_points[Segment(25, Bed.SINGLE)]
+    return centroids, aim_points
+
+
+SEGMENT_CENTROIDS, SEGMENT_AIM_POINTS = _build_segment_points()
+
+_default_rng = np.random.default_rng()
+
+
+def classify(x: float, y: float) -> Segment:
+    dx = x - CENTER_MM
+    dy = CENTER_MM - y  # board coordinates grow downwards
+    # a point on a wire belongs to the outer ring, just like with the painter paths
+    ring = bisect_right(RING_RADII, math.hypot(dx, dy))
+    if ring >= len(RING_RADII):
+        return MISS
+    angle = math.degrees(math.atan2(dy, dx))
+    sector_index = int(((angle - FIRST_SECTOR_START_ANGLE) % 360.0) // SECTOR_ANGLE) % len(SECTOR_ORDER)
+    return RING_SEGMENTS[sector_index][ring]
+
+
+def _rings_and_sector_indices(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    dx = points[:, 0] - CENTER_MM
+    dy = CENTER_MM - points[:, 1]
+    rings = np.searchsorted(_RING_RADII_ARRAY, np.hypot(dx, dy), side='right')
+    angles = np.degrees(np.arctan2(dy, dx))
+    sector_indices = (((angles - FIRST_SECTOR_START_ANGLE) % 360.0) // SECTOR_ANGLE).astype(int) % len(SECTOR_ORDER)
+    return rings, sector_indices
+
+
+def classify_many(points: np.ndarray) -> ThrowResults:
+    """
+    classifies an (N, 2) array of board coordinates in one pass.
+    beds are returned as Bed values, use Bed(value) to get the enum member back.
+    """
+    rings, sector_indices = _rings_and_sector_indices(points)
+    sectors = np.where(rings < 2, 25, _SECTOR_ORDER_ARRAY[sector_indices])
+    sectors[rings >= len(RING_RADII)] = 0
+    multipliers = _RING_MULTIPLIERS[rings]
+    return ThrowResults(sectors, _RING_BED_VALUES[rings], multipliers, sectors * multipliers)
+
+
+def classify_labels(points: np.ndarray) -> np.ndarray:
+    """
+    like classify_many, but returns the index into LABEL_SEGMENTS for every point
+    """
+    rings, sector_indices = _rings_and_sector_indices(points)
+    labels = 1 + len(_BULLS) + sector_indices * _RINGS_PER_SECTOR + (rings - len(_BULLS))
+    labels[rings < len(_BULLS)] = 1 + rings[rings < len(_BULLS)]
+    labels[rings >= len(RING_RADII)] = 0
+    return labels.astype(np.uint8)
+
+
+def distance_to_wire(x: float, y: float) -> float:
+    dx = x - CENTER_MM
+    dy = CENTER_MM - y
+    radius = math.hypot(dx, dy)
+    distance = min(abs(radius - ring_radius) for ring_radius in RING_RADII)
+    if RADIUS_OUTER_BULL_MM <= radius <= RADIUS_OUTER_DOUBLE_MM:
+        offset = (math.degrees(math.atan2(dy, dx)) - FIRST_SECTOR_START_ANGLE) % SECTOR_ANGLE
+        offset = min(offset, SECTOR_ANGLE - offset)
+        distance = min(distance, radius * math.sin(math.radians(offset)))
+    return distance
+
+
+def distances_to_wire(points: np.ndarray) -> np.ndarray:
+    """
+    vectorized distance_to_wire for an (N, 2) array of board coordinates
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    dx = points[:, 0] - CENTER_MM
+    dy = CENTER_MM - points[:, 1]
+    radii = np.hypot(dx, dy)
+    distances = np.abs(radii[:, np.newaxis] - _RING_RADII_ARRAY).min(axis=1)
+    offsets = (np.degrees(np.arctan2(dy, dx)) - FIRST_SECTOR_START_ANGLE) % SECTOR_ANGLE
+    offsets = np.minimum(offsets, SECTOR_ANGLE - offsets)
+    between_wires = (radii >= RADIUS_OUTER_BULL_MM) & (radii <= RADIUS_OUTER_DOUBLE_MM)
+    return np.where(between_wires, np.minimum(distances, radii * np.sin(np.radians(offsets))), distances)
+
+
+def aim_darts_at(aim_points: np.ndarray, h_dev_mm: Union[float, np.ndarray], v_dev_mm: Union[float, np.ndarray],
+                 rng: np.random.Generator = None) -> np.ndarray:
+    """
+    hit locations (N, 2) of darts aimed at an (N, 2) array of points with gaussian deviations,
+    given as scalars or one per dart. pass a seeded generator for reproducible throws.
+    """
+    aim_points = np.asarray(aim_points, dtype=np.float64).reshape(-1, 2)
+    if rng is None:
+        rng = _default_rng
+    deviations = np.stack(np.broadcast_arrays(np.asarray(h_dev_mm, dtype=np.float64),
+                                              np.asarray(v_dev_mm, dtype=np.float64)), axis=-1)
+    return aim_points + rng.standard_normal(aim_points.shape) * deviations
+
+
+def get_segments_for_score(score: int) -> List[Segment]:
+    return AVAILABLE_SEGMENTS_FOR_SCORE.get(score, [])
+
+
+def easiest_segment_for_score(score: int) -> Segment:
+    try:
+        scores = {segment.bed: segment for segment in get_segments_for_score(score)}
+        for bed in [Bed.OUTER_SINGLE, Bed.SINGLE, Bed.INNER_SINGLE, Bed.DOUBLE, Bed.TRIPLE]:
+            try:
+                return scores[bed]
+            except KeyError:
+                pass
+        return list(scores.values())[0]
+    except IndexError:
+        return Segment(0, Bed.NONE)
+
+
+def parse_location(value: str) -> Tuple[float, float]:
+    """
+    parses a hit- or target-location as stored by database.types.SQLPointF ('x,y'), without going through QPointF
+    """
+    if not value:
+        return 0.0, 0.0
+    x, y = value.split(',')
+    return float(x), float(y)
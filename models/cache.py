@@ -0,0 +1,36 @@
+"""
+files that are computed once and reused by every later run (label raster, checkout and x01 tables).
+they live in the cache directory of the project, so they never land in whatever directory the app is started from,
+and are written under a unique temporary name first: processes building the same file at once (like the workers
+of the simulator) each replace it with a complete file of their own.
+"""
+import os
+import tempfile
+from typing import Callable
+
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(CACHE_DIRECTORY, name)
+
+
+def write_atomically(path: str, write: Callable[[str], None]) -> None:
+    """
+    calls write with a temporary path next to path and moves the result to path once it is written completely
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # same suffix, numpy would append its own extension to a path without it
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.',
+                                            suffix=os.path.splitext(path)[1])
+    os.close(descriptor)
+    try:
+        # mkstemp makes the file private to the user
+        os.chmod(tmp_path, 0o644)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
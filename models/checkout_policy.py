@@ -0,0 +1,110 @@
+"""
+skill aware x01 finishing: for a player with a gaussian spread, the segment to aim at for every remaining score and
+number of darts left in the take, so that the chance of finishing in this take is the highest.
+misses and busts are part of the outcomes, a bust ends the take without a finish.
+the policy is computed once per deviation bucket and out mode, every lookup afterwards is a list index.
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from logic.helper import LimitedSizeDict
+from models import board_geometry
+from models.aim_map import get_label_raster, ORIGIN_MM, RESOLUTION_MM, MIN_DEVIATION_MM
+from models.board_geometry import Segment
+from models.checkout_table import OutMode, is_finishing_segment, MAX_DARTS, MAX_SCORE
+
+# deviations are rounded to this, players closer than that share a policy
+DEVIATION_BUCKET_MM = 1.0
+# every segment can be aimed at, at the point the AI players aim at for it
+AIM_SEGMENTS = [segment for segment in board_geometry.LABEL_SEGMENTS[1:]
+                if segment in board_geometry.SEGMENT_AIM_POINTS]  # type: List[Segment]
+
+
+def hit_probabilities(h_dev_mm: float, v_dev_mm: float) -> np.ndarray:
+    """
+    [aim segment, label] the chance to hit the segment of the label (see board_geometry.LABEL_SEGMENTS)
+    when aiming at each of AIM_SEGMENTS. everything landing off the raster is a miss
+    """
+    labels = get_label_raster()
+    centers = ORIGIN_MM + (np.arange(labels.shape[0]) + 0.5) * RESOLUTION_MM
+    sigma_x = max(h_dev_mm, MIN_DEVIATION_MM)
+    sigma_y = max(v_dev_mm, MIN_DEVIATION_MM)
+    flat_labels = labels.ravel()
+    probabilities = np.zeros((len(AIM_SEGMENTS), len(board_geometry.LABEL_SEGMENTS)))
+    for i, segment in enumerate(AIM_SEGMENTS):
+        x, y = board_geometry.SEGMENT_AIM_POINTS[segment]
+        # the 2d gaussian is separable, so the weight of a cell is the product of its column and row weight
+        wx = np.exp(-(centers - x) ** 2 / (2 * sigma_x * sigma_x)) * RESOLUTION_MM / (sigma_x * math.sqrt(2 * math.pi))
+        wy = np.exp(-(centers - y) ** 2 / (2 * sigma_y * sigma_y)) * RESOLUTION_MM / (sigma_y * math.sqrt(2 * math.pi))
+        probabilities[i] = np.bincount(flat_labels, np.outer(wy, wx).ravel(), minlength=probabilities.shape[1])
+    probabilities[:, 0] += np.clip(1.0 - probabilities.sum(axis=1), 0.0, None)
+    return probabilities
+
+
+class CheckoutPolicy(object):
+    def __init__(self, h_dev_mm: float, v_dev_mm: float, mode: OutMode):
+        self.h_dev_mm = h_dev_mm
+        self.v_dev_mm = v_dev_mm
+        self.mode = mode
+        hits = hit_probabilities(h_dev_mm, v_dev_mm)
+        label_scores = board_geometry.LABEL_SCORES
+        finishing = np.array([is_finishing_segment(segment, mode) and segment.score() > 0
+                              for segment in board_geometry.LABEL_SEGMENTS])
+        scores = np.arange(MAX_SCORE + 1)
+        rests = scores[:, np.newaxis] - label_scores[np.newaxis, :]  # [score, label]
+        # with double or master out a rest of 1 can't be finished, the engines count it as a bust
+        lowest_rest = 2 if self.mode != OutMode.STRAIGHT else 1
+        open_rests = rests >= lowest_rest
+        finished = (rests == 0) & finishing[np.newaxis, :]
+        # chances[darts][score] to finish the score with that many darts left in the take
+        chances = np.zeros((MAX_DARTS + 1, MAX_SCORE + 1))
+        aims = np.zeros((MAX_DARTS + 1, MAX_SCORE + 1), dtype=np.int64)
+        for darts in range(1, MAX_DARTS + 1):
+            values = np.where(finished, 1.0, np.where(open_rests, chances[darts - 1][np.clip(rests, 0, None)], 0.0))
+            expected = values @ hits.T  # [score, aim segment]
+            aims[darts] = np.argmax(expected, axis=1)
+            chances[darts] = expected[scores, aims[darts]]
+        chances[:, 0] = 0.0
+        self.chances = chances
+        self._aims = [[AIM_SEGMENTS[aim] for aim in darts_aims] for darts_aims in aims]  # type: List[List[Segment]]
+        self._chances = chances.tolist()  # type: List[List[float]]
+
+    def get_aim(self, score: int, darts_left: int = MAX_DARTS) -> Tuple[Segment, float]:
+        """
+        the segment to aim at and the chance to finish in this take with it. the segment is None if the score
+        can't be finished with the darts left
+        """
+        if not 0 < score <= MAX_SCORE or darts_left < 1:
+            return None, 0.0
+        darts_left = min(darts_left, MAX_DARTS)
+        chance = self._chances[darts_left][score]
+        if chance <= 0.0:
+            return None, 0.0
+        return self._aims[darts_left][score], chance
+
+
+def deviation_bucket(deviation_mm: float) -> float:
+    return round(deviation_mm / DEVIATION_BUCKET_MM) * DEVIATION_BUCKET_MM
+
+
+# least recently used policies are dropped first, a changed deviation simply ends up under another key
+_cache = LimitedSizeDict(size_limit=32)
+
+
+def get_checkout_policy(h_dev_mm: float, v_dev_mm: float, mode: OutMode) -> CheckoutPolicy:
+    key = (deviation_bucket(h_dev_mm), deviation_bucket(v_dev_mm), mode)
+    if key in _cache:
+        _cache.move_to_end(key)
+    else:
+        _cache[key] = CheckoutPolicy(key[0], key[1], mode)
+    return _cache[key]
+
+
+if __name__ == '__main__':
+    for dev in [5.0, 15.0, 40.0]:
+        policy = get_checkout_policy(dev, dev, OutMode.DOUBLE)
+        print('deviation %gmm:' % dev, ', '.join('%d: %s (%.0f%%)' % (score, policy.get_aim(score)[0],
+                                                                      100 * policy.get_aim(score)[1])
+                                                  for score in [2, 32, 40, 50, 61, 81, 100, 170]))
@@ -0,0 +1,86 @@
+"""
+quick rating of every target for a remaining score, without a player model: a target is good if it or the segments
+around it finish the score and bad if they bust it. the segments around a target are weighted by a precomputed
+neighbour matrix, so rating all targets for any number of scores is a single matrix product.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from constants import SECTOR_ORDER
+from models.board_geometry import Segment, Bed
+from models.checkout_table import OutMode, is_finishing_segment
+
+# how likely a bed is hit compared to the others, when aiming at it or nearby
+BED_WEIGHTS = {Bed.OUTER_SINGLE: 1.0, Bed.SINGLE: 1.0, Bed.TRIPLE: 0.2, Bed.DOUBLE: 0.3}
+SAME_SECTOR_WEIGHT = 0.6
+NEIGHBOR_SECTOR_WEIGHT = 0.4
+# the target itself finishing (or busting) counts extra
+FINISH_BONUS = 0.5
+BUST_PENALTY = 1.0
+
+TARGETS = [Segment(sector, bed) for sector in reversed(range(1, 21))
+           for bed in [Bed.OUTER_SINGLE, Bed.DOUBLE, Bed.TRIPLE]] + \
+          [Segment(25, Bed.SINGLE), Segment(25, Bed.DOUBLE)]  # type: List[Segment]
+TARGET_SCORES = np.array([target.score() for target in TARGETS])
+
+
+def _neighbor_sectors(sector: int) -> List[int]:
+    if sector not in SECTOR_ORDER:
+        return []
+    index = SECTOR_ORDER.index(sector)
+    return [SECTOR_ORDER[index - 1], SECTOR_ORDER[(index + 1) % len(SECTOR_ORDER)]]
+
+
+def _build_neighbor_matrix() -> np.ndarray:
+    """
+    [target, segment] weight of hitting the segment when aiming at the target (the targets are the segments)
+    """
+    matrix = np.zeros((len(TARGETS), len(TARGETS)))
+    for i, target in enumerate(TARGETS):
+        neighbors = _neighbor_sectors(target.sector)
+        for j, segment in enumerate(TARGETS):
+            weight = BED_WEIGHTS[segment.bed]
+            if segment == target:
+                matrix[i, j] = weight
+            elif segment.sector == target.sector:
+                matrix[i, j] = SAME_SECTOR_WEIGHT * weight
+            elif segment.sector in neighbors:
+                matrix[i, j] = NEIGHBOR_SECTOR_WEIGHT * weight
+    return matrix
+
+
+NEIGHBOR_MATRIX = _build_neighbor_matrix()
+
+
+def rate_targets(scores: np.ndarray, mode: OutMode = OutMode.STRAIGHT) -> np.ndarray:
+    """
+    [score, target] rating of every target of TARGETS for every remaining score, higher is better
+    """
+    scores = np.asarray(scores).reshape(-1, 1)
+    rests = scores - TARGET_SCORES[np.newaxis, :]
+    finishing = np.array([is_finishing_segment(target, mode) for target in TARGETS])
+    finishes = (rests == 0) & finishing
+    busts = (rests < 0) | ((rests == 0) & ~finishing)
+    if mode != OutMode.STRAIGHT:
+        busts |= rests == 1
+    finishes = finishes.astype(np.float64)
+    busts = busts.astype(np.float64)
+    chances = finishes @ NEIGHBOR_MATRIX.T + FINISH_BONUS * finishes
+    risks = busts @ NEIGHBOR_MATRIX.T + BUST_PENALTY * busts
+    return chances - risks
+
+
+def ranked_targets(score: int, mode: OutMode = OutMode.STRAIGHT) -> List[Tuple[Segment, float]]:
+    """
+    all targets with their rating for the score, best first
+    """
+    ratings = rate_targets(np.array([score]), mode)[0]
+    # stable, so equally rated targets keep the order of TARGETS (high sectors first)
+    order = np.argsort(-ratings, kind='stable')
+    return [(TARGETS[i], float(ratings[i])) for i in order]
+
+
+if __name__ == '__main__':
+    for target, rating in ranked_targets(20)[:10]:
+        print('%.2f' % rating, target)
@@ -0,0 +1,176 @@
+"""
+checkout routes and setup darts for every remaining x01 score, for straight, double and master out.
+the table is built once by dynamic programming over (score, darts left), stored as a small .npz of segment labels
+(see board_geometry.LABEL_SEGMENTS) and loaded on startup, so every lookup is a single index.
+"""
+import os
+from enum import Enum
+from typing import Dict, List, Union
+
+import numpy as np
+
+from constants import PREFERRED_DOUBLES
+from models import board_geometry
+from models.board_geometry import Segment, Bed
+from models.cache import cache_path, write_atomically
+
+TABLE_VERSION = 1
+MAX_DARTS = 3
+MAX_SCORE = 180  # highest 3 dart finish (straight out), no double or master out finish is above 170
+# a route with fewer darts always beats one with more, the segment costs only decide between routes of equal length
+DART_COST = 10.0
+# a setup dart is judged by the route it leaves for the next take, where one dart more or less matters much less
+LEAVE_DART_COST = 0.5
+
+
+class OutMode(Enum):
+    STRAIGHT = 0
+    DOUBLE = 1
+    MASTER = 2
+
+    @staticmethod
+    def from_double_out(double_out: bool) -> "OutMode":
+        return OutMode.DOUBLE if double_out else OutMode.STRAIGHT
+
+
+def table_path() -> str:
+    return cache_path('checkout_table.npz')
+
+
+def _candidate_segments() -> List[Segment]:
+    # the biggest bed of every score a dart can make, inner singles are the same score as outer singles.
+    # high scores first, so of equally hard routes the one leaving the least behind after a miss wins
+    return sorted((segment for segment in board_geometry.LABEL_SEGMENTS[1:] if segment.bed != Bed.INNER_SINGLE),
+                  key=Segment.score, reverse=True)
+
+
+def segment_cost(segment: Segment) -> float:
+    """
+    how hard the segment is to hit, roughly the inverse of its area
+    """
+    if segment.sector == 25:
+        return 4.0 if segment.bed == Bed.DOUBLE else 2.5
+    if segment.bed == Bed.DOUBLE:
+        # among the doubles, the ones that split into other doubles when hit as singles come first
+        return 2.0 + PREFERRED_DOUBLES.index(segment.sector) * 0.01
+    if segment.bed == Bed.TRIPLE:
+        return 3.0
+    return 1.0
+
+
+def is_finishing_segment(segment: Segment, mode: OutMode) -> bool:
+    if mode == OutMode.DOUBLE:
+        return segment.bed == Bed.DOUBLE
+    if mode == OutMode.MASTER:
+        return segment.bed in (Bed.DOUBLE, Bed.TRIPLE)
+    return True
+
+
+def build_tables(mode: OutMode) -> Dict[str, np.ndarray]:
+    """
+    routes[score, darts - 1] are the labels of the cheapest route finishing the score with at most that many darts
+    (unused darts are 0, no route at all is all 0). setups[score] is the dart that leaves the cheapest route
+    for a whole take if there is no route with the darts left
+    """
+    segments = _candidate_segments()
+    costs = np.full((MAX_DARTS + 1, MAX_SCORE + 1), np.inf)
+    routes = np.zeros((MAX_SCORE + 1, MAX_DARTS, MAX_DARTS), dtype=np.uint8)
+    for darts in range(1, MAX_DARTS + 1):
+        for score in range(1, MAX_SCORE + 1):
+            best, route = costs[darts - 1, score], routes[score, darts - 2] if darts > 1 else None
+            for segment in segments:
+                rest = score - segment.score()
+                if rest == 0 and is_finishing_segment(segment, mode):
+                    cost = DART_COST + segment_cost(segment)
+                elif rest > 0 and darts > 1:
+                    cost = DART_COST + segment_cost(segment) + costs[darts - 1, rest]
+                else:
+                    continue
+                if cost < best:
+                    best = cost
+                    route = [board_geometry.LABELS[segment]]
+                    if rest > 0:
+                        route += [label for label in routes[rest, darts - 2] if label]
+            costs[darts, score] = best
+            if route is not None:
+                routes[score, darts - 1, :len(route)] = route[:MAX_DARTS]
+
+    # the cost of a leave for a fresh take, counting darts much less than for the route itself
+    leave_costs = np.full(MAX_SCORE + 1, np.inf)
+    for score in range(1, MAX_SCORE + 1):
+        route = [board_geometry.LABEL_SEGMENTS[label] for label in routes[score, MAX_DARTS - 1] if label]
+        if route:
+            leave_costs[score] = sum(LEAVE_DART_COST + segment_cost(segment) for segment in route)
+    setups = np.zeros(MAX_SCORE + 1, dtype=np.uint8)
+    for score in range(1, MAX_SCORE + 1):
+        best = np.inf
+        for segment in segments:
+            rest = score - segment.score()
+            if rest > 0 and segment_cost(segment) + leave_costs[rest] < best:
+                best = segment_cost(segment) + leave_costs[rest]
+                setups[score] = board_geometry.LABELS[segment]
+    return dict(routes=routes, setups=setups)
+
+
+def build_table(path: str) -> None:
+    tables = [build_tables(mode) for mode in OutMode]
+    # only complete tables ever show up under the real name
+    write_atomically(path, lambda tmp_path: np.savez(
+        tmp_path, version=np.array(TABLE_VERSION),
+        routes=np.stack([t['routes'] for t in tables]), setups=np.stack([t['setups'] for t in tables])))
+
+
+class CheckoutTable(object):
+    def __init__(self, path: str = None):
+        self.path = path if path is not None else table_path()
+        if not os.path.exists(self.path):
+            print('building checkout table', self.path)
+            build_table(self.path)
+        data = np.load(self.path)
+        if int(data['version']) != TABLE_VERSION:
+            print('checkout table', self.path, 'is outdated, rebuilding')
+            build_table(self.path)
+            data = np.load(self.path)
+        # nested lists of segments, indexing those is cheaper than going through numpy for single lookups
+        self._routes = [[[[board_geometry.LABEL_SEGMENTS[label] for label in route if label]
+                          for route in score_routes] for score_routes in mode_routes]
+                        for mode_routes in data['routes']]  # type: List[List[List[List[Segment]]]]
+        self._setups = [[board_geometry.LABEL_SEGMENTS[label] if label else None for label in mode_setups]
+                        for mode_setups in data['setups']]  # type: List[List[Union[Segment, None]]]
+
+    def get_route(self, score: int, mode: OutMode, darts_left: int = MAX_DARTS) -> List[Segment]:
+        """
+        the segments to finish the score with, empty if it can't be finished with the darts left
+        """
+        if not 0 < score <= MAX_SCORE or darts_left < 1:
+            return []
+        return self._routes[mode.value][score][min(darts_left, MAX_DARTS) - 1]
+
+    def get_setup(self, score: int, mode: OutMode) -> Union[Segment, None]:
+        """
+        the segment that leaves the easiest finish for the next take
+        """
+        if not 0 < score <= MAX_SCORE:
+            return None
+        return self._setups[mode.value][score]
+
+
+_table = None  # type: CheckoutTable
+
+
+def get_checkout_table() -> CheckoutTable:
+    """
+    the table, built and written to the cache directory on first use
+    """
+    global _table
+    if _table is None:
+        _table = CheckoutTable()
+    return _table
+
+
+if __name__ == '__main__':
+    table = get_checkout_table()
+    for mode in OutMode:
+        print(mode.name, 'finishes:', sum(1 for score in range(1, MAX_SCORE + 1) if table.get_route(score, mode)),
+              ', 170:', ' '.join(str(s) for s in table.get_route(170, mode)),
+              ', 99:', ' '.join(str(s) for s in table.get_route(99, mode)))
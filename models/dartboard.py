@@ -1,53 +1,22 @@
 import math
-from collections import defaultdict
 from enum import Enum
-from typing import Tuple, Union, Dict, List, DefaultDict
+from typing import Tuple, Union, Dict, List
 
 import numpy as np
 from PyQt5.QtCore import QPointF
 
 from constants import *
-from collections import namedtuple
 from PyQt5.QtGui import QPainterPath
 
+from models import board_geometry, label_raster
+# re-exported, so existing imports of the board types from the Qt layer keep working
+from models.board_geometry import Bed, Segment, ThrowResults
 
-class Bed(Enum):
-    NONE = 0
-    SINGLE = 1
-    INNER_SINGLE = 2
-    OUTER_SINGLE = 3
-    DOUBLE = 4
-    TRIPLE = 5
 
-    __multipliers__ = {NONE: 0, SINGLE: 1, INNER_SINGLE: 1, OUTER_SINGLE: 1, DOUBLE: 2, TRIPLE: 3}
-
-    def get_multiplier(self):
-        return Bed.__multipliers__[self.value]
-
-
-class Segment(object):
-    def __init__(self, sector: int, bed: Bed):
-        self.sector = sector
-        self.bed = bed
-
-    @staticmethod
-    def from_json(json: dict):
-        return Segment(json['number'], Bed[json['bed']])
-
-    def to_json(self):
-        return {'number': self.sector, 'bed': self.bed.name}
-
-    def score(self):
-        return self.sector * self.bed.get_multiplier()
-
-    def __str__(self):
-        return '%s %s' % (self.bed.name, self.sector)
-
-    def __eq__(self, other):
-        return self.sector == other.sector and self.bed == other.bed
-
-    def __hash__(self):
-        return ('%s%s' % (self.sector, self.bed)).__hash__()
+class HitTestMode(Enum):
+    POLAR = 0  # closed-form classification from radius and angle
+    PATH = 1  # reference implementation: QPainterPath.contains on every segment area
+    RASTER = 2  # lookup in a memory-mapped label raster, exact classification near the wires
 
 
 def make_partial_pie_part(path, cx, cy, radius1: float, radius2: float, start_angle: float, angle: float):
@@ -67,6 +36,8 @@ def make_partial_pie_part(path, cx, cy, radius1: float, radius2: float, start_an
 
 class DartBoard(object):
     _instance = None
+    hit_test_mode = HitTestMode.POLAR
+    raster = None  # type: label_raster.LabelRaster
 
     @classmethod
     def _get_instance(cls):
@@ -83,8 +54,6 @@ class DartBoard(object):
         sector_angle = 360.0 / 20.0
         start_angle = 90.0 - sector_angle / 2.0  # starting with 20 at the top
 
-        self.available_segments_for_score = defaultdict(list)  # type: defaultdict[int, List[Segment]]
-
         # BULL'S EYE
 
         double_bull = QPainterPath()
@@ -95,9 +64,6 @@ class DartBoard(object):
         self.segment_areas[Segment(25, Bed.SINGLE)] = single_bull
         self.segment_areas[Segment(25, Bed.DOUBLE)] = double_bull
 
-        self.available_segments_for_score[25].append(Segment(25, Bed.SINGLE))
-        self.available_segments_for_score[50].append(Segment(25, Bed.DOUBLE))
-
         # SEGMENTS FROM 20 TO 1
         angle = start_angle
         for i in range(20):
@@ -119,57 +85,94 @@ class DartBoard(object):
             self.segment_areas[Segment(SECTOR_ORDER[i], Bed.OUTER_SINGLE)] = outer_single_bed
             self.segment_areas[Segment(SECTOR_ORDER[i], Bed.DOUBLE)] = double_bed
 
-            self.available_segments_for_score[SECTOR_ORDER[i]].append(Segment(SECTOR_ORDER[i], Bed.OUTER_SINGLE))
-            self.available_segments_for_score[SECTOR_ORDER[i] * 2].append(Segment(SECTOR_ORDER[i], Bed.DOUBLE))
-            self.available_segments_for_score[SECTOR_ORDER[i] * 3].append(Segment(SECTOR_ORDER[i], Bed.TRIPLE))
-
             angle += sector_angle
 
-    @staticmethod
-    def get_throw_result(location: QPointF) -> Segment:
-        for segment, path in DartBoard._get_instance().segment_areas.items():
+    def _classify_path(self, location: QPointF) -> Segment:
+        for segment, path in self.segment_areas.items():
             if path.contains(location):
                 return segment
         return Segment(0, Bed.NONE)
 
+    @staticmethod
+    def get_throw_result(location: QPointF) -> Segment:
+        if DartBoard.hit_test_mode == HitTestMode.PATH:
+            return DartBoard._get_instance()._classify_path(location)
+        if DartBoard.hit_test_mode == HitTestMode.RASTER:
+            return DartBoard.raster.classify(location.x(), location.y())
+        return board_geometry.classify(location.x(), location.y())
+
+    @staticmethod
+    def classify_many(points: np.ndarray) -> ThrowResults:
+        """
+        classifies an (N, 2) array of board coordinates in one pass.
+        beds are returned as Bed values, use Bed(value) to get the enum member back.
+        """
+        if DartBoard.hit_test_mode == HitTestMode.PATH:
+            points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            segments = [DartBoard.get_throw_result(QPointF(x, y)) for x, y in points]
+            return ThrowResults(np.array([s.sector for s in segments], dtype=int),
+                                np.array([s.bed.value for s in segments], dtype=int),
+                                np.array([s.bed.get_multiplier() for s in segments], dtype=int),
+                                np.array([s.score() for s in segments], dtype=int))
+        if DartBoard.hit_test_mode == HitTestMode.RASTER:
+            return DartBoard.raster.classify_many(points)
+        return board_geometry.classify_many(points)
+
+    @staticmethod
+    def locations_to_array(locations: List[QPointF]) -> np.ndarray:
+        return np.array([(location.x(), location.y()) for location in locations], dtype=np.float64).reshape(-1, 2)
+
+    @staticmethod
+    def set_hit_test_mode(mode: HitTestMode, raster_resolution_mm: float = label_raster.DEFAULT_RESOLUTION_MM):
+        if mode == HitTestMode.RASTER:
+            DartBoard.raster = label_raster.get_label_raster(raster_resolution_mm)
+        DartBoard.hit_test_mode = mode
+
     @staticmethod
     def get_center_estimate(segment: Segment) -> QPointF:
-        sector = segment.sector
-        bed = segment.bed
+        """
+        the point to aim at for the segment, looked up in the table built by board_geometry
+        """
         try:
-            area = DartBoard._get_instance().segment_areas[segment]
+            return QPointF(*board_geometry.SEGMENT_AIM_POINTS[segment])
         except KeyError:
-            print(segment, 'not in', DartBoard._get_instance().segment_areas.keys())
+            print(segment, 'has no aim point')
             return QPointF(0, 0)
-        if sector == 25 and bed in [Bed.SINGLE, Bed.INNER_SINGLE, Bed.OUTER_SINGLE]:
-            half_ring = ((RADIUS_OUTER_BULL_MM - RADIUS_INNER_BULL_MM) / 2)+RADIUS_INNER_BULL_MM
-            return area.toFillPolygon().boundingRect().center().toPoint() + QPointF(0, - half_ring)
-        return area.toFillPolygon().boundingRect().center().toPoint()
 
     @staticmethod
-    def aim_dart_at(intended_loc: Union[QPointF, Segment, int], h_dev_mm: float, v_dev_mm: float) -> QPointF:
+    def get_centroid(segment: Segment) -> QPointF:
+        try:
+            return QPointF(*board_geometry.SEGMENT_CENTROIDS[segment])
+        except KeyError:
+            print(segment, 'has no centroid')
+            return QPointF(0, 0)
+
+    @staticmethod
+    def aim_dart_at(intended_loc: Union[QPointF, Segment, int], h_dev_mm: float, v_dev_mm: float,
+                    rng: np.random.Generator = None) -> QPointF:
         if isinstance(intended_loc, int):
             intended_loc = DartBoard.easiest_segment_for_score(intended_loc)
         if isinstance(intended_loc, Segment):
             intended_loc = DartBoard.get_center_estimate(intended_loc)
-        return intended_loc + QPointF(*np.random.normal(scale=(h_dev_mm, v_dev_mm)))
+        if rng is None:
+            return intended_loc + QPointF(*np.random.normal(scale=(h_dev_mm, v_dev_mm)))
+        return QPointF(*board_geometry.aim_darts_at((intended_loc.x(), intended_loc.y()), h_dev_mm, v_dev_mm, rng)[0])
+
+    @staticmethod
+    def aim_darts_at(aim_points: np.ndarray, h_dev_mm: Union[float, np.ndarray], v_dev_mm: Union[float, np.ndarray],
+                     rng: np.random.Generator = None) -> np.ndarray:
+        """
+        batch form of aim_dart_at on plain arrays, see board_geometry.aim_darts_at
+        """
+        return board_geometry.aim_darts_at(aim_points, h_dev_mm, v_dev_mm, rng)
 
     @staticmethod
     def get_segments_for_score(score: int) -> List[Segment]:
-        return DartBoard._get_instance().available_segments_for_score[score]
+        return board_geometry.get_segments_for_score(score)
 
     @staticmethod
     def easiest_segment_for_score(score: int) -> Segment:
-        try:
-            scores = {segment.bed: segment for segment in DartBoard._get_instance().available_segments_for_score[score]}
-            for bed in [Bed.OUTER_SINGLE, Bed.SINGLE, Bed.INNER_SINGLE, Bed.DOUBLE, Bed.TRIPLE]:
-                try:
-                    return scores[bed]
-                except KeyError:
-                    pass
-            return list(scores.values())[0]
-        except IndexError:
-            return Segment(0, Bed.NONE)
+        return board_geometry.easiest_segment_for_score(score)
 
     @staticmethod
     def get_segment_areas() -> Dict[Segment, QPainterPath]:
@@ -177,4 +180,4 @@ class DartBoard(object):
 
     @staticmethod
     def get_available_scores() -> Dict[int, List[Segment]]:
-        return DartBoard._get_instance().available_segments_for_score
+        return board_geometry.AVAILABLE_SEGMENTS_FOR_SCORE
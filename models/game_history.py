@@ -0,0 +1,106 @@
+"""
+undo history of a running game. every dart and every transition it causes (take, leg, set and game completion,
+new legs and sets, next player) is recorded as a command that knows how to revert itself,
+so undo pops commands down to the last dart instead of working out the previous state from the database.
+"""
+from typing import Union, Dict
+
+from database.types import GameStatus
+
+
+def _session():
+    from controllers.database_controller import DatabaseController
+    return DatabaseController._session
+
+
+class GameCommand(object):
+    def undo(self, game: "Game") -> None:
+        raise NotImplementedError("You must implement this Method")
+
+
+class DartThrown(GameCommand):
+    def __init__(self, player: "Player", take: "Take", dart: "Dart", new_take: bool,
+                 previous_take: Union["Take", None], darts_left: int):
+        self.player = player
+        self.take = take
+        self.dart = dart
+        self.new_take = new_take
+        self.previous_take = previous_take
+        self.darts_left = darts_left
+
+    def undo(self, game: "Game") -> None:
+        take, dart, player = self.take, self.dart, self.player
+        take.darts.remove(dart)
+        _session().delete(dart)
+        player.darts_left = self.darts_left
+        player._current_take = self.previous_take if self.new_take else take
+        if self.new_take:
+            game.take_index.remove(take)
+            take.leg.takes.remove(take)
+            _session().delete(take)
+        game._dart_removed(take, dart)
+        game._redo.append((dart.hit_location, dart.target_location, dart.intent))
+
+
+class TakeCompleted(GameCommand):
+    def __init__(self, take: "Take"):
+        self.take = take
+
+    def undo(self, game: "Game") -> None:
+        self.take.result = None
+        game._take_result_changed(self.take)
+
+
+class LegCompleted(GameCommand):
+    def __init__(self, leg: "Leg"):
+        self.leg = leg
+
+    def undo(self, game: "Game") -> None:
+        self.leg.winner = None
+
+
+class SetCompleted(GameCommand):
+    def __init__(self, set: "Set"):
+        self.set = set
+
+    def undo(self, game: "Game") -> None:
+        self.set.winner = None
+
+
+class GameCompleted(GameCommand):
+    def undo(self, game: "Game") -> None:
+        game.winner = None
+        game.status = GameStatus.IN_PROGRESS
+
+
+class LegAdded(GameCommand):
+    def __init__(self, leg: "Leg", player_turn: int):
+        self.leg = leg
+        self.player_turn = player_turn
+
+    def undo(self, game: "Game") -> None:
+        self.leg.set.legs.remove(self.leg)
+        game.take_index.remove_leg(self.leg)
+        _session().delete(self.leg)
+        game.player_turn = self.player_turn
+
+
+class SetAdded(GameCommand):
+    def __init__(self, set: "Set"):
+        self.set = set
+
+    def undo(self, game: "Game") -> None:
+        while self.set in game.sets:
+            game.sets.remove(self.set)
+        _session().delete(self.set)
+
+
+class NextPlayer(GameCommand):
+    def __init__(self, player_turn: int, darts_left: Dict["Player", int]):
+        self.player_turn = player_turn
+        self.darts_left = darts_left
+
+    def undo(self, game: "Game") -> None:
+        game.player_turn = self.player_turn
+        for player, darts_left in self.darts_left.items():
+            player.darts_left = darts_left
@@ -0,0 +1,119 @@
+"""
+precomputed segment labels (see board_geometry.LABEL_SEGMENTS) for the board's millimetre square.
+the raster is stored as a uint8 .npy file and memory-mapped, so a lookup is a single index without allocations
+and every process working on it shares the same pages.
+cells within one cell of a wire are marked EXACT and classified with board_geometry instead.
+"""
+import math
+import os
+from typing import Dict
+
+import numpy as np
+
+from constants import RADIUS_OUTER_DOUBLE_MM
+from models import board_geometry
+from models.board_geometry import Segment, ThrowResults
+from models.cache import cache_path, write_atomically
+
+DEFAULT_RESOLUTION_MM = 0.1
+SIDE_MM = 2 * RADIUS_OUTER_DOUBLE_MM
+EXACT = 255
+_BUILD_ROWS = 200  # rows classified at once while building, keeps the memory usage of the build small
+
+
+def raster_path(resolution_mm: float) -> str:
+    return cache_path('label_raster_%gmm.npy' % resolution_mm)
+
+
+def cells_per_side(resolution_mm: float) -> int:
+    return int(math.ceil(SIDE_MM / resolution_mm))
+
+
+def build_raster(path: str, resolution_mm: float) -> None:
+    cells = cells_per_side(resolution_mm)
+    centers = (np.arange(cells) + 0.5) * resolution_mm
+    # any point of a cell is at most half a diagonal away from its center, so cells further than a whole
+    # diagonal away from every wire are guaranteed to lie in a single segment
+    margin = resolution_mm * math.sqrt(2)
+
+    def write(tmp_path: str) -> None:
+        raster = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=(cells, cells))
+        for row in range(0, cells, _BUILD_ROWS):
+            xs, ys = np.meshgrid(centers, centers[row:row + _BUILD_ROWS])
+            points = np.stack((xs.ravel(), ys.ravel()), axis=-1)
+            labels = board_geometry.classify_labels(points)
+            labels[board_geometry.distances_to_wire(points) <= margin] = EXACT
+            raster[row:row + _BUILD_ROWS] = labels.reshape(xs.shape)
+        raster.flush()
+        # the map has to be closed before the file is moved
+        del raster
+
+    # only complete rasters ever show up under the real name
+    write_atomically(path, write)
+
+
+class LabelRaster(object):
+    def __init__(self, resolution_mm: float = DEFAULT_RESOLUTION_MM, path: str = None):
+        self.resolution_mm = resolution_mm
+        self.path = path if path is not None else raster_path(resolution_mm)
+        cells = cells_per_side(resolution_mm)
+        if not os.path.exists(self.path):
+            print('building label raster', self.path)
+            build_raster(self.path, resolution_mm)
+        self.labels = np.load(self.path, mmap_mode='r')
+        if self.labels.shape != (cells, cells) or self.labels.dtype != np.uint8:
+            print('label raster', self.path, 'does not match the resolution, rebuilding')
+            del self.labels
+            build_raster(self.path, resolution_mm)
+            self.labels = np.load(self.path, mmap_mode='r')
+        self.cells = cells
+        # indexing a memoryview returns plain ints, which is a lot cheaper than numpy scalars for single lookups
+        self._flat = memoryview(self.labels.reshape(-1))
+
+    def classify(self, x: float, y: float) -> Segment:
+        column = int(x // self.resolution_mm)
+        row = int(y // self.resolution_mm)
+        if not (0 <= row < self.cells and 0 <= column < self.cells):
+            return board_geometry.MISS
+        label = self._flat[row * self.cells + column]
+        if label == EXACT:
+            return board_geometry.classify(x, y)
+        return board_geometry.LABEL_SEGMENTS[label]
+
+    def classify_labels(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        indices = np.floor(points / self.resolution_mm).astype(np.int64)
+        inside = np.all((indices >= 0) & (indices < self.cells), axis=1)
+        labels = np.zeros(len(points), dtype=np.uint8)
+        labels[inside] = self.labels[indices[inside, 1], indices[inside, 0]]
+        exact = labels == EXACT
+        if exact.any():
+            labels[exact] = board_geometry.classify_labels(points[exact])
+        return labels
+
+    def classify_many(self, points: np.ndarray) -> ThrowResults:
+        labels = self.classify_labels(points)
+        return ThrowResults(board_geometry.LABEL_SECTORS[labels], board_geometry.LABEL_BED_VALUES[labels],
+                            board_geometry.LABEL_MULTIPLIERS[labels], board_geometry.LABEL_SCORES[labels])
+
+
+_rasters = {}  # type: Dict[float, LabelRaster]
+
+
+def get_label_raster(resolution_mm: float = DEFAULT_RESOLUTION_MM) -> LabelRaster:
+    """
+    the raster for the resolution, built and written to the cache directory on first use
+    """
+    if resolution_mm not in _rasters:
+        _rasters[resolution_mm] = LabelRaster(resolution_mm)
+    return _rasters[resolution_mm]
+
+
+if __name__ == '__main__':
+    # the raster must agree with the exact classification everywhere, wires included
+    raster = get_label_raster()
+    points = np.random.uniform(-10.0, SIDE_MM + 10.0, size=(1000000, 2))
+    reference = board_geometry.classify_labels(points)
+    print('label raster mismatches:', int(np.count_nonzero(raster.classify_labels(points) != reference)))
+    print('scalar mismatches:', sum(raster.classify(x, y) != board_geometry.LABEL_SEGMENTS[label]
+                                    for (x, y), label in zip(points[:20000], reference)))
@@ -1,7 +1,7 @@
 import datetime
 from collections import defaultdict
 
-from sqlalchemy import Column, DateTime, Integer, ForeignKey, Enum
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 
 from database import BaseObject
@@ -18,8 +18,13 @@ class Dart(BaseObject.Base):
     hit_location = Column(SQLPointF)
     target_location = Column(SQLPointF)
     intent = Column(Enum(DartIntent))
+    # resolved from hit_location by resolve_segment(), so reads never have to hit-test again
+    sector = Column(Integer)
+    bed = Column(Enum(Bed))
+    score = Column(Integer)
     take = relationship('Take', back_populates='darts',
-                        single_parent=True, lazy='joined')  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
+                        single_parent=True)  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
+    __table_args__ = (Index('ix_darts_take_time_stamp', 'take_id', 'time_stamp'),)
 
     def __init__(self, take: "Take", *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -27,8 +32,16 @@ class Dart(BaseObject.Base):
         self.time_stamp = datetime.datetime.now()
         print('NEW DART IN ', self.take)
 
+    def resolve_segment(self) -> None:
+        segment = DartBoard.get_throw_result(self.hit_location)
+        self.sector = segment.sector
+        self.bed = segment.bed
+        self.score = segment.score()
+
     def get_segment(self) -> Segment:
-        return DartBoard.get_throw_result(self.hit_location)
+        if self.sector is None:
+            self.resolve_segment()
+        return Segment(self.sector, self.bed)
 
     def get_field_string(self) -> str:
         segment = self.get_segment()
@@ -38,4 +51,6 @@ class Dart(BaseObject.Base):
         })[segment.bed], segment.sector)
 
     def get_score(self) -> int:
-        return self.get_segment().score()
+        if self.score is None:
+            self.resolve_segment()
+        return self.score
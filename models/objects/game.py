@@ -1,4 +1,5 @@
 import datetime
+from collections import namedtuple
 from threading import Lock, Thread
 from typing import List, Union
 
@@ -6,15 +7,22 @@ from sqlalchemy import Column, Enum, DateTime, JSON, Integer, ForeignKey, String
 from sqlalchemy.orm import relationship, make_transient
 
 from database import BaseObject
-from database.types import GameStatus, TakeResult
+from database.types import GameStatus, TakeResult, GameEventType
 from models.helper import create_id_column, SignalWrapper, Option
 from models.objects.leg import Leg
 from models.objects.take import Take
 from models.objects.dart import Dart
 from models.objects.set import Set
 from models.objects.game_players import GamePlayers
+from models.objects.game_event import GameEvent, GameSnapshot, SNAPSHOT_INTERVAL
+from models.take_index import TakeIndex
+from models.game_history import GameCommand, DartThrown, TakeCompleted, LegCompleted, SetCompleted, \
+    GameCompleted, LegAdded, SetAdded, NextPlayer
 from widgets.game_info_widgets.game_info_widget import GameInfoWidget
 
+# what the game browser lists of a game, see DatabaseController.get_game_summaries
+GameSummary = namedtuple('GameSummary', ['id', 'type', 'name', 'options', 'start_time', 'status', 'players', 'winner'])
+
 
 class Game(BaseObject.Base):
     __tablename__ = 'games'
@@ -41,6 +49,13 @@ class Game(BaseObject.Base):
     _undo_lock = Lock()
     enable_blocking = True
     player_scores = {}
+    _event_sequence = None
+    _snapshot_sequence = None
+    _snapshot_leg = None
+    _history = None  # type: List[GameCommand]
+    _history_darts = 0
+    _redo = None  # type: List[tuple]
+    take_index = None  # type: TakeIndex
 
     @classmethod
     def get_option_list(cls) -> List[Option]:
@@ -52,12 +67,26 @@ class Game(BaseObject.Base):
     def get_name(self):
         return self.__class__.__name__
 
+    @classmethod
+    def get_summary_name(cls, options: dict) -> str:
+        """
+        the name of a game of this type with the options (see get_option_list), without loading the game
+        """
+        return cls.__name__
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.start_time = datetime.datetime.now()
         self._set_defaults()
 
     def _set_defaults(self):
+        self._event_sequence = None
+        self._snapshot_sequence = None
+        self._snapshot_leg = None
+        self._history = []
+        self._history_darts = 0
+        self._redo = []
+        self.take_index = TakeIndex(self)
         self._undo_lock = Lock()
         self.enable_blocking = True
         self.players = self.get_players()
@@ -85,18 +114,17 @@ class Game(BaseObject.Base):
 
         from controllers.database_controller import DatabaseController
         DatabaseController._session.add_all(game_players)
-        DatabaseController._session.commit()
+        DatabaseController.commit()
         self.players = self.get_players()
 
+        self.take_index.clear()
         for player in self.players:
             player._current_game = self
-            player._current_game_takes = None
-            player._current_leg_takes = None
             player._current_take = None
             from controllers.sound_controller import SoundController
             SoundController.ensure_player_sound_file(player)
         DatabaseController._session.add_all(self.players)
-        DatabaseController._session.commit()
+        DatabaseController.commit()
         self.player_turn = 0
         self.add_set(self.get_current_player())
         self._next_player()
@@ -140,9 +168,11 @@ class Game(BaseObject.Base):
 
     def _next_player(self, sound_jobs=None, skip_introduce=False) -> None:
         print('#>#> pt before:', self.player_turn)
+        turn_before = self.player_turn
         self.player_turn = self.player_turn + 1 if self.player_turn < (len(self.get_players()) - 1) else 0
         print('#>#> pt after:', self.player_turn)
         player = self.get_current_player()
+        self._record(NextPlayer(turn_before, {player: player.darts_left}))
         player.darts_left = 3
         if not skip_introduce:
             from controllers.sound_controller import SoundController, SoundJob
@@ -156,24 +186,26 @@ class Game(BaseObject.Base):
 
     def add_set(self, beginner: "Player"):
         set = Set(self, beginner)
+        self._record(SetAdded(set))
         self.add_leg(set, beginner)
         self.sets.append(set)
 
     def add_leg(self, set: "Set", beginner: "Player"):
         print('player-turn before set-leg', self.player_turn)
         leg = Leg(set, beginner)
+        self.take_index.add_leg(set, leg)
+        self._record(LegAdded(leg, self.player_turn))
         # set to player before actual starter, because we will always call '_next player' before continuing
         self.player_turn = self.get_players().index(self.get_player_before(beginner))
         print('player_turn after set-leg:', self.player_turn)
-        for player in self.get_players():
-            player._current_game_takes = None
-            player._current_leg_takes = None
 
     def _complete_take(self, take: "Take", result: TakeResult):
         print('>> completing take')
         take.player.darts_left = 0
         from controllers.database_controller import DatabaseController
         DatabaseController.complete_take(take, result)
+        self._record(TakeCompleted(take))
+        self._take_result_changed(take)
         if result == TakeResult.WIN:
             self._complete_leg(take.leg, take.player)
 
@@ -181,6 +213,7 @@ class Game(BaseObject.Base):
         print('>> completing leg')
         from controllers.database_controller import DatabaseController
         DatabaseController.complete_leg(leg, winner)
+        self._record(LegCompleted(leg))
         if self.legs_to_set == sum([1 for winning_leg in leg.set.legs if winning_leg.winner == winner]):
             self._complete_set(leg.set, winner)
 
@@ -188,6 +221,7 @@ class Game(BaseObject.Base):
         print('>> completing set')
         from controllers.database_controller import DatabaseController
         DatabaseController.complete_set(set, winner)
+        self._record(SetCompleted(set))
         if self.sets_to_match == sum([1 for winning_set in self.sets if winning_set.winner == winner]):
             self._complete_game(winner)
 
@@ -206,6 +240,20 @@ class Game(BaseObject.Base):
     def _complete_game(self, winner: "Player"):
         from controllers.database_controller import DatabaseController
         DatabaseController.complete_game(self, winner)
+        self._record(GameCompleted())
+
+    def _record(self, command: GameCommand) -> None:
+        if isinstance(command, DartThrown):
+            self._history_darts += 1
+        self._history.append(command)
+
+    def _clear_history(self) -> None:
+        """
+        forgets the undo history, e.g. after darts were edited. undo then falls back to the database state
+        """
+        self._history.clear()
+        self._history_darts = 0
+        self._redo.clear()
 
     def _remove_last_leg(self):
         from controllers.database_controller import DatabaseController
@@ -213,6 +261,7 @@ class Game(BaseObject.Base):
         if len(leg.takes) == 0:
             self.get_current_set().legs.remove(leg)
             print('removing leg', leg)
+            self.take_index.remove_leg(leg)
             DatabaseController.remove_leg(leg)
             set = self.get_current_set()
             if len(self.sets) > 1 and len(set.legs) == 0:
@@ -223,8 +272,6 @@ class Game(BaseObject.Base):
             self.player_turn = self.get_players().index(self.get_player_after(self.get_current_leg().winner))  # will be reduced by one afterwards
             print('new playerturn:', self.player_turn)
             for player in self.players:
-                player._current_game_takes = None
-                player._current_leg_takes = None
                 player._current_take = None
         DatabaseController.update_entity(self)
 
@@ -232,6 +279,106 @@ class Game(BaseObject.Base):
         raise NotImplementedError("You must implement this Method. "
                                   "Store the results in self.player_scores: Dict[Player, int]")
 
+    # every change of the scores is logged as game event, then passed on to the score hooks below
+
+    def _dart_added(self, dart: "Dart") -> None:
+        self._on_dart_added(dart)
+        self._record_event(GameEventType.DART_ADDED, dart.take, dart, dart.get_segment())
+        self._snapshot_if_due()
+
+    def _dart_removed(self, take: Union["Take", None], dart: Union["Dart", None]) -> None:
+        self._on_dart_removed(take, dart)
+        if take is not None and dart is not None:
+            self._record_event(GameEventType.DART_REMOVED, take, dart, dart.get_segment())
+            self._snapshot_if_due()
+
+    def _dart_changed(self, dart: "Dart", old_segment: "Segment") -> None:
+        self._on_dart_changed(dart, old_segment)
+        self._record_event(GameEventType.DART_REMOVED, dart.take, dart, old_segment)
+        self._record_event(GameEventType.DART_ADDED, dart.take, dart, dart.get_segment())
+        self._snapshot_if_due()
+
+    def _take_result_changed(self, take: "Take") -> None:
+        self._on_take_result_changed(take)
+        self._record_event(GameEventType.TAKE_RESULT, take)
+        self._snapshot_if_due()
+
+    def _record_event(self, event_type: GameEventType, take: "Take", dart: "Dart" = None, segment: "Segment" = None):
+        from controllers.database_controller import DatabaseController
+        if self._event_sequence is None:
+            self._event_sequence = DatabaseController.get_last_event_sequence(self)
+        self._event_sequence += 1
+        DatabaseController.add_game_event(GameEvent(
+            game_id=self.id, sequence=self._event_sequence, type=event_type, leg_id=take.leg_id, take_id=take.id,
+            dart_id=dart.id if dart is not None else None, player_id=take.player.id,
+            sector=segment.sector if segment is not None else None, bed=segment.bed if segment is not None else None,
+            score=segment.score() if segment is not None else None, result=take.result))
+
+    def _snapshot_if_due(self):
+        """
+        stores the score state of the current leg when the leg has no snapshot yet or SNAPSHOT_INTERVAL events
+        have been logged since the last one. only called when the state includes every logged event.
+        """
+        state = self._get_leg_state()
+        if state is None or self._event_sequence is None:
+            return
+        if self._snapshot_leg is state.leg and self._event_sequence - self._snapshot_sequence < SNAPSHOT_INTERVAL:
+            return
+        from controllers.database_controller import DatabaseController
+        DatabaseController.add_game_snapshot(GameSnapshot(game_id=self.id, leg_id=state.leg.id,
+                                                          sequence=self._event_sequence, state=state.to_json()))
+        self._snapshot_leg = state.leg
+        self._snapshot_sequence = self._event_sequence
+
+    # noinspection PyMethodMayBeStatic
+    def _get_leg_state(self):
+        """
+        the incremental score state of the current leg, None for games without one.
+        a state has a leg, replay(takes), to_json(), load_json(json) and apply_event(event)
+        """
+        return None
+
+    def _new_leg_state(self, leg: "Leg"):
+        raise NotImplementedError("You must implement this Method if you keep an incremental score state")
+
+    def _load_leg_state(self, from_log=True):
+        """
+        restores the state of the current leg from its latest snapshot and the events logged after it.
+        legs without a snapshot (e.g. games started before the log existed) are replayed from their takes.
+        the score hooks pass from_log=False, the change they are called for is not logged yet.
+        """
+        from controllers.database_controller import DatabaseController
+        leg = self.get_current_leg()
+        snapshot = DatabaseController.get_latest_snapshot(self, leg) if from_log and leg.id is not None else None
+        if snapshot is not None:
+            state = self._new_leg_state(leg)
+            try:
+                state.load_json(snapshot.state)
+                for event in DatabaseController.get_game_events(self, leg, snapshot.sequence):
+                    state.apply_event(event)
+                self._snapshot_leg = leg
+                self._snapshot_sequence = snapshot.sequence
+                return state
+            except (KeyError, ValueError) as e:
+                print('could not restore leg', leg.id, 'from snapshot', snapshot.sequence, ':', e)
+        state = self._new_leg_state(leg)
+        state.replay(leg.takes)
+        return state
+
+    # score updates for single darts. games without an incremental score state simply replay the leg
+
+    def _on_dart_added(self, dart: "Dart") -> None:
+        self._recalculate_leg_scores()
+
+    def _on_dart_removed(self, take: Union["Take", None], dart: Union["Dart", None]) -> None:
+        self._recalculate_leg_scores()
+
+    def _on_dart_changed(self, dart: "Dart", old_segment: "Segment") -> None:
+        self._recalculate_leg_scores()
+
+    def _on_take_result_changed(self, take: "Take") -> None:
+        self._recalculate_leg_scores()
+
     def get_player_score(self, player: "Player") -> int:
         if player not in self.player_scores:
             self._recalculate_leg_scores()
@@ -262,10 +409,16 @@ class Game(BaseObject.Base):
     def generate_next_dart(self) -> "Dart":
         raise NotImplementedError("You must implement this Method")
 
+    # noinspection PyMethodMayBeStatic
+    def get_aim_map(self, player: "Player") -> Union["AimMap", None]:
+        """
+        expected value of every aim point for the player in the current state of the game, None if not available
+        """
+        return None
+
     def _internal_handle_take_completion(self, player: "Player", updated=False):
-        self._recalculate_leg_scores()
+        # the scores are already up to date, the darts and take results report their changes themselves
         self._handle_take_completion(player, updated)
-        self._recalculate_leg_scores()
 
     def _handle_take_completion(self, player: "Player", updated=False):
         raise NotImplementedError("You must implement this Method. "
@@ -276,31 +429,44 @@ class Game(BaseObject.Base):
         pass
 
     def process_updated_dart(self, dart: Dart):
+        from controllers.database_controller import DatabaseController
+        with DatabaseController.checkpoint():
+            self._update_dart(dart)
+
+    def _update_dart(self, dart: Dart):
+        # the recorded commands refer to the darts and takes as they were before the edit
+        self._clear_history()
         take = dart.take
         idx = take.darts.index(dart)
         take.result = None
+        self._take_result_changed(take)
         from controllers.database_controller import DatabaseController
 
         tmp_darts = []
         print('TDARTS:', take.darts, 'dart_to_change:', dart,'idx:', idx)
-        for i in range(idx+1, len(take.darts)):
-            td = take.darts.pop(idx+1)
+        # remove the following darts from the last one on, so the scores can be rolled back dart by dart
+        while len(take.darts) > idx + 1:
+            td = take.darts.pop()
             td.take = None
             td.take_id = None
             DatabaseController._session.query(Dart).filter(Dart.id == td.id).delete()
-            DatabaseController._session.commit()
+            DatabaseController.commit()
             print('deleted', td)
-            tmp_darts.append(td)
+            self._dart_removed(take, td)
+            tmp_darts.insert(0, td)
+        old_segment = dart.get_segment()
+        dart.resolve_segment()
+        self._dart_changed(dart, old_segment)
         print('take updated:', take.darts, 'deleted darts:', [(d, d.take_id, d.take) for d in tmp_darts])
         self._internal_handle_take_completion(take.player, updated=True)
-        self._recalculate_leg_scores()
         for td in tmp_darts:
             if take.result is None:
                 td.take_id = take.id
                 make_transient(td)
                 td.take = take
-                DatabaseController._session.commit()
+                DatabaseController.commit()
                 # td.take = take
+                self._dart_added(td)
                 self._internal_handle_take_completion(take.player, updated=True)
             else:
                 del td
@@ -308,16 +474,34 @@ class Game(BaseObject.Base):
         self.updated.emit()
 
     def add_dart(self, dart: "Dart") -> None:
-        with self._undo_lock:
+        from controllers.database_controller import DatabaseController
+        # the dart, its take and the events logging them are committed at once
+        with self._undo_lock, DatabaseController.checkpoint():
+            self._redo.clear()
             self._add_dart_to_player(dart, self.get_current_player())
 
+    def redo_dart(self) -> None:
+        """
+        throws the last undone dart again
+        """
+        from controllers.database_controller import DatabaseController
+        with self._undo_lock, DatabaseController.checkpoint():
+            if not self._redo:
+                return
+            hit_location, target_location, intent = self._redo.pop()
+            self._add_dart_to_player(Dart(None, hit_location=hit_location, target_location=target_location,
+                                          intent=intent), self.get_current_player())
+
     def _add_dart_to_player(self, dart: "Dart", player: "Player"):
         from controllers.database_controller import DatabaseController
-        if not player.get_current_leg_takes() or player.get_current_take().is_complete():
-            take = DatabaseController.new_take(player, self.get_current_leg())
+        darts_left = player.darts_left
+        new_take = not player.get_current_leg_takes() or player.get_current_take().is_complete()
+        previous_take = player._current_take
+        if new_take:
+            leg = self.get_current_leg()
+            take = DatabaseController.new_take(player, leg)
+            self.take_index.add(take, leg, player)
             DatabaseController.new_dart(take, dart)
-            player._current_game_takes = None
-            player._current_leg_takes = None
             player.darts_left -= 1
         else:
             take = player.get_current_take()
@@ -325,6 +509,8 @@ class Game(BaseObject.Base):
             player.darts_left -= 1
         DatabaseController.update_entity(take)
         player._current_take = take
+        self._record(DartThrown(player, take, dart, new_take, previous_take, darts_left))
+        self._dart_added(dart)
         self._internal_handle_take_completion(player)
         cur_take = player.get_current_take()
         if cur_take.is_complete():
@@ -354,7 +540,6 @@ class Game(BaseObject.Base):
                                                   self._next_player])
                     else:
                         self.action_request.emit([self.set_in_progress,
-                                                  self._recalculate_leg_scores,
                                                   self._next_player])
                     self.updated.emit()
             print('############### SET BLOCKING!')
@@ -375,73 +560,89 @@ class Game(BaseObject.Base):
     def undo_dart(self) -> None:
         # print('###################### UNDO DART CALLED ########################')
         from controllers.database_controller import DatabaseController
+        with self._undo_lock, DatabaseController.checkpoint():
+            if self._history_darts == 0:
+                # nothing recorded (e.g. the game was loaded or darts were edited), work it out from the database
+                self._clear_history()
+                self._undo_dart_from_database()
+                return
+            # revert everything the last dart caused, then the dart itself
+            while True:
+                command = self._history.pop()
+                command.undo(self)
+                if isinstance(command, DartThrown):
+                    break
+            self._history_darts -= 1
+            DatabaseController.update_entity(self)
+            self.updated.emit()
+
+    def _undo_dart_from_database(self) -> None:
+        from controllers.database_controller import DatabaseController
 
         def revisit_take(take: Take, dart: Dart):
             if take is not None:  # if there was no deletion
+                # the score hooks read the removed take and dart afterwards, load them before they get detached
+                take.leg, dart.get_segment()
                 if take.size() == 0:
                     print('deleting take', take, take.id)
-                    take.player._current_leg_takes = None
-                    take.player._current_game_takes = None
+                    self.take_index.remove(take)
                     DatabaseController.remove_take(take)
 
                 else:
                     DatabaseController.remove_dart(dart)
 
-        with self._undo_lock:
-            cur_p = self.get_current_player()
+        cur_p = self.get_current_player()
 
-            # no darts in game -> return
-            # no darts in current leg -> remove last dart of winner of last leg
-            # ELSE
-            #
+        # no darts in game -> return
+        # no darts in current leg -> remove last dart of winner of last leg
+        # ELSE
+        #
 
-            if not self.has_darts():
-                # print('game not started yet')
-                return
-            else:
+        if not self.has_darts():
+            # print('game not started yet')
+            return
+        else:
 
-                if len(self.get_current_leg().takes) < 1:
-                    if len(self.get_current_set().legs) > 1:
-                        last_p = self.get_current_set().legs[-2].winner
-                    else:
-                        last_p = self.sets[-2].winner
+            if len(self.get_current_leg().takes) < 1:
+                if len(self.get_current_set().legs) > 1:
+                    last_p = self.get_current_set().legs[-2].winner
                 else:
-                    last_p = self.get_last_player()
-                print('checking state.')
-                print('curP cur take, lastP cur take', cur_p.get_current_take(), last_p.get_current_take())
-            if self.is_finished() or (cur_p.get_current_take() is not None
-                                      and cur_p.get_current_take().size() > 0
-                                      and 0 < cur_p.darts_left < 3):
-                print('remove CURRENT LAST')
-                revisit_take(*cur_p.remove_last_dart())
-                print(cur_p.name, 'setting player takes to NONE')
-                cur_p._current_game_takes = None
-                cur_p._current_take = None
-                self.winner = None
-                self.get_current_leg().winner = None
-                self.get_current_set().winner = None
-                self.status = GameStatus.IN_PROGRESS
-                self._recalculate_leg_scores()
-                self.updated.emit()
-            elif last_p.get_current_take() is not None\
-                    and last_p.get_current_take().size() > 0:
-                print('remove LAST last')
-                cur_p.darts_left = 0
-                revisit_take(*last_p.remove_last_dart())
-                print('DECREASE PLAYER TURN FROM ', self.player_turn)
-                self.player_turn = self.player_turn - 1 if self.player_turn > 0 else len(self.players) - 1
-                print('TO', self.player_turn)
-                self.winner = None
-                self.get_current_leg().winner = None
-                self.get_current_set().winner = None
-                self.status = GameStatus.IN_PROGRESS
-                print(self.get_current_player().name, 'setting player takes to NONE')
-                self.get_current_player()._current_game_takes = None
-                self.get_current_player()._current_take = None
-                self._recalculate_leg_scores()
-                self.updated.emit()
+                    last_p = self.sets[-2].winner
             else:
-                print('WEIRD', self.is_finished(),
-                      self.get_current_player().get_current_take().size(),
-                      self.get_current_player().darts_left)
+                last_p = self.get_last_player()
+            print('checking state.')
+            print('curP cur take, lastP cur take', cur_p.get_current_take(), last_p.get_current_take())
+        if self.is_finished() or (cur_p.get_current_take() is not None
+                                  and cur_p.get_current_take().size() > 0
+                                  and 0 < cur_p.darts_left < 3):
+            print('remove CURRENT LAST')
+            take, dart = cur_p.remove_last_dart()
+            revisit_take(take, dart)
+            cur_p._current_take = None
+            self.winner = None
+            self.get_current_leg().winner = None
+            self.get_current_set().winner = None
+            self.status = GameStatus.IN_PROGRESS
+            self._dart_removed(take, dart)
+            self.updated.emit()
+        elif last_p.get_current_take() is not None\
+                and last_p.get_current_take().size() > 0:
+            print('remove LAST last')
+            cur_p.darts_left = 0
+            take, dart = last_p.remove_last_dart()
+            revisit_take(take, dart)
+            print('DECREASE PLAYER TURN FROM ', self.player_turn)
+            self.player_turn = self.player_turn - 1 if self.player_turn > 0 else len(self.players) - 1
+            print('TO', self.player_turn)
+            self.winner = None
+            self.get_current_leg().winner = None
+            self.get_current_set().winner = None
+            self.status = GameStatus.IN_PROGRESS
+            self.get_current_player()._current_take = None
+            self._dart_removed(take, dart)
+            self.updated.emit()
+        else:
+            print('WEIRD', self.is_finished(),
+                  self.get_current_player().get_current_take().size(),
+                  self.get_current_player().darts_left)
 
@@ -0,0 +1,63 @@
+import datetime
+
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Enum, JSON, Index
+
+from database import BaseObject
+from database.types import GameEventType, TakeResult
+from models.board_geometry import Bed, Segment
+from models.helper import create_id_column
+
+# a snapshot of the score state is stored after this many events (and whenever a leg gets its first event)
+SNAPSHOT_INTERVAL = 50
+
+
+class GameEvent(BaseObject.Base):
+    """
+    append-only log of everything that changed the scores of a game.
+    the ids are no foreign keys on purpose: the log outlives darts and takes that get removed by undo
+    """
+    __tablename__ = 'game_events'
+    id = create_id_column('game_event')
+    game_id = Column(Integer, ForeignKey('games.id', ondelete='CASCADE'), nullable=False)
+    sequence = Column(Integer, nullable=False)
+    time_stamp = Column(DateTime)
+    type = Column(Enum(GameEventType))
+    leg_id = Column(Integer)
+    take_id = Column(Integer)
+    dart_id = Column(Integer)
+    player_id = Column(Integer)
+    sector = Column(Integer)
+    bed = Column(Enum(Bed))
+    score = Column(Integer)
+    # result of the take after the event
+    result = Column(Enum(TakeResult))
+    __table_args__ = (Index('ix_game_events_game_leg_sequence', 'game_id', 'leg_id', 'sequence'),)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time_stamp = datetime.datetime.now()
+
+    def get_segment(self) -> Segment:
+        return Segment(self.sector, self.bed)
+
+    def __repr__(self):
+        return '%s<%s, %s, take %s, dart %s>' % (self.__class__.__name__, self.sequence, self.type, self.take_id,
+                                                 self.dart_id)
+
+
+class GameSnapshot(BaseObject.Base):
+    """
+    serialized score state of a leg after the event with the given sequence
+    """
+    __tablename__ = 'game_snapshots'
+    id = create_id_column('game_snapshot')
+    game_id = Column(Integer, ForeignKey('games.id', ondelete='CASCADE'), nullable=False)
+    leg_id = Column(Integer, nullable=False)
+    sequence = Column(Integer, nullable=False)
+    time_stamp = Column(DateTime)
+    state = Column(JSON)
+    __table_args__ = (Index('ix_game_snapshots_game_leg_sequence', 'game_id', 'leg_id', 'sequence'),)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time_stamp = datetime.datetime.now()
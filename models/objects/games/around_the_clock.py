@@ -1,7 +1,10 @@
+from PyQt5.QtCore import QPointF
 from sqlalchemy import Column, Integer, ForeignKey, orm
 
-from database.types import DartIntent, TakeResult
-from models.dartboard import Segment, Bed, DartBoard
+from database.types import TakeResult
+from engine.around_the_clock import AroundTheClockTargets, around_the_clock_take_result
+from engine.strategies import around_the_clock_aim
+from models.dartboard import DartBoard
 from models.objects.dart import Dart
 from models.objects.game import Game
 from widgets.game_info_widgets.around_the_clock_info_widget import AroundTheClockInfoWidget
@@ -20,24 +23,25 @@ class AroundTheClock(Game):
     }
 
     def _recalculate_leg_scores(self):
-        self.player_scores = {p: 1 for p in self.players}
+        targets = AroundTheClockTargets(self.players)
         for take in self.get_current_leg().takes:
             for dart in take.darts:
-                if dart.get_segment().sector == self.player_scores[take.player]:
-                    self.player_scores[take.player] += 1
+                targets.add_dart(take.player, dart.get_segment())
+        self.player_scores = targets.targets
 
     def generate_next_dart(self) -> "Dart":
         player = self.get_current_player()
-        target_segment = Segment(self.get_player_score(player), Bed.OUTER_SINGLE)
-        target = DartBoard.get_center_estimate(target_segment)
+        point, intent = around_the_clock_aim(self.get_player_score(player))
+        target = QPointF(*point)
         dart = Dart(player.get_current_take(), hit_location=DartBoard.aim_dart_at(
             target, player.horizontal_deviation, player.vertical_deviation
-        ), target_location=target, intent=DartIntent.CHECKOUT)
+        ), target_location=target, intent=intent)
         return dart
 
     def _handle_take_completion(self, player: "Player", updated=False) -> None:
-        if self.get_player_score(player) == 21:
+        take = player.get_current_take()
+        result = around_the_clock_take_result(self.get_player_score(player), take.size())
+        if result == TakeResult.WIN:
             player.darts_left = 0
-            self._complete_take(player.get_current_take(), result=TakeResult.WIN)
-        elif player.get_current_take().size() > 2:
-            self._complete_take(player.get_current_take(), result=TakeResult.FINISHED)
+        if result is not None:
+            self._complete_take(take, result=result)
@@ -1,9 +1,15 @@
-from typing import List
+from typing import List, Dict, Union
 
+import numpy as np
+from PyQt5.QtCore import QPointF
 from sqlalchemy import Column, Integer, ForeignKey, Boolean
 
-from database.types import DartIntent, TakeResult
-from models.dartboard import Segment, Bed, DartBoard
+from database.types import TakeResult, GameEventType
+from engine.cricket import CricketMarks, GOAL_SEGMENTS, cricket_take_result
+from engine.strategies import cricket_aim, cricket_aim_map
+from logic.settings import Settings
+from models.aim_map import AimMap
+from models.dartboard import DartBoard, Segment
 from models.helper import Option
 from models.objects.dart import Dart
 from models.objects.game import Game
@@ -11,6 +17,42 @@ from widgets.game_info_widgets.cricket_info_widget import CricketInfoWidget
 from widgets.game_info_widgets.game_info_widget import GameInfoWidget
 
 
+class CricketLegMarks(CricketMarks):
+    """
+    marks of one leg of the game, darts are identified by their id
+    """
+    def __init__(self, leg: "Leg", goal_segments: List[int], players: List["Player"], cut_throat: bool):
+        super().__init__(goal_segments, players, cut_throat)
+        self.leg = leg
+        self._players = {player.id: player for player in players}  # type: Dict[int, Player]
+
+    def replay(self, takes: List["Take"]):
+        for take in takes:
+            for dart in take.darts:
+                self.add_dart(take.player, dart.id, dart.get_segment())
+
+    def apply_event(self, event: "GameEvent"):
+        if event.type == GameEventType.DART_ADDED:
+            self.add_dart(self._players[event.player_id], event.dart_id, event.get_segment())
+        elif event.type == GameEventType.DART_REMOVED and not self.remove_last_dart(event.dart_id):
+            raise ValueError('dart %s is not the last dart of the leg' % event.dart_id)
+
+    def to_json(self) -> dict:
+        return {
+            'players': [player.id for player in self.columns],
+            'marks': self.marks.tolist(),
+            'scores': self.scores.tolist(),
+            'log': [list(entry) for entry in self._log]
+        }
+
+    def load_json(self, json: dict):
+        if json['players'] != [player.id for player in self.columns]:
+            raise ValueError('snapshot of other players')
+        self.marks = np.array(json['marks'], dtype=np.int32)
+        self.scores = np.array(json['scores'], dtype=np.int32)
+        self._log = [tuple(entry) for entry in json['log']]
+
+
 class Cricket(Game):
     def create_game_info_widget(self, parent) -> GameInfoWidget:
         return CricketInfoWidget(game=self, parent=parent)
@@ -22,8 +64,8 @@ class Cricket(Game):
         'polymorphic_identity': 'cricket',
         'polymorphic_load': 'inline'
     }
-    goal_segments = [20, 19, 18, 17, 16, 15, 25]
-    sector_hits = {}
+    goal_segments = GOAL_SEGMENTS
+    _marks = None  # type: CricketLegMarks
 
     @classmethod
     def get_option_list(cls) -> List[Option]:
@@ -43,34 +85,75 @@ class Cricket(Game):
         self.win_function = min if self.cut_throat else max
 
     def is_closed(self, sector):
-        return min(self.sector_hits[sector].values()) >= 3
+        return self.get_marks().is_closed(sector)
 
     def is_closed_by_all_opponents_of(self, player: "Player", sector: int):
-        return min([self.sector_hits[sector][p] for p in self.players if p != player]) >= 3
+        return self.get_marks().is_closed_by_all_opponents_of(player, sector)
+
+    def get_marks(self) -> CricketLegMarks:
+        """
+        marks of the current leg, only replayed when the leg changed since the last dart
+        """
+        if self._get_current_marks() is None:
+            self._recalculate_leg_scores()
+        return self._marks
+
+    def _get_current_marks(self) -> Union[CricketLegMarks, None]:
+        if self._marks is None or self._marks.leg is not self.get_current_leg():
+            return None
+        return self._marks
+
+    def _new_leg_state(self, leg: "Leg") -> CricketLegMarks:
+        return CricketLegMarks(leg, self.goal_segments, self.players, self.cut_throat)
+
+    def _get_leg_state(self) -> Union[CricketLegMarks, None]:
+        return self._get_current_marks()
+
+    def _recalculate_leg_scores(self, from_log=True):
+        self._marks = self._load_leg_state(from_log)
+        self._update_player_scores()
+
+    def _update_player_scores(self):
+        self.player_scores = {player: self._marks.get_score(player) for player in self._marks.columns}
+        if Settings.VERIFY_LEG_SCORES.get():
+            replayed = self._new_leg_state(self.get_current_leg())
+            replayed.replay(self.get_current_leg().takes)
+            if not (np.array_equal(replayed.marks, self._marks.marks)
+                    and np.array_equal(replayed.scores, self._marks.scores)):
+                print('LEG SCORES OUT OF SYNC:', self._marks.marks.tolist(), self._marks.scores.tolist(),
+                      'replay:', replayed.marks.tolist(), replayed.scores.tolist())
+                self._marks = replayed
+                self.player_scores = {player: self._marks.get_score(player) for player in self._marks.columns}
+
+    def get_player_score(self, player: "Player") -> int:
+        return self.get_marks().get_score(player)
+
+    def _on_dart_added(self, dart: "Dart") -> None:
+        marks = self._get_current_marks()
+        if marks is None or dart.take.leg is not marks.leg:
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            marks.add_dart(dart.take.player, dart.id, dart.get_segment())
+            self._update_player_scores()
 
-    def _recalculate_leg_scores(self):
-        self.sector_hits = {
-            s: {p: 0 for p in self.players} for s in self.goal_segments
-        }
-        self.player_scores = {p: 0 for p in self.players}
-        for take in self.get_current_leg().takes:
-            for dart in take.darts:
-                if dart.get_segment().sector in self.goal_segments:
-
-                    if not self.is_closed(dart.get_segment().sector):
-                        for hit in range(dart.get_segment().bed.get_multiplier()):
-                            self.sector_hits[dart.get_segment().sector][take.player] += 1
-                            if self.is_closed(dart.get_segment().sector):
-                                break
-                        diff = min(dart.get_segment().bed.get_multiplier(),
-                                   self.sector_hits[dart.get_segment().sector][take.player] - 3)
-                        if diff > 0:
-                            if self.cut_throat:
-                                for p in self.players:
-                                    if p != take.player and self.sector_hits[dart.get_segment().sector][p] < 3:
-                                        self.player_scores[p] += diff * dart.get_segment().sector
-                            else:
-                                self.player_scores[take.player] += diff * dart.get_segment().sector
+    def _on_dart_removed(self, take: Union["Take", None], dart: Union["Dart", None]) -> None:
+        marks = self._get_current_marks()
+        if marks is None or dart is None or not marks.remove_last_dart(dart.id):
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            self._update_player_scores()
+
+    def _on_dart_changed(self, dart: "Dart", old_segment: Segment) -> None:
+        marks = self._get_current_marks()
+        if marks is None or not marks.remove_last_dart(dart.id):
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            marks.add_dart(dart.take.player, dart.id, dart.get_segment())
+            self._update_player_scores()
+
+    def _on_take_result_changed(self, take: "Take") -> None:
+        # the result of a take does not change any marks
+        pass
 
     def add_dart(self, dart: "Dart") -> None:
         super().add_dart(dart)
@@ -79,39 +162,22 @@ class Cricket(Game):
         super().undo_dart()
         self.updated.emit()
 
-    @staticmethod
-    def max_sector(sectors: List[int]):
-        # bulls-eye is hard, dont choose this for scoring if there is another option...
-        values = {sector: 25 if sector == 25 else sector * 3 for sector in sectors}
-        return max(values, key=values.get)
+    def get_aim_map(self, player: "Player") -> AimMap:
+        return cricket_aim_map(self.get_marks(), player, self.goal_segments)
 
     def generate_next_dart(self) -> "Dart":
         player = self.get_current_player()
-        if self.player_scores[player] == self.win_function(self.player_scores.values()):
-            # player is leading -> close next highest segment
-            sc = self.max_sector([gs for gs in self.goal_segments if not self.sector_hits[gs][player] > 2])
-        else:
-            # player is behind -> find scoring segment
-            if self.cut_throat:
-                # find scoring segment to attack the leading player
-                best_player = min(self.player_scores, key=self.player_scores.get)
-                print('detected opponent:', best_player.name)
-                sc = self.max_sector([gs for gs in self.goal_segments if not self.sector_hits[gs][best_player] > 2])
-            else:
-                # find highest possible scoring segment
-                sc = self.max_sector([gs for gs in self.goal_segments if not self.is_closed_by_all_opponents_of(player, gs)])
-
-        target_segment = Segment(sc, Bed.DOUBLE if sc == 25 else Bed.TRIPLE)
-        target = DartBoard.get_center_estimate(target_segment)
+        point, intent = cricket_aim(self.get_marks(), player, self.goal_segments)
+        target = QPointF(*point)
         dart = Dart(player.get_current_take(), hit_location=DartBoard.aim_dart_at(
             target, player.horizontal_deviation, player.vertical_deviation
-        ), target_location=target, intent=DartIntent.CHECKOUT)
+        ), target_location=target, intent=intent)
         return dart
 
     def _handle_take_completion(self, player: "Player", updated=False) -> None:
-        if self.get_player_score(player) == self.win_function(self.player_scores.values()) and \
-                min([sector_hits[player] for sector_hits in self.sector_hits.values()]) >= 3:
+        take = player.get_current_take()
+        result = cricket_take_result(self.get_marks(), player, take.size())
+        if result == TakeResult.WIN:
             player.darts_left = 0
-            self._complete_take(player.get_current_take(), result=TakeResult.WIN)
-        elif player.get_current_take().size() > 2:
-            self._complete_take(player.get_current_take(), result=TakeResult.FINISHED)
+        if result is not None:
+            self._complete_take(take, result=result)
@@ -1,9 +1,14 @@
-from typing import List
+from typing import List, Dict, Union
 
+from PyQt5.QtCore import QPointF
 from sqlalchemy import Column, Integer, ForeignKey, Boolean, orm
 
-from database.types import DartIntent, TakeResult
-from models.dartboard import DartBoard, Bed, Segment
+from database.types import TakeResult, GameEventType
+from engine.strategies import x01_aim
+from engine.x01 import X01Scores, x01_take_result
+from logic.settings import Settings
+from models.aim_map import AimMap, get_aim_map
+from models.dartboard import DartBoard, Segment
 from models.helper import Option
 from models.objects.dart import Dart
 from models.objects.game import Game
@@ -11,6 +16,44 @@ from widgets.game_info_widgets.x01_info_widget import X01InfoWidget
 from widgets.game_info_widgets.game_info_widget import GameInfoWidget
 
 
+class X01LegScores(X01Scores):
+    """
+    remaining scores of the players in one leg, updated dart by dart instead of replaying the whole leg.
+    takes are identified by their id
+    """
+    def __init__(self, leg: "Leg", start_score: int, players: List["Player"]):
+        super().__init__(start_score, players)
+        self.leg = leg
+        self._players = {player.id: player for player in players}  # type: Dict[int, Player]
+
+    def replay(self, takes: List["Take"]):
+        for take in takes:
+            for dart in take.darts:
+                self.add_dart(take.id, take.player, dart.get_score())
+            self.set_busted(take.id, take.player, take.result == TakeResult.BUST)
+
+    def apply_event(self, event: "GameEvent"):
+        player = self._players[event.player_id]
+        if event.type == GameEventType.DART_ADDED:
+            self.add_dart(event.take_id, player, event.score)
+        elif event.type == GameEventType.DART_REMOVED:
+            self.remove_dart(event.take_id, player, event.score)
+        self.set_busted(event.take_id, player, event.result == TakeResult.BUST)
+
+    def to_json(self) -> dict:
+        return {
+            'scores': {str(player.id): score for player, score in self.scores.items()},
+            'takes': {str(take_id): score for take_id, score in self._take_scores.items()},
+            'busted': sorted(self._busted)
+        }
+
+    def load_json(self, json: dict):
+        for player_id, score in json['scores'].items():
+            self.scores[self._players[int(player_id)]] = score
+        self._take_scores = {int(take_id): score for take_id, score in json['takes'].items()}
+        self._busted = set(json['busted'])
+
+
 class X01(Game):
 
     def create_game_info_widget(self, parent) -> GameInfoWidget:
@@ -25,6 +68,7 @@ class X01(Game):
         'polymorphic_identity': 'x01',
         'polymorphic_load': 'inline'
     }
+    _leg_scores = None  # type: X01LegScores
 
     @classmethod
     def get_option_list(cls) -> List[Option]:
@@ -67,74 +111,94 @@ class X01(Game):
     def get_name(self):
         return '%s01' % self.x
 
-    def _recalculate_leg_scores(self):
-        self.player_scores = {p: (self.x*100 + 1) for p in self.players}
-        for take in self.get_current_leg().takes:
-            if not take.result == TakeResult.BUST:
-                self.player_scores[take.player] -= sum(d.get_score() for d in take.darts)
+    @classmethod
+    def get_summary_name(cls, options: dict) -> str:
+        return '%s01' % options['x']
+
+    def _new_leg_state(self, leg: "Leg") -> X01LegScores:
+        return X01LegScores(leg, self.x * 100 + 1, self.players)
+
+    def _get_leg_state(self) -> Union[X01LegScores, None]:
+        return self._get_leg_scores()
+
+    def _recalculate_leg_scores(self, from_log=True):
+        self._leg_scores = self._load_leg_state(from_log)
+        self.player_scores = self._leg_scores.scores
+
+    def _get_leg_scores(self) -> Union[X01LegScores, None]:
+        """
+        the incremental state, None if it has to be rebuilt (e.g. after the game was loaded or undo went back a leg)
+        """
+        leg_scores = self._leg_scores
+        if leg_scores is None or leg_scores.leg is not self.get_current_leg() \
+                or leg_scores.scores is not self.player_scores:
+            return None
+        return leg_scores
+
+    def _check_leg_scores(self):
+        if Settings.VERIFY_LEG_SCORES.get():
+            replayed = self._new_leg_state(self.get_current_leg())
+            replayed.replay(self.get_current_leg().takes)
+            if replayed.scores != self.player_scores:
+                print('LEG SCORES OUT OF SYNC:', {p.name: s for p, s in self.player_scores.items()},
+                      'replay:', {p.name: s for p, s in replayed.scores.items()})
+                self._leg_scores = replayed
+                self.player_scores = replayed.scores
+
+    def _on_dart_added(self, dart: "Dart") -> None:
+        leg_scores = self._get_leg_scores()
+        if leg_scores is None or dart.take.leg is not leg_scores.leg:
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            leg_scores.add_dart(dart.take.id, dart.take.player, dart.get_score())
+        self._check_leg_scores()
+
+    def _on_dart_removed(self, take: Union["Take", None], dart: Union["Dart", None]) -> None:
+        leg_scores = self._get_leg_scores()
+        if leg_scores is None or take is None or dart is None or take.leg is not leg_scores.leg:
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            leg_scores.remove_dart(take.id, take.player, dart.get_score())
+            leg_scores.set_busted(take.id, take.player, take.result == TakeResult.BUST)
+        self._check_leg_scores()
+
+    def _on_dart_changed(self, dart: "Dart", old_segment: Segment) -> None:
+        leg_scores = self._get_leg_scores()
+        if leg_scores is None or dart.take.leg is not leg_scores.leg:
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            leg_scores.remove_dart(dart.take.id, dart.take.player, old_segment.score())
+            leg_scores.add_dart(dart.take.id, dart.take.player, dart.get_score())
+        self._check_leg_scores()
+
+    def _on_take_result_changed(self, take: "Take") -> None:
+        leg_scores = self._get_leg_scores()
+        if leg_scores is None or take.leg is not leg_scores.leg:
+            self._recalculate_leg_scores(from_log=False)
+        else:
+            leg_scores.set_busted(take.id, take.player, take.result == TakeResult.BUST)
+        self._check_leg_scores()
+
+    def get_aim_map(self, player: "Player") -> AimMap:
+        return get_aim_map(player.horizontal_deviation, player.vertical_deviation)
 
     def generate_next_dart(self) -> "Dart":
         player = self.get_current_player()
-        score = self.get_player_score(player)
-        target_segment = None
-        intent = DartIntent.SCORE
-        if score > 100:
-            # scoring
-            target_segment = player.get_preferred_scoring_segment()
-            print(player.name, 'with', score, '-> trying to score on', target_segment)
-        else:
-            available_scores = DartBoard.get_available_scores()
-            if self.double_out:
-                available_scores = {score: [s for s in segments if s.bed == Bed.DOUBLE] for score, segments in
-                                    available_scores.items() if [s for s in segments if s.bed == Bed.DOUBLE]}
-                print('DOUBLEOUT:', available_scores)
-            if score in available_scores.keys():
-                # CHECKOUT POSSIBLE!
-                if self.double_out:
-                    target_segment = Segment(int(score/2), Bed.DOUBLE)
-                else:
-                    target_segment = DartBoard.easiest_segment_for_score(score)
-                intent = DartIntent.CHECKOUT
-            else:
-                # SETUP NEEDED
-                intent = DartIntent.SETUP
-                if self.double_out:
-                    for dbl in player.preferred_doubles:
-                        print('testing', dbl, 'for score', score, ':', score - (2 * dbl))
-                        if score - (2 * dbl) in DartBoard.get_available_scores().keys():
-                            target_segment = DartBoard.easiest_segment_for_score(score - 2 * dbl)
-                            print('GOT: ', target_segment)
-                            break
-                    if target_segment is None:
-                        if score < 40:
-                            target_segment = Segment(1, Bed.OUTER_SINGLE)
-                        else:
-                            # TODO: find better ways
-                            target_segment = Segment(25, Bed.DOUBLE)
-                else:
-                    if score > 60:
-                        # TODO: find better ways
-                        target_segment = Segment(25, Bed.DOUBLE)
-                    elif score > 40:
-                        target_segment = Segment(score - 40, Bed.OUTER_SINGLE)
-                    elif score > 20:
-                        target_segment = Segment(score - 20, Bed.OUTER_SINGLE)
-
-        target = DartBoard.get_center_estimate(target_segment)
+        take = player.get_current_take() if player.get_current_leg_takes() else None
+        darts_left = 3 - take.size() if take is not None and not take.is_complete() else 3
+        point, intent = x01_aim(self.get_player_score(player), self.double_out, player, darts_left)
+        target = QPointF(*point)
         dart = Dart(player.get_current_take(), hit_location=DartBoard.aim_dart_at(
             target, player.horizontal_deviation, player.vertical_deviation
         ), target_location=target, intent=intent)
         return dart
 
     def _handle_take_completion(self, player: "Player", updated=False) -> None:
-        score = self.get_player_score(player)
-        if score < 0 or (self.double_out and score == 0
-                         and player.get_current_take().darts[-1].get_segment().bed != Bed.DOUBLE):
-            self._complete_take(player.get_current_take(), result=TakeResult.BUST)
-        elif score == 0:
-            self._complete_take(player.get_current_take(), result=TakeResult.WIN)
-        elif player.get_current_take().size() > 2:
-            self._complete_take(player.get_current_take(), result=TakeResult.FINISHED)
+        take = player.get_current_take()
+        result = x01_take_result(self.get_player_score(player), take.darts[-1].get_segment(), take.size(),
+                                 self.double_out)
+        if result is not None:
+            self._complete_take(take, result=result)
 
     def _announce_take_result(self, score: int):
         from controllers.sound_controller import SoundController, SoundJob
@@ -1,7 +1,7 @@
 import datetime
 from typing import List
 
-from sqlalchemy import Column, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import BaseObject
@@ -16,12 +16,13 @@ class Leg(BaseObject.Base):
     set_id = Column(Integer, ForeignKey('sets.id', ondelete='CASCADE'), nullable=False)
     beginner_id = Column(Integer, ForeignKey('players.id'))
     winner_id = Column(Integer, ForeignKey('players.id'))
-    set = relationship('Set', back_populates='legs', single_parent=True,
-                       lazy='joined')  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
+    set = relationship('Set', back_populates='legs',
+                       single_parent=True)  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
     takes = relationship('Take', order_by=Take.start_time,
                          back_populates='leg', passive_deletes='all', lazy='joined')  # type: List[Take]
     beginner = relationship('Player', foreign_keys=[beginner_id])
     winner = relationship('Player', foreign_keys=[winner_id])
+    __table_args__ = (Index('ix_legs_set_start_time', 'set_id', 'start_time'),)
 
     def __init__(self, set: "Set", beginner: "Player", *args, **kwargs):
         super().__init__(*args, **kwargs)
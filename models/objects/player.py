@@ -8,8 +8,6 @@ from database.types import SQLSegment, IntList, TakeResult
 from models.dartboard import Segment, Bed
 from models.objects.game import Game
 from models.helper import create_id_column
-from models.objects.leg import Leg
-from models.objects.take import Take
 
 
 class Player(BaseObject.Base):
@@ -27,9 +25,6 @@ class Player(BaseObject.Base):
     color = QColor(255, 0, 0)
     darts_left = 0
     _current_game = None
-    _current_leg_takes = None
-    _current_set_takes = None
-    _current_game_takes = None
     _current_take = None
 
     def __init__(self, *args, **kwargs):
@@ -42,9 +37,6 @@ class Player(BaseObject.Base):
 
     def reset_cached_data(self):
         self._current_game = None
-        self._current_leg_takes = None
-        self._current_set_takes = None
-        self._current_game_takes = None
         self._current_take = None
 
     def remove_last_dart(self) -> Tuple[Union["Take", None], Union["Dart", None]]:
@@ -58,8 +50,7 @@ class Player(BaseObject.Base):
                 last_take.result = None
                 self.darts_left = 3 - last_take.size()
                 if last_take.size() == 0:
-                    print(self._current_leg_takes, last_take)
-                    self.get_current_leg_takes().remove(last_take)
+                    self.get_current_game().take_index.remove(last_take)
                     self._current_take = None
                 return last_take, removed_dart
         return None, None
@@ -78,32 +69,13 @@ class Player(BaseObject.Base):
         return self._current_game
 
     def get_current_game_takes(self) -> List["Take"]:
-        if True:  # self._current_game_takes is None:
-            self._current_game_takes = self.all_takes.filter(
-                Take.leg.has(Leg.set_id.in_([set.id for set in self.get_current_game().sets]))).all()
-            # print('REINIT CURRENT GAME TAKES for', self.name, 'to len ', self._current_game_takes.__len__())
-        return self._current_game_takes
+        return self.get_current_game().take_index.game_takes(self)
 
     def get_current_leg_takes(self) -> List["Take"]:
-        if self._current_leg_takes is None:
-            try:
-                cur_leg_id = self.get_current_game().sets[-1].legs[-1].id
-                self._current_leg_takes = self.all_takes.filter(
-                    Take.leg.has(Leg.id == cur_leg_id)).all()
-                # print('REINIT CURRENT LEG TAKES for', self.name, 'to len ', self._current_leg_takes.__len__())
-            except IndexError:
-                return []
-        return self._current_leg_takes
+        return self.get_current_game().take_index.leg_takes(self)
 
     def get_current_set_takes(self) -> List["Take"]:
-        if True:  # self._current_set_takes is None:
-            try:
-                cur_set_id = self.get_current_game().sets[-1].id
-                self._current_set_takes = self.all_takes.filter(
-                Take.leg.has(Leg.set_id.in_([cur_set_id]))).all()
-            except IndexError:
-                return []
-        return self._current_set_takes
+        return self.get_current_game().take_index.set_takes(self)
 
     def get_darts_left(self):
         return self.darts_left
@@ -111,9 +83,7 @@ class Player(BaseObject.Base):
     def get_current_take(self) -> "Take":
         # print('get cgt for', self.name)
         if self._current_take is None:
-            takes = self.get_current_game_takes()
-            if takes:
-                self._current_take = takes[-1]
+            self._current_take = self.get_current_game().take_index.last_take(self)
         return self._current_take
 
     def get_cumulative_score(self) -> int:
@@ -1,7 +1,7 @@
 import datetime
 from typing import List
 
-from sqlalchemy import Column, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import BaseObject
 from models.helper import create_id_column
@@ -20,6 +20,7 @@ class Set(BaseObject.Base):
                         passive_deletes='all', back_populates='set')  # type: List[Leg]
     beginner = relationship('Player', foreign_keys=[beginner_id], lazy='joined')
     winner = relationship('Player', foreign_keys=[winner_id], lazy='joined')
+    __table_args__ = (Index('ix_sets_game_start_time', 'game_id', 'start_time'),)
 
     def __init__(self, game: "Game", beginner: "Player", *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1,7 +1,7 @@
 import datetime
 from typing import List
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 
 from database import BaseObject
@@ -17,11 +17,14 @@ class Take(BaseObject.Base):
     player_id = Column(Integer, ForeignKey('players.id'))
     start_time = Column(DateTime)
     result = Column(Enum(TakeResult))
-    leg = relationship('Leg', back_populates='takes', single_parent=True,
-                       lazy='joined')  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
+    leg = relationship('Leg', back_populates='takes',
+                       single_parent=True)  # IF PROBLEMS ARISE RE-ADD passive_deletes='all' !!
     player = relationship('Player', back_populates='all_takes', lazy='joined')
     darts = relationship('Dart', order_by=Dart.time_stamp, back_populates='take',
                          lazy='joined')  # type: List[Dart]
+    # the takes of a player in the current game/set/leg, and the takes of a leg in order
+    __table_args__ = (Index('ix_takes_player_leg', 'player_id', 'leg_id'),
+                      Index('ix_takes_leg_start_time', 'leg_id', 'start_time'))
 
     def __init__(self, leg: "Leg", player: "Player", *args, **kwargs):
         super().__init__(*args, **kwargs)
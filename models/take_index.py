@@ -0,0 +1,90 @@
+"""
+the takes of a running game per set, leg and player, kept in memory next to the session.
+it is loaded with a single query on first use and then maintained by the game itself (new takes and legs, undone
+takes and legs), so the takes of the current leg, set or game are list lookups instead of queries.
+"""
+from typing import Dict, List, Tuple, Union
+
+from sqlalchemy.orm import object_session
+
+
+class TakeIndex(object):
+    def __init__(self, game: "Game"):
+        self.game = game
+        self._legs = None  # type: List[Tuple["Set", "Leg"]]
+        self._takes = None  # type: Dict[Tuple["Leg", "Player"], List["Take"]]
+
+    def clear(self) -> None:
+        """
+        forgets everything, the next lookup loads it again
+        """
+        self._legs = None
+        self._takes = None
+
+    def _load(self) -> None:
+        if self._takes is not None:
+            return
+        from models.objects.leg import Leg
+        from models.objects.set import Set
+        from models.objects.take import Take
+        self._legs = [(set, leg) for set in self.game.sets for leg in set.legs]
+        self._takes = {}
+        session = object_session(self.game)
+        if session is not None and self.game.id is not None:
+            for take in session.query(Take).join(Take.leg).join(Leg.set).filter(Set.game_id == self.game.id) \
+                    .order_by(Take.id):
+                self._takes.setdefault((take.leg, take.player), []).append(take)
+
+    def _takes_of(self, legs: List[Tuple["Set", "Leg"]], player: "Player") -> List["Take"]:
+        return [take for _, leg in legs for take in self._takes.get((leg, player), [])]
+
+    def leg_takes(self, player: "Player") -> List["Take"]:
+        """
+        the takes of the player in the current leg, in the order they were thrown
+        """
+        self._load()
+        if not self._legs:
+            return []
+        return self._takes_of(self._legs[-1:], player)
+
+    def set_takes(self, player: "Player") -> List["Take"]:
+        self._load()
+        if not self._legs:
+            return []
+        current_set = self._legs[-1][0]
+        return self._takes_of([(set, leg) for set, leg in self._legs if set is current_set], player)
+
+    def game_takes(self, player: "Player") -> List["Take"]:
+        self._load()
+        return self._takes_of(self._legs, player)
+
+    def last_take(self, player: "Player") -> Union["Take", None]:
+        self._load()
+        for _, leg in reversed(self._legs):
+            takes = self._takes.get((leg, player))
+            if takes:
+                return takes[-1]
+        return None
+
+    # until the first lookup there is nothing to update, loading finds everything in the session
+
+    def add_leg(self, set: "Set", leg: "Leg") -> None:
+        if self._takes is not None:
+            self._legs.append((set, leg))
+
+    def remove_leg(self, leg: "Leg") -> None:
+        if self._takes is not None:
+            self._legs = [(s, l) for s, l in self._legs if l is not leg]
+            for key in [key for key in self._takes if key[0] is leg]:
+                del self._takes[key]
+
+    def add(self, take: "Take", leg: "Leg", player: "Player") -> None:
+        if self._takes is not None:
+            self._takes.setdefault((leg, player), []).append(take)
+
+    def remove(self, take: "Take") -> None:
+        if self._takes is not None:
+            for takes in self._takes.values():
+                if take in takes:
+                    takes.remove(take)
+                    return
@@ -0,0 +1,187 @@
+"""
+expected darts to finish an x01 leg for a player with a gaussian spread, and the segment to aim at for it.
+the leg is a markov decision process over (score at the start of the take, score, darts left in the take):
+a bust goes back to the start of the take, so every start score is solved on its own, from low to high,
+with the expected darts of all lower start scores known. solved tables are written to the cache directory
+per (x, double in, double out, deviation bucket) and only loaded afterwards.
+"""
+import os
+from typing import Tuple, Union
+
+import numpy as np
+
+from logic.helper import LimitedSizeDict
+from models import board_geometry
+from models.board_geometry import Segment, Bed
+from models.cache import cache_path, write_atomically
+from models.checkout_policy import hit_probabilities, deviation_bucket, AIM_SEGMENTS
+from models.checkout_table import OutMode, is_finishing_segment
+
+TABLE_VERSION = 1
+DARTS_PER_TAKE = 3
+MAX_DART_SCORE = 60
+# points a take can score before the dart with the given number of darts left
+MAX_OFFSETS = [MAX_DART_SCORE * (DARTS_PER_TAKE - darts) for darts in range(DARTS_PER_TAKE + 1)]
+_AIM_LABELS = np.array([board_geometry.LABELS[segment] for segment in AIM_SEGMENTS], dtype=np.uint8)
+_SOLVE_ITERATIONS = 100
+
+
+def table_path(x: int, double_in: bool, double_out: bool, h_dev_mm: float, v_dev_mm: float) -> str:
+    return cache_path('x01_values_%d01%s%s_%gx%gmm.npz' % (x, '_di' if double_in else '', '_do' if double_out else '',
+                                                          h_dev_mm, v_dev_mm))
+
+
+def solve(start_score: int, double_in: bool, double_out: bool, h_dev_mm: float, v_dev_mm: float) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """
+    values[take start, offset, darts left - 1] are the expected darts to finish from the score take start - offset
+    with that many darts left in the take, targets the label of the segment to aim at (0 where the state can't
+    be reached). with double in, the take start start_score at offset 0 is the state of not being in yet
+    """
+    hits = hit_probabilities(h_dev_mm, v_dev_mm).T  # [label, aim]
+    mode = OutMode.from_double_out(double_out)
+    label_scores = board_geometry.LABEL_SCORES
+    finishing = np.array([is_finishing_segment(segment, mode) and segment.score() > 0
+                          for segment in board_geometry.LABEL_SEGMENTS])
+    doubles = np.array([segment.bed == Bed.DOUBLE for segment in board_geometry.LABEL_SEGMENTS])
+    lowest_rest = 2 if mode != OutMode.STRAIGHT else 1
+    # offset after every dart, per darts left
+    new_offsets = [np.arange(MAX_OFFSETS[darts] + 1)[:, np.newaxis] + label_scores[np.newaxis, :]
+                   for darts in range(DARTS_PER_TAKE + 1)]
+
+    values = np.full((start_score + 1, MAX_OFFSETS[1] + 1, DARTS_PER_TAKE), np.nan, dtype=np.float32)
+    targets = np.zeros((start_score + 1, MAX_OFFSETS[1] + 1, DARTS_PER_TAKE), dtype=np.uint8)
+    expected = np.zeros(start_score + 1)  # expected darts from the start of a take
+    values[0] = 0.0
+    for start in range(1, start_score + 1):
+        not_in = double_in and start == start_score
+        guess = expected[start - 1] + 1.0
+        for _ in range(_SOLVE_ITERATIONS):
+            # every value is affine in the expected darts of this take start (busts and misses come back to it):
+            # constant + factor * guess
+            constants, factors, aims = [None] * (DARTS_PER_TAKE + 1), [None] * (DARTS_PER_TAKE + 1), {}
+            for darts in range(1, DARTS_PER_TAKE + 1):
+                offsets = new_offsets[darts]
+                rests = start - offsets
+                dart_constants = np.zeros(offsets.shape)
+                dart_factors = np.zeros(offsets.shape)
+                finished = (rests == 0) & finishing[np.newaxis, :]
+                busted = ~finished & (rests < lowest_rest)
+                going_on = ~finished & ~busted
+                dart_factors[busted] = 1.0
+                if darts == 1:
+                    # the next take starts from the rest, with this take start if nothing was scored
+                    next_start = np.clip(rests, 0, start)
+                    dart_constants[going_on] = expected[next_start[going_on]]
+                    dart_factors[going_on & (rests == start)] = 1.0
+                    dart_constants[going_on & (rests == start)] = 0.0
+                else:
+                    clipped = np.clip(offsets, 0, MAX_OFFSETS[darts - 1])
+                    dart_constants[going_on] = constants[darts - 1][clipped[going_on]]
+                    dart_factors[going_on] = factors[darts - 1][clipped[going_on]]
+                if not_in:
+                    # not in yet: only a double counts, everything else stays at the start (offset 0)
+                    stay = ~doubles
+                    if darts == 1:
+                        dart_constants[0, stay] = 0.0
+                        dart_factors[0, stay] = 1.0
+                    else:
+                        dart_constants[0, stay] = constants[darts - 1][0]
+                        dart_factors[0, stay] = factors[darts - 1][0]
+                # one dart plus the expected rest, for every aim
+                aim_constants = 1.0 + dart_constants @ hits
+                aim_factors = dart_factors @ hits
+                best = np.argmin(aim_constants + aim_factors * guess, axis=1)
+                rows = np.arange(len(best))
+                constants[darts] = aim_constants[rows, best]
+                factors[darts] = aim_factors[rows, best]
+                aims[darts] = best
+            solved = constants[DARTS_PER_TAKE][0] / max(1.0 - factors[DARTS_PER_TAKE][0], 1e-12)
+            converged = abs(solved - guess) < 1e-9
+            guess = solved
+            if converged:
+                break
+        expected[start] = guess
+        for darts in range(1, DARTS_PER_TAKE + 1):
+            states = MAX_OFFSETS[darts] + 1
+            # states below 0 can't be reached from this take start
+            reachable = min(states, start)
+            values[start, :reachable, darts - 1] = (constants[darts] + factors[darts] * guess)[:reachable]
+            targets[start, :reachable, darts - 1] = _AIM_LABELS[aims[darts][:reachable]]
+    if lowest_rest > 1:
+        # 1 can't be finished, it's never more than the bust it ends in
+        values[1], targets[1] = np.nan, 0
+    return values, targets
+
+
+def build_table(path: str, x: int, double_in: bool, double_out: bool, h_dev_mm: float, v_dev_mm: float) -> None:
+    values, targets = solve(x * 100 + 1, double_in, double_out, h_dev_mm, v_dev_mm)
+    # only complete tables ever show up under the real name
+    write_atomically(path, lambda tmp_path: np.savez_compressed(tmp_path, version=np.array(TABLE_VERSION),
+                                                                values=values, targets=targets))
+
+
+class X01ValueTable(object):
+    def __init__(self, x: int, double_in: bool, double_out: bool, h_dev_mm: float, v_dev_mm: float,
+                 path: str = None):
+        self.start_score = x * 100 + 1
+        self.double_in = double_in
+        self.path = path if path is not None else table_path(x, double_in, double_out, h_dev_mm, v_dev_mm)
+        if not os.path.exists(self.path):
+            print('solving x01 values', self.path)
+            build_table(self.path, x, double_in, double_out, h_dev_mm, v_dev_mm)
+        data = np.load(self.path)
+        if int(data['version']) != TABLE_VERSION:
+            print('x01 values', self.path, 'are outdated, solving again')
+            build_table(self.path, x, double_in, double_out, h_dev_mm, v_dev_mm)
+            data = np.load(self.path)
+        self.values = data['values']
+        self.targets = data['targets']
+
+    def _state(self, score: int, darts_left: int, take_start: int = None) -> Union[Tuple[int, int, int], None]:
+        if take_start is None or darts_left >= DARTS_PER_TAKE:
+            take_start = score
+        darts_left = min(max(darts_left, 1), DARTS_PER_TAKE)
+        offset = take_start - score
+        if not 0 <= score <= take_start <= self.start_score or offset > MAX_OFFSETS[darts_left]:
+            return None
+        return take_start, offset, darts_left - 1
+
+    def expected_darts(self, score: int, darts_left: int = DARTS_PER_TAKE, take_start: int = None) -> float:
+        """
+        expected darts to finish the leg from the score, with the score at the start of the running take
+        (the score itself if not given). with double in, the start score counts as not being in yet
+        """
+        state = self._state(score, darts_left, take_start)
+        return float(self.values[state]) if state is not None else float('nan')
+
+    def get_target(self, score: int, darts_left: int = DARTS_PER_TAKE, take_start: int = None) \
+            -> Union[Segment, None]:
+        state = self._state(score, darts_left, take_start)
+        label = int(self.targets[state]) if state is not None else 0
+        return board_geometry.LABEL_SEGMENTS[label] if label else None
+
+
+_tables = LimitedSizeDict(size_limit=16)
+
+
+def get_x01_values(x: int, double_in: bool, double_out: bool, h_dev_mm: float, v_dev_mm: float) -> X01ValueTable:
+    """
+    the solved table of the deviation bucket, solved and written to the cache directory on first use
+    """
+    key = (x, bool(double_in), bool(double_out), deviation_bucket(h_dev_mm), deviation_bucket(v_dev_mm))
+    if key in _tables:
+        _tables.move_to_end(key)
+    else:
+        _tables[key] = X01ValueTable(*key)
+    return _tables[key]
+
+
+if __name__ == '__main__':
+    import time
+    for dev in [5.0, 15.0, 40.0]:
+        start = time.time()
+        table = get_x01_values(5, False, True, dev, dev)
+        print('deviation %gmm (%.1fs):' % (dev, time.time() - start),
+              ', '.join('%d: %.1f darts, %s' % (score, table.expected_darts(score), table.get_target(score))
+                        for score in [501, 170, 100, 40, 32, 2]))
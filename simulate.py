@@ -0,0 +1,183 @@
+"""
+plays matches between AI players headless on the rules engine and reports how they do.
+the players are read from the players table, the darts are aimed with the strategies the application uses for G.
+
+    python simulate.py anna bob --game x01 --matches 10000
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict
+
+import numpy as np
+
+from engine.around_the_clock import AroundTheClockEngine
+from engine.cricket import CricketEngine
+from engine.game import GameEngine
+from engine.playout import throw_round
+from engine.strategies import PlayerProfile
+from engine.types import DartIntent, TakeResult
+from engine.x01 import X01Engine
+from models.x01_values import get_x01_values
+
+DEFAULT_PREFERRED_DOUBLES = [20, 16, 8]
+MAX_DARTS_PER_MATCH = 10000
+STATS = ['matches_won', 'legs_won', 'darts', 'leg_darts', 'checkout_attempts', 'checkouts']
+
+# a player profile at its place in the match. the engines tell the players apart by them, so a profile playing
+# against itself gets two players (equal profiles would be the same player)
+Seat = namedtuple('Seat', ['index'] + list(PlayerProfile._fields))
+
+
+def load_profiles(database: str, names: List[str]) -> List[PlayerProfile]:
+    connection = sqlite3.connect(database)
+    try:
+        rows = connection.execute('SELECT name, horizontal_deviation, vertical_deviation, preferred_doubles '
+                                  'FROM players WHERE name IN (%s)' % ','.join('?' * len(names)), names).fetchall()
+    finally:
+        connection.close()
+    profiles = {name: PlayerProfile(name, h_dev if h_dev is not None else 35.0,
+                                    v_dev if v_dev is not None else 45.0,
+                                    tuple(int(d) for d in doubles.split(',')) if doubles
+                                    else tuple(DEFAULT_PREFERRED_DOUBLES))
+                for name, h_dev, v_dev, doubles in rows}
+    missing = [name for name in names if name not in profiles]
+    if missing:
+        raise ValueError('unknown players: %s' % ', '.join(missing))
+    return [profiles[name] for name in names]
+
+
+def create_engine(game: str, players: List[Seat], options: dict) -> GameEngine:
+    match = dict(legs_to_set=options['legs_to_set'], sets_to_match=options['sets_to_match'])
+    if game == 'x01':
+        return X01Engine(players, x=options['x'], double_out=options['double_out'], **match)
+    if game == 'cricket':
+        return CricketEngine(players, cut_throat=options['cut_throat'], **match)
+    return AroundTheClockEngine(players, **match)
+
+
+def simulate_matches(game: str, options: dict, profiles: List[PlayerProfile], first_match: int, matches: int,
+                     seed: np.random.SeedSequence) -> List[Dict[str, int]]:
+    """
+    plays the matches and sums up STATS per seat (index into profiles). the players take turns in beginning the
+    matches. all matches advance in lockstep, so the darts of one round are sampled and classified in a single batch
+    (see engine.playout.throw_round)
+    """
+    rng = np.random.default_rng(seed)
+    seats = [Seat(index, *profile) for index, profile in enumerate(profiles)]
+    stats = [dict.fromkeys(STATS, 0) for _ in seats]
+    engines = []
+    for match in range(first_match, first_match + matches):
+        shift = match % len(seats)
+        engines.append(create_engine(game, seats[shift:] + seats[:shift], options))
+    leg_darts = [dict.fromkeys(seats, 0) for _ in engines]
+    active = list(range(len(engines)))
+    for _ in range(MAX_DARTS_PER_MATCH):
+        if not active:
+            break
+        still_active = []
+        for match, (player, intent, result) in zip(active, throw_round([engines[match] for match in active], rng)):
+            engine = engines[match]
+            player_stats = stats[player.index]
+            player_stats['darts'] += 1
+            leg_darts[match][player] += 1
+            # only x01 has finishing doubles, the other strategies aim every dart with CHECKOUT
+            checkout = game == 'x01' and intent == DartIntent.CHECKOUT
+            if checkout:
+                player_stats['checkout_attempts'] += 1
+            if result == TakeResult.WIN:
+                player_stats['legs_won'] += 1
+                player_stats['leg_darts'] += leg_darts[match][player]
+                if checkout:
+                    player_stats['checkouts'] += 1
+                leg_darts[match] = dict.fromkeys(seats, 0)
+                if engine.is_finished():
+                    player_stats['matches_won'] += 1
+                    continue
+            still_active.append(match)
+        active = still_active
+    return stats
+
+
+def simulate(game: str, options: dict, profiles: List[PlayerProfile], matches: int, workers: int = None,
+             seed: int = None, chunk_size: int = 100) -> List[Dict[str, int]]:
+    chunks = [(start, min(chunk_size, matches - start)) for start in range(0, matches, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    totals = [dict.fromkeys(STATS, 0) for _ in profiles]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_matches, game, options, profiles, start, count, chunk_seed)
+                   for (start, count), chunk_seed in zip(chunks, seeds)]
+        for future in futures:
+            for seat, stats in enumerate(future.result()):
+                for key, value in stats.items():
+                    totals[seat][key] += value
+    return totals
+
+
+def optimal_leg_darts(profiles: List[PlayerProfile], options: dict) -> List[float]:
+    """
+    expected darts per x01 leg of every player when playing the best targets (see models.x01_values)
+    """
+    return [get_x01_values(options['x'], False, options['double_out'], profile.horizontal_deviation,
+                           profile.vertical_deviation).expected_darts(options['x'] * 100 + 1)
+            for profile in profiles]
+
+
+def print_report(profiles: List[PlayerProfile], totals: List[Dict[str, int]], matches: int,
+                 optimal: List[float] = None):
+    """
+    darts/won leg only counts the legs a player won, which are the shorter ones. optimal is what a leg takes on
+    average, so it is only comparable without opponents and left out otherwise
+    """
+    if len(profiles) > 1:
+        optimal = None
+    print('%-20s %8s %8s %8s %14s %10s %10s' % ('player', 'won', 'win %', 'legs', 'darts/won leg', 'optimal',
+                                                'checkout %'))
+    names = [profile.name for profile in profiles]
+    for seat, (name, stats) in enumerate(zip(names, totals)):
+        print('%-20s %8d %8.1f %8d %14.1f %10s %10s' % (
+            name if names.count(name) == 1 else '%s (%d)' % (name, seat + 1),
+            stats['matches_won'], 100.0 * stats['matches_won'] / max(matches, 1), stats['legs_won'],
+            stats['leg_darts'] / max(stats['legs_won'], 1),
+            '%.1f' % optimal[seat] if optimal else '-',
+            '%.1f' % (100.0 * stats['checkouts'] / stats['checkout_attempts']) if stats['checkout_attempts']
+            else '-'))
+    unfinished = matches - sum(stats['matches_won'] for stats in totals)
+    if unfinished:
+        print(unfinished, 'matches were stopped after', MAX_DARTS_PER_MATCH, 'darts')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='simulate matches between AI players')
+    parser.add_argument('players', nargs='+', help='names of players in the database')
+    parser.add_argument('--game', choices=['x01', 'cricket', 'around_the_clock'], default='x01')
+    parser.add_argument('--matches', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help='processes, defaults to the number of CPUs')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--database', default='alchemy.db')
+    parser.add_argument('--legs-to-set', type=int, default=3)
+    parser.add_argument('--sets-to-match', type=int, default=1)
+    parser.add_argument('--x', type=int, default=3, help='x01: start at x * 100 + 1')
+    parser.add_argument('--single-out', action='store_true', help='x01: no double needed to finish')
+    parser.add_argument('--cut-throat', action='store_true', help='cricket: points go to the opponents')
+    args = parser.parse_args(argv)
+
+    try:
+        profiles = load_profiles(args.database, args.players)
+    except (ValueError, sqlite3.Error) as e:
+        parser.error(str(e))
+    options = dict(legs_to_set=args.legs_to_set, sets_to_match=args.sets_to_match, x=args.x,
+                   double_out=not args.single_out, cut_throat=args.cut_throat)
+    start = time.time()
+    totals = simulate(args.game, options, profiles, args.matches, args.workers, args.seed)
+    print_report(profiles, totals, args.matches,
+                 optimal_leg_darts(profiles, options) if args.game == 'x01' else None)
+    darts = sum(stats['darts'] for stats in totals)
+    print('%d matches, %d darts in %.1fs' % (args.matches, darts, time.time() - start))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
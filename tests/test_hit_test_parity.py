@@ -0,0 +1,50 @@
+"""
+every hit-test mode of DartBoard has to classify the board like the QPainterPath reference. a grid over the board
+is classified in each mode, points closer than WIRE_TOLERANCE_MM to a wire are not compared: QPainterPath
+approximates the arcs with bezier curves.
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pytest
+
+from constants import RADIUS_OUTER_DOUBLE_MM
+from models import board_geometry
+from models.dartboard import DartBoard, HitTestMode
+
+STEP_MM = 1.0
+WIRE_TOLERANCE_MM = 0.1
+
+
+def grid(step_mm: float, wire_tolerance_mm: float) -> np.ndarray:
+    coordinates = np.arange(0.0, 2 * RADIUS_OUTER_DOUBLE_MM + step_mm, step_mm)
+    xs, ys = np.meshgrid(coordinates, coordinates)
+    points = np.stack((xs.ravel(), ys.ravel()), axis=-1)
+    return points[board_geometry.distances_to_wire(points) >= wire_tolerance_mm]
+
+
+def classify(mode: HitTestMode, points: np.ndarray) -> board_geometry.ThrowResults:
+    DartBoard.set_hit_test_mode(mode)
+    try:
+        return DartBoard.classify_many(points)
+    finally:
+        DartBoard.set_hit_test_mode(HitTestMode.POLAR)
+
+
+@pytest.fixture(scope='module')
+def points():
+    return grid(STEP_MM, WIRE_TOLERANCE_MM)
+
+
+@pytest.fixture(scope='module')
+def reference(points):
+    return classify(HitTestMode.PATH, points)
+
+
+@pytest.mark.parametrize('mode', [HitTestMode.POLAR, HitTestMode.RASTER])
+def test_mode_matches_the_path_reference(mode, points, reference):
+    results = classify(mode, points)
+    mismatches = (results.sectors != reference.sectors) | (results.beds != reference.beds)
+    assert not mismatches.any(), points[mismatches][:10].tolist()
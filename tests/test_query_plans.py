@@ -0,0 +1,95 @@
+"""
+the queries the scorer runs on every dart must be answered from indexes: a small database is filled through the
+models, the player's take lookups are run like during a game, and every statement they issue is explained.
+none of them may scan a whole takes, darts, legs or sets table.
+"""
+import contextlib
+import os
+
+from PyQt5.QtCore import QPointF
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from database import BaseObject
+from database.migrations import run_migrations
+from database.pragmas import create_sqlite_engine
+from models.objects.dart import Dart
+from models.objects.game import GamePlayers
+from models.objects.games.x01 import X01
+from models.objects.leg import Leg
+from models.objects.player import Player
+from models.objects.set import Set
+from models.objects.take import Take
+
+# tables that grow with every dart, a full scan of them gets slower with every game played
+GROWING_TABLES = ['takes', 'darts', 'legs', 'sets']
+
+
+def fill(session, games: int = 3, legs: int = 3, takes: int = 6) -> Player:
+    player = Player(name='query plans')
+    session.add(player)
+    for _ in range(games):
+        game = X01(x=3, double_out=True, double_in=False, legs_to_set=legs, sets_to_match=1)
+        session.add_all([game, GamePlayers(game, player, 0)])
+        game_set = Set(game, player)
+        session.add(game_set)
+        for _ in range(legs):
+            leg = Leg(game_set, player)
+            session.add(leg)
+            session.commit()
+            for _ in range(takes):
+                take = Take(leg, player)
+                session.add(take)
+                for _ in range(3):
+                    dart = Dart(None, hit_location=QPointF(170.0, 60.0), target_location=QPointF(170.0, 60.0))
+                    dart.resolve_segment()
+                    take.add_dart(dart)
+                    session.add(dart)
+                # like DatabaseController, a parent only takes the next single_parent child after a commit
+                session.commit()
+    return player
+
+
+def full_scans(connection, statement: str, parameters) -> list:
+    details = [row[-1] for row in connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters)]
+    # 'SCAN takes' and 'SCAN takes USING COVERING INDEX ...' both read the whole table, 'SEARCH' doesn't
+    return [detail for detail in details if detail.startswith('SCAN') and detail.split()[1] in GROWING_TABLES]
+
+
+def explain_take_lookups(path: str) -> list:
+    """
+    (statement, full scans) of every statement the take lookups of a player issue, on a new database at path
+    """
+    engine = create_sqlite_engine(path, 'safe')
+    BaseObject.Base.metadata.create_all(engine)
+    run_migrations(engine)
+    session = sessionmaker(bind=engine)()
+    # the models print every new dart
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        player_id = fill(session).id
+    session.close()
+
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: \
+        statements.append((statement, parameters))
+    event.listen(engine, 'before_cursor_execute', listener)
+    session = sessionmaker(bind=engine)()
+    player = session.query(Player).get(player_id)
+    player.get_current_game_takes()
+    player.get_current_set_takes()
+    player.get_current_leg_takes()
+    event.remove(engine, 'before_cursor_execute', listener)
+    session.close()
+
+    with engine.connect() as connection:
+        explained = [(statement, full_scans(connection, statement, parameters))
+                     for statement, parameters in statements]
+    engine.dispose()
+    return explained
+
+
+def test_take_lookups_use_indexes(tmp_path):
+    explained = explain_take_lookups(str(tmp_path / 'query_plans.db'))
+    assert explained
+    scanning = [(' '.join(statement.split()), scans) for statement, scans in explained if scans]
+    assert not scanning, scanning
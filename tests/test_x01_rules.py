@@ -0,0 +1,45 @@
+from engine.types import TakeResult
+from engine.x01 import X01Engine, x01_take_result
+from models.board_geometry import Segment, Bed
+
+SINGLE_1 = Segment(1, Bed.SINGLE)
+SINGLE_20 = Segment(20, Bed.SINGLE)
+TRIPLE_20 = Segment(20, Bed.TRIPLE)
+DOUBLE_1 = Segment(1, Bed.DOUBLE)
+
+
+def test_leaving_1_busts_with_double_out():
+    assert x01_take_result(1, SINGLE_20, 1, double_out=True) == TakeResult.BUST
+    assert x01_take_result(1, SINGLE_20, 3, double_out=True) == TakeResult.BUST
+
+
+def test_leaving_1_goes_on_with_straight_out():
+    assert x01_take_result(1, SINGLE_20, 1, double_out=False) is None
+    assert x01_take_result(1, SINGLE_20, 3, double_out=False) == TakeResult.FINISHED
+
+
+def test_finishing_rules_are_unchanged():
+    assert x01_take_result(0, DOUBLE_1, 2, double_out=True) == TakeResult.WIN
+    assert x01_take_result(0, SINGLE_1, 2, double_out=True) == TakeResult.BUST
+    assert x01_take_result(0, SINGLE_1, 2, double_out=False) == TakeResult.WIN
+    assert x01_take_result(-1, SINGLE_20, 1, double_out=False) == TakeResult.BUST
+    assert x01_take_result(2, SINGLE_20, 2, double_out=True) is None
+
+
+def test_engine_resets_a_take_that_leaves_1():
+    engine = X01Engine(['anna', 'bob'], x=1, double_out=True, legs_to_set=1, sets_to_match=1)
+    assert engine.add_dart(TRIPLE_20) is None
+    assert engine.add_dart(SINGLE_20) is None
+    # 101 - 60 - 20 - 20 leaves 1
+    assert engine.add_dart(SINGLE_20) == TakeResult.BUST
+    assert engine.get_score('anna') == 101
+    assert engine.get_current_player() == 'bob'
+
+
+def test_bust_after_set_position_goes_back_to_the_start_of_the_take():
+    engine = X01Engine(['anna', 'bob'], x=1, double_out=True, legs_to_set=1, sets_to_match=1)
+    # anna scored 60 with the first dart of the running take
+    engine.set_position({'anna': 41, 'bob': 101}, 0, darts_left=2, take_score=60)
+    assert engine.add_dart(TRIPLE_20) == TakeResult.BUST
+    assert engine.get_score('anna') == 101
+    assert engine.get_current_player() == 'bob'
@@ -5,6 +5,7 @@ from PyQt5.QtCore import QRect, Qt
 from PyQt5.QtGui import QResizeEvent, QPixmap, QPaintEvent, QPainter, QColor
 from PyQt5.QtWidgets import QWidget
 
+from logic.settings import Settings
 from models.objects.player import Player
 from models.objects.take import Take
 from models.objects.game import Game
@@ -23,11 +24,14 @@ class ActiveGameWidget(QWidget):
         self.active_player_widget = ActivePlayerWidget(self)
         self.active_player_widget.setAttribute(Qt.WA_TransparentForMouseEvents)
         self.game_info_widget = None
+        self.game = None  # type: Game
         self.player_colors = [0xe6194B, 0x3cb44b, 0xffe119, 0x4363d8, 0xf58231, 0x911eb4, 0x42d4f4, 0xf032e6, 0xbfef45,
                               0xfabebe, 0x469990, 0xe6beff, 0x9A6324, 0xfffac8, 0x800000, 0xaaffc3, 0x808000, 0xffd8b1,
                               0x000075, 0xa9a9a9, 0xffffff, 0x000000]
+        Settings.DISPLAY_AIM_MAP.register_change_handler(self.update_aim_map, pass_value=False)
 
     def update_game(self, game: Game, new_game: bool):
+        self.game = game
         if new_game:
             self.set_players(game, game.get_players())
             if self.game_info_widget is not None:
@@ -42,9 +46,18 @@ class ActiveGameWidget(QWidget):
                 self.active_widget_reference = pw
                 self.active_player_widget.set_player(pw.player, score)
             pw.repaint()
+        self.update_aim_map()
         self.redraw(self.width(), self.height())
         self.game_info_widget.update_players(game.get_players())
 
+    def update_aim_map(self):
+        # computing a map can take a while (new values to convolve), only do it while it is shown
+        current_player = self.game.get_current_player() if self.game is not None else None
+        if Settings.DISPLAY_AIM_MAP.get() and current_player is not None:
+            self.dartboard_widget.set_aim_map(self.game.get_aim_map(current_player))
+        else:
+            self.dartboard_widget.set_aim_map(None)
+
     def set_players(self, game: Game, players: List[Player]):
         for pw in self.player_widgets.values():
             pw.deleteLater()
@@ -12,6 +12,7 @@ from PyQt5.QtWidgets import QWidget
 from constants import *
 from logic.helper import MathHelper
 from logic.settings import Settings
+from models.aim_map import AimMap
 from models.dartboard import DartBoard, Bed
 from models.objects.dart import Dart
 
@@ -131,6 +132,8 @@ class DartboardWidget(QWidget):
             self.dot_pen_color = QColor(0, 255, 155)
             self.dot_target_color = QColor(255, 0, 0)
             self.dot_hit_color = QColor(0, 0, 255)
+            self.aim_map = None  # type: AimMap
+            self.aim_map_image = None  # type: QImage
         else:
             self.dot_pen_color = QColor(255, 255, 255)
             self.dot_hit_color = self.dot_pen_color
@@ -159,6 +162,7 @@ class DartboardWidget(QWidget):
         if not self.mini_version:
             Settings.DISPLAY_DARTS.register_change_handler(self.repaint, pass_value=False)
             Settings.DRAG_DARTS_ENABLED.register_change_handler(self.unset_cursor)
+            Settings.DISPLAY_AIM_MAP.register_change_handler(self.repaint, pass_value=False)
 
     def set_darts(self, darts: List[Dart]):
         self.current_darts = darts
@@ -173,6 +177,23 @@ class DartboardWidget(QWidget):
 
         self.repaint()
 
+    def set_aim_map(self, aim_map: Union[AimMap, None]):
+        if aim_map is not self.aim_map:
+            self.aim_map = aim_map
+            self.aim_map_image = None
+            if Settings.DISPLAY_AIM_MAP.get():
+                self.repaint()
+
+    def draw_aim_map(self) -> QImage:
+        # same colors as the heatmap, the best aim points are opaque
+        expected = np.clip(self.aim_map.expected / max(self.aim_map.best_value, 0.1), 0, 1)
+        rgb = (np.array(MathHelper.vectorized_hsl_to_rgb2(expected)) * 255).astype(np.uint8)
+        alpha = (expected * 200).astype(np.uint8)
+        rgba = np.ascontiguousarray(np.stack((rgb[0], rgb[1], rgb[2], alpha), axis=-1))
+        height, width = expected.shape
+        # copy, so the image does not point into the numpy buffer
+        return QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888).copy()
+
     def propagate_mouse_over(self, _global):
         cursor = Qt.CrossCursor
         for dw in self.dart_widgets.values():
@@ -427,6 +448,11 @@ class DartboardWidget(QWidget):
                 self.heat_map = self.draw_heatmap()
             painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
             painter.drawImage(QRectF(0, 0, self.heat_map.width(), self.heat_map.height()), self.heat_map)
+        elif Settings.DISPLAY_AIM_MAP.get() and self.aim_map is not None:
+            if self.aim_map_image is None:
+                self.aim_map_image = self.draw_aim_map()
+            painter.drawImage(QRectF(0, 0, 2 * (RADIUS_OUTER_DOUBLE_MM + OFFSET_FROM_ORIGIN_MM),
+                                     2 * (RADIUS_OUTER_DOUBLE_MM + OFFSET_FROM_ORIGIN_MM)), self.aim_map_image)
 
 
         # DRAW THROWS
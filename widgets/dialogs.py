@@ -1,9 +1,9 @@
 import datetime
-from typing import List
+from typing import Callable, List
 
 from PyQt5 import QtCore
-from PyQt5.QtCore import pyqtSignal, QSize
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import pyqtSignal, QSize, QTimer
+from PyQt5.QtGui import QIcon, QShowEvent, QResizeEvent
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QListWidget, QAbstractItemView, QListWidgetItem, QPushButton, \
     QHBoxLayout, QLabel, QInputDialog, QMessageBox, QCheckBox, QSpinBox, QComboBox, QLineEdit, QFormLayout
 from sqlalchemy import ColumnDefault
@@ -11,7 +11,7 @@ from sqlalchemy import ColumnDefault
 # noinspection PyUnresolvedReferences
 from database.types import GameStatus
 from models.objects.games import x01, cricket, around_the_clock
-from models.objects.game import Game
+from models.objects.game import Game, GameSummary
 
 
 class GameCreationDialog(QDialog):
@@ -103,16 +103,23 @@ class GameCreationDialog(QDialog):
 
 class GameSelectionDialog(QDialog):
 
-    game_selected = pyqtSignal(Game)
+    game_selected = pyqtSignal(int)   # game id
 
-    def __init__(self, title: str, games: List[Game], *args, **kwargs):
+    # summaries fetched at once, the next page is fetched when the list is scrolled to its end
+    # (or right away while the list fits without scrolling)
+    PAGE_SIZE = 50
+
+    def __init__(self, title: str, load_page: Callable[[int, int], List[GameSummary]], *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.games = games
+        self.load_page = load_page
+        self.all_fetched = False
         self.setMinimumSize(QSize(650, 400))
         self.setWindowIcon(QIcon('img/application-get-icon.png'))
         self.setWindowTitle(title)
         self.gameListWidget = QListWidget()
         self.gameListWidget.itemSelectionChanged.connect(self.selected)
+        self.gameListWidget.verticalScrollBar().valueChanged.connect(self.scrolled)
+        self.gameListWidget.verticalScrollBar().rangeChanged.connect(self.fill_view)
         self.infoWidget = QLabel('no game selected')
         self.accept_button = QPushButton('Load')
         self.accept_button.clicked.connect(self.load_game)
@@ -124,15 +131,39 @@ class GameSelectionDialog(QDialog):
         self.vlay.addWidget(self.infoWidget)
         self.vlay.addWidget(self.accept_button)
         self.stored_games = {}
-        self.set_games(self.games)
+        self.fetch_more()
         self.setLayout(self.layout)
 
-    def game_repr(self, game: Game):
-        return '%s - %s' % (game.get_name(), game.start_time.ctime())
+    def game_repr(self, game: GameSummary):
+        return '%s - %s' % (game.name, game.start_time.ctime())
 
-    def set_games(self, games: List[Game]):
-        self.gameListWidget.clear()
-        self.stored_games = {}
+    def fetch_more(self):
+        if self.all_fetched:
+            return
+        games = self.load_page(len(self.stored_games), self.PAGE_SIZE)
+        self.all_fetched = len(games) < self.PAGE_SIZE
+        self.add_games(games)
+        # the scroll bar range is only updated once the list is laid out again
+        QTimer.singleShot(0, self.fill_view)
+
+    def scrolled(self, value: int):
+        if value == self.gameListWidget.verticalScrollBar().maximum():
+            self.fetch_more()
+
+    def fill_view(self, *_):
+        # without a scroll bar the list can't be scrolled to its end, so fetch until it has one or all are listed
+        if self.isVisible() and not self.all_fetched and self.gameListWidget.verticalScrollBar().maximum() == 0:
+            self.fetch_more()
+
+    def showEvent(self, event: QShowEvent):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.fill_view)
+
+    def resizeEvent(self, event: QResizeEvent):
+        super().resizeEvent(event)
+        QTimer.singleShot(0, self.fill_view)
+
+    def add_games(self, games: List[GameSummary]):
         for game in games:
             item = QListWidgetItem(self.game_repr(game))
             item.setData(QtCore.Qt.UserRole, game.id)
@@ -145,17 +176,13 @@ class GameSelectionDialog(QDialog):
         if self.gameListWidget.selectedItems():
             item = self.gameListWidget.selectedItems()[0]
             game = self.stored_games[item.data(QtCore.Qt.UserRole)]
-            self.infoWidget.setText('%s\n_______________\n\nPlayers:\n\n%s\n\n_______________\nState:\n\n%s'
+            self.infoWidget.setText('%s\n_______________\n\nPlayers:\n\n%s\n\n_______________\nOptions:\n\n%s'
+                                    '\n\n_______________\nState:\n\n%s%s'
                                     % (self.game_repr(game),
-                                       '\n'.join(['%s - %s [Sets:%s/%s, Legs:%s/%s]' % (
-                                           p.name, game.get_player_score(p),
-                                           sum([1 for set in game.sets if set.winner == p]),
-                                           game.sets_to_match,
-                                           sum([1 for leg in game.get_current_set().legs if leg.winner == p]),
-                                           game.legs_to_set
-                                       )
-                                                  for p in game.get_players()]),
-                                       game.status))
+                                       '\n'.join(game.players),
+                                       '\n'.join('%s: %s' % option for option in game.options.items()),
+                                       game.status,
+                                       '' if game.winner is None else '\nWinner: %s' % game.winner))
             self.accept_button.setEnabled(True)
         else:
             self.accept_button.setEnabled(False)
@@ -163,8 +190,7 @@ class GameSelectionDialog(QDialog):
     def load_game(self):
         if self.gameListWidget.selectedItems():
             item = self.gameListWidget.selectedItems()[0]
-            game = self.stored_games[item.data(QtCore.Qt.UserRole)]
-            self.game_selected.emit(game)
+            self.game_selected.emit(item.data(QtCore.Qt.UserRole))
             self.close()
 
 
@@ -30,6 +30,7 @@ class CricketInfoWidget(GameInfoWidget):
             player_width = (self.width()-sector_width)/len(self.players)
             sector_height = (self.height()-player_height) / len(self.game.goal_segments)
             circle_diam = min(player_width*0.3, sector_height*0.3)
+            marks = self.game.get_marks()
             for i, gs in enumerate(self.game.goal_segments):
                 rect = QRect(0, player_height + i * sector_height, sector_width, sector_height)
                 # painter.fillRect(rect,
@@ -55,7 +56,7 @@ class CricketInfoWidget(GameInfoWidget):
                 for j, gs in enumerate(self.game.goal_segments):
                     c_center = (sector_width + i * player_width + circle_diam/2,
                                 player_height + j * sector_height + sector_height/2)
-                    num = self.game.sector_hits[gs][player]
+                    num = marks.get(gs, player)
                     if num > 0:
                         painter.drawLine(QPoint(*self.point_on_circle(c_center, circle_diam/2, 45)),
                                          QPoint(*self.point_on_circle(c_center, circle_diam/2, 180)))
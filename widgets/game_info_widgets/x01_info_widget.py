@@ -1,13 +1,158 @@
-from PyQt5.QtCore import QPoint
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Union
 
+from PyQt5.QtCore import QPoint, QObject, pyqtSignal, Qt, QRectF
+from PyQt5.QtGui import QFont
+
+from engine.playout import x01_win_probabilities
+from engine.strategies import PlayerProfile
+from logic.helper import LimitedSizeDict
+from models.x01_values import get_x01_values, X01ValueTable
 from widgets.game_info_widgets.line_graph_info_widget import LineGraphInfoWidget
 
+PLAYOUTS = 400
+PLAYOUTS_PER_UPDATE = 50
+# one worker each for all widgets: the playouts are plain python, more threads would only fight over the GIL.
+# they don't share the worker with the value tables, so the first estimate never waits for a table to be solved
+_playout_executor = ThreadPoolExecutor(max_workers=1)
+_table_executor = ThreadPoolExecutor(max_workers=1)
+
+
+class WinProbabilityEstimator(QObject):
+    """
+    plays out the running leg in the background and reports the win probabilities of the players,
+    refined every PLAYOUTS_PER_UPDATE playouts. finished estimates are cached per position,
+    requesting a new position cancels the work on the previous one.
+    """
+    estimated = pyqtSignal(object, object)  # position, list of probabilities
+    _finished = pyqtSignal(object, object)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.position = None
+        self._cache = LimitedSizeDict(size_limit=256)
+        self._pending = None
+        # queued into the gui thread, so the cache is only ever touched there
+        self._finished.connect(self._cache.__setitem__)
+
+    def request(self, players: List[PlayerProfile], scores: Dict[PlayerProfile, int], player_turn: int,
+                darts_left: int, double_out: bool, take_score: int = 0):
+        position = (tuple(players), tuple(scores[player] for player in players), player_turn, darts_left, double_out,
+                    take_score)
+        if position == self.position:
+            return
+        self.position = position
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if position in self._cache:
+            self.estimated.emit(position, self._cache[position])
+            return
+
+        def cancelled():
+            return self.position is not position
+
+        def play_out():
+            wins = [0.0] * len(players)
+            for played in range(PLAYOUTS_PER_UPDATE, PLAYOUTS + 1, PLAYOUTS_PER_UPDATE):
+                probabilities = x01_win_probabilities(players, scores, player_turn, darts_left, double_out,
+                                                      PLAYOUTS_PER_UPDATE, cancelled=cancelled, take_score=take_score)
+                if probabilities is None:
+                    return
+                wins = [w + p * PLAYOUTS_PER_UPDATE for w, p in zip(wins, probabilities)]
+                try:
+                    self.estimated.emit(position, [w / played for w in wins])
+                except RuntimeError:
+                    # the widget is gone
+                    return
+                if cancelled():
+                    return
+            self._finished.emit(position, [w / PLAYOUTS for w in wins])
+
+        self._pending = _playout_executor.submit(play_out)
+
+    def cancel(self):
+        self.position = None
+
 
 class X01InfoWidget(LineGraphInfoWidget):
+    values_loaded = pyqtSignal(object, object)  # deviations, X01ValueTable
+
     def __init__(self, game: "X01", *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.game = game
         self.total = game.target_score
+        self.win_probabilities = None
+        self.estimator = WinProbabilityEstimator(self)
+        self.estimator.estimated.connect(self.set_win_probabilities)
+        self.value_tables = {}  # type: Dict[tuple, X01ValueTable]
+        self.values_loaded.connect(self.set_value_table)
+
+    def update_players(self, players: List["Player"]):
+        self.players = players
+        self.request_win_probabilities()
+        for player in players:
+            self.request_value_table(player)
+        self.repaint()
+
+    def request_value_table(self, player: "Player"):
+        deviations = (player.horizontal_deviation, player.vertical_deviation)
+        if deviations in self.value_tables:
+            return
+        self.value_tables[deviations] = None
+        # double in is not part of the rules, the scores count from the first dart
+        x, double_out = self.game.x, bool(self.game.double_out)
+
+        def load():
+            table = get_x01_values(x, False, double_out, *deviations)
+            try:
+                self.values_loaded.emit(deviations, table)
+            except RuntimeError:
+                # the widget is gone
+                pass
+
+        # loading (or solving the first time) must not hold up the game
+        _table_executor.submit(load)
+
+    def set_value_table(self, deviations: tuple, table: X01ValueTable):
+        self.value_tables[deviations] = table
+        self.update()
+
+    def get_expected_darts(self, player: "Player") -> Union[float, None]:
+        """
+        expected darts the player needs to finish the leg, None while the values are not loaded
+        """
+        table = self.value_tables.get((player.horizontal_deviation, player.vertical_deviation))
+        if table is None:
+            return None
+        score = self.game.get_player_score(player)
+        take = player.get_current_take() if player.get_current_leg_takes() else None
+        if player is self.game.get_current_player() and take is not None and not take.is_complete():
+            return table.expected_darts(score, 3 - take.size(), score + take.get_score())
+        return table.expected_darts(score)
+
+    def request_win_probabilities(self):
+        if not self.players or self.game.is_finished():
+            self.estimator.cancel()
+            self.win_probabilities = None
+            return
+        # plain copies of the players, the orm objects must not leave the gui thread
+        profiles = [PlayerProfile(p.name, p.horizontal_deviation, p.vertical_deviation,
+                                  tuple(p.get_preferred_doubles())) for p in self.players]
+        scores = {profile: self.game.get_player_score(p) for profile, p in zip(profiles, self.players)}
+        current_player = self.game.get_current_player()
+        # a bust in the playouts goes back to where the running take started
+        take = current_player.get_current_take() if current_player.get_current_leg_takes() else None
+        take_score = take.get_score() if take is not None and not take.is_complete() else 0
+        self.estimator.request(profiles, scores, self.game.player_turn, current_player.get_darts_left(),
+                               bool(self.game.double_out), take_score)
+
+    def set_win_probabilities(self, position, probabilities: List[float]):
+        if position != self.estimator.position:
+            return
+        self.win_probabilities = probabilities
+        self.update()
 
     def draw_dotted_lines(self, painter):
 
@@ -27,3 +172,17 @@ class X01InfoWidget(LineGraphInfoWidget):
                     self.draw_dot(painter, x, y, player.color, connect=QPoint(_x, _y))
                     _x = x
                     _y = y
+            self.draw_win_probabilities(painter)
+
+    def draw_win_probabilities(self, painter):
+        painter.setFont(QFont('Arial', 10))
+        for i, player in enumerate(self.players):
+            texts = []
+            expected_darts = self.get_expected_darts(player)
+            if expected_darts is not None and not math.isnan(expected_darts):
+                texts.append('~%.1f darts' % expected_darts)
+            if self.win_probabilities is not None:
+                texts.append('%.0f %%' % (100 * self.win_probabilities[i]))
+            painter.setPen(player.color)
+            rect = QRectF(self.width() - 160, 5 + i * 16, 155, 16)
+            painter.drawText(rect, Qt.AlignRight | Qt.AlignVCenter, '  '.join(texts))